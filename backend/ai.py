@@ -0,0 +1,169 @@
+# ==============================================================
+# Aliman AI - Qoidalarga asoslangan "AI" javoblar
+# ==============================================================
+# Kalit so'z tahlili: chiqish sababi (reasons.py), chat niyati, kunlik
+# savol va kun yakuni matni. Sof funksiyalar — DB ga murojaat yo'q,
+# shuning uchun bench_ai.py ularni belgilangan korpus ustida o'lchaydi.
+# ==============================================================
+
+import re
+from datetime import datetime
+
+import reasons
+
+
+def analyze_exit(reason: str) -> dict:
+    """Fokusdan chiqish sababini tahlil qilish"""
+    category = reasons.classify(reason)
+
+    if category == "distracted":
+        return {
+            "type": "distracted",
+            "response": (
+                f'⚠️ "{reason}" — bu chalg\'itish!\n\n'
+                "Eslab qo'y: har safar fokusni yo'qotganingda, maqsadingga erishish "
+                "qiyinlashadi. Ulug' insonlar ham zerikadi, lekin ular davom etadi!\n\n"
+                "💪 Yana 10 daqiqa tur. Faqat 10 daqiqa! Keyin ko'rasan — engib o'tasan."
+            )
+        }
+    elif category == "valid":
+        return {
+            "type": "valid",
+            "response": (
+                "✅ Tushunarliq sabab.\n\n"
+                "Tez hal qilib, qaytib kel. Fokusingni yo'qotma — "
+                "qaytganingda davom ettirishni unutma!"
+            )
+        }
+    else:
+        return {
+            "type": "unknown",
+            "response": (
+                f'🤔 "{reason}" — baribir, endi fokusga qaytish vaqti!\n\n'
+                "Maqsadingni esla va davom et. 💡 Maslahat: telefon/ijtimoiy "
+                "tarmoqlarni boshqa xonaga qo'y — ko'zdan uzoq, ko'ngildan uzoq!"
+            )
+        }
+
+
+def question_period(hour: int) -> str:
+    if hour < 12:
+        return "morning"
+    elif hour < 17:
+        return "afternoon"
+    return "evening"
+
+
+DAILY_QUESTIONS = {
+    "morning": "🌅 Xayrli tong! Bugun nima qilmoqchisan? Rejangni yoz va fokuslanib boshla.",
+    "afternoon": "☀️ Tushdan keyin ham davom et! Bugun qanday natijaga erishmoqchisan?",
+    "evening": "🌙 Kechqi vaqt — eng samarali vaqtlardan biri! Bugun nima qilmoqchisan?",
+}
+
+
+def daily_question(hour: int = None) -> str:
+    if hour is None:
+        hour = datetime.now().hour
+    return DAILY_QUESTIONS[question_period(hour)]
+
+
+# -------------------------------------------------------
+# Chat: niyat (intent) -> javob shabloni
+# -------------------------------------------------------
+FOCUS_EXIT_WORDS = ("chiq", "to'xtat", "bor", "kerak", "ko'r")
+
+CHAT_INTENTS = (  # tartib muhim: birinchi mos kelgani tanlanadi
+    ("greeting", ("salom", "assalom", "hi")),
+    ("bored", ("zerik", "bezdim", "qiyin", "charchad")),
+    ("plan", ("reja", "plan", "bugun", "nima qil")),
+    ("help", ("yordam", "help", "nima")),
+)
+
+CHAT_REPLIES = {
+    "focus_exit": ("🔒 Fokus rejimida ekansiz!\n\n"
+                   "Agar haqiqatan zarur bo'lsa — chiq. Lekin shunchaki zerikayotgan "
+                   "bo'lsang — dosh ber! 5 daqiqa davom ettir, keyin qaror qil. 💪"),
+    "focus_stay": "Fokusda davom et, {uname}! 🎯\nHozir eng muhim narsa — oldingdagi vazifa.",
+    "greeting": "Salom, {uname}! 👋 Bugun nima qilmoqchisan? Birgalikda rejalashtirамиз!",
+    "bored": ("Tushunaman, ba'zida qiyin bo'ladi. 🤗\n\n"
+              "Lekin zerikish — bu o'sish chegarasida turganingizning belgisi! "
+              "Har bir buyuk ish boshida zerikarli ko'rinadi.\n\n"
+              "💡 Vazifangni 5 daqiqalik bo'laklarga bo'l va boshlа. "
+              "Ko'pincha boshlash eng qiyin qism!"),
+    "plan": ("Keling rejalashtirамиз! 📋\n\nBugun uchun 3 ta asosiy maqsad yoz:\n"
+             "1. Eng muhim vazifa nima?\n2. Ikkinchi muhim vazifa?\n3. Uchinchi?\n\n"
+             "Rejangni 'Reja' bo'limiga yoz!"),
+    "help": ("Men seni fokus bo'lishga yordam beraman! 🎯\n\n"
+             "• Bugungi rejani tuzishga yordam\n"
+             "• Fokus sessiyasini boshqarish\n"
+             "• Chalg'ituvchi vaqtlarni nazorat qilish\n"
+             "• Kun yakuni tahlil\n\nNima haqida gaplashamiz?"),
+    "fallback": ("Tushundim, {uname}. 💪\n\n"
+                 "Fokusda qolish uchun doim qo'llab-quvvatlayman! "
+                 "Biror savol yoki muammo bo'lsa, bemalol so'ra."),
+}
+
+
+def chat_intent(message: str, context: str) -> str:
+    m = message.lower()
+    if context == "focus":
+        return "focus_exit" if any(w in m for w in FOCUS_EXIT_WORDS) else "focus_stay"
+    for intent, words in CHAT_INTENTS:
+        if any(w in m for w in words):
+            return intent
+    return "fallback"
+
+
+def chat_response(message: str, context: str, uname: str) -> str:
+    return CHAT_REPLIES[chat_intent(message, context)].format(uname=uname)
+
+
+def chat_stream(message: str, context: str, uname: str):
+    """chat_response bo'laklab (so'zma-so'z): sekinroq javob beruvchi (LLM) shu
+    generator interfeysini beradi — har bir bo'lak tayyor bo'lishi bilan yuboriladi.
+    close() — mijoz uzildi, generatsiya to'xtatiladi"""
+    yield from re.findall(r"\s*\S+\s*", chat_response(message, context, uname))
+
+
+# -------------------------------------------------------
+# Kun yakuni
+# -------------------------------------------------------
+def day_verdict(stats: dict) -> str:
+    """Kun bahosi: excellent | good_start | rough | empty | fine"""
+    dist = stats['distractions'] or 0
+    mins = stats['total_minutes'] or 0
+    if dist == 0 and mins >= 60:
+        return "excellent"
+    elif dist == 0 and mins > 0:
+        return "good_start"
+    elif dist > 3:
+        return "rough"
+    elif mins == 0:
+        return "empty"
+    return "fine"
+
+
+VERDICTS = {
+    "excellent": "🏆 Ajoyib kun! Bugun a'lo fokuslandingiz!",
+    "good_start": "👍 Yaxshi boshlash! Ertaga yanada ko'proq fokus vaqti qo'shing.",
+    "rough": "💪 Ertaga yaxshiroq bo'ladi. Telefon/ijtimoiy tarmoqlarni o'chiring!",
+    "empty": "📅 Bugun fokus sessiyasi bo'lmadi. Ertaga boshlang — birinchi qadam eng muhimi!",
+    "fine": "📈 Yaxshi kun o'tdi. Ertaga yanada yaxshiroq bo'lasiz!",
+}
+
+
+def end_of_day_report(stats: dict, plans: list) -> str:
+    """day_stats va kun rejalaridan tahlil matni"""
+    total = stats['sessions'] or 0
+    dist = stats['distractions'] or 0
+    mins = stats['total_minutes'] or 0
+    completed_plans = sum(1 for p in plans if p['completed'])
+
+    result = f"📊 Bugungi tahlil:\n\n"
+    result += f"⏱️  Fokus vaqti: {mins} daqiqa ({total} sessiya)\n"
+    result += f"⚠️  Chalg'igan holatlar: {dist} marta\n"
+
+    if plans:
+        result += f"✅  Bajarilgan rejalar: {completed_plans}/{len(plans)}\n"
+
+    return result + "\n" + VERDICTS[day_verdict(stats)]
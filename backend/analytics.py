@@ -0,0 +1,271 @@
+# ==============================================================
+# Aliman AI - Fokus sessiyalari analitikasi (NumPy)
+# ==============================================================
+# Yopilgan sessiyalar ustunli massivlarga yuklanadi va barcha
+# foydalanuvchilar uchun bir yo'la vektorlashtirilgan hisoblanadi
+# (np.bincount / np.unique) — qatorlar bo'yicha Python sikli yo'q:
+#   - soat bo'yicha sessiyalar va chalg'ishlar xaritasi (24 ta katak)
+#   - rejalangan va haqiqiy daqiqalar nisbati
+#   - ketma-ket fokus kunlari (streak)
+#   - chiqish turlari va sabab toifalari chastotasi
+#
+# Natija user_analytics jadvalida keshlanadi: tungi batch (core.py
+# dagi 'analytics_batch' vazifasi) yoki so'rov paytida eskirgan bo'lsa.
+#
+#   python3 analytics.py [/path/aliman.db]     — batch
+#   python3 analytics.py --synthetic 2000000   — tezlik o'lchovi
+# ==============================================================
+
+import gc
+import importlib.util
+import json
+import os
+from datetime import datetime, timedelta
+
+import reasons
+import usertime
+
+EXIT_TYPES = ("completed", "distracted", "other", "abandoned")
+CATEGORIES = reasons.CATEGORIES + ("none",)  # none — sabab yozilmagan
+MAX_AGE_HOURS = float(os.environ.get("ANALYTICS_MAX_AGE_HOURS", 6))
+BATCH_WRITE = 1000
+
+
+def available() -> bool:
+    # numpy ixtiyoriy (pip install numpy) va faqat load/summarize ichida
+    # import qilinadi — core.py ni import qilish ~100 ms ga sekinlashmasin
+    return importlib.util.find_spec("numpy") is not None
+
+
+# -------------------------------------------------------
+# Yuklash: DB -> ustunlar
+# -------------------------------------------------------
+def _codes(values, vocab: tuple, mapper=None):
+    """Satrlar -> vocab indekslari; har bir noyob qiymat bir marta tasniflanadi"""
+    import numpy as np
+    # vocab da yo'q qiymat (masalan, eski exit_type) -> 'other'
+    other = vocab.index("other") if "other" in vocab else len(vocab) - 1
+    table = {}
+    for v in set(values):
+        m = mapper(v) if mapper else v
+        table[v] = vocab.index(m) if m in vocab else other
+    return np.fromiter(map(table.__getitem__, values), np.int8, len(values))
+
+
+def _category(pair) -> str:
+    stored, reason = pair
+    return stored or (reasons.classify(reason) if reason else "none")
+
+
+def load(store, user_id: int = None) -> dict:
+    """focus_sessions -> {ustun: np.ndarray}; user_id=None — barcha foydalanuvchilar"""
+    import numpy as np
+    # millionlab tuple: yuklash davomida GC har bo'lakda to'xtatmasin
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        parts = [_columns(rows) for rows in store.focus_columns(user_id)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    if not parts:
+        return _empty_columns()
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _columns(rows: list) -> dict:
+    import numpy as np
+    uid, hour, day, planned, actual, etype, category, reason = zip(*rows)
+    return {
+        "user_id": np.array(uid, dtype=np.int64),
+        "hour": np.clip(np.array(hour, dtype=np.int64), 0, 23),
+        "day": np.array(day, dtype="datetime64[D]"),
+        "planned": np.array(planned, dtype=np.float64),
+        "actual": np.array(actual, dtype=np.float64),
+        "exit_type": _codes(etype, EXIT_TYPES),
+        # saqlangan toifa; hali backfill qilinmagan qatorlar — sabab matnidan
+        "category": _codes(list(zip(category, reason)), CATEGORIES, _category),
+    }
+
+
+def _empty_columns() -> dict:
+    import numpy as np
+    return {"user_id": np.zeros(0, np.int64), "hour": np.zeros(0, np.int64),
+            "day": np.zeros(0, "datetime64[D]"), "planned": np.zeros(0), "actual": np.zeros(0),
+            "exit_type": np.zeros(0, np.int8), "category": np.zeros(0, np.int8)}
+
+
+# -------------------------------------------------------
+# Hisoblash
+# -------------------------------------------------------
+def _grid(u, codes, width: int, n: int, weights=None):
+    """(foydalanuvchi, kod) juftliklari soni -> n x width matritsa"""
+    import numpy as np
+    flat = np.bincount(u * width + codes, weights=weights, minlength=n * width)
+    return flat.reshape(n, width)
+
+
+def _streaks(u, day, good, n: int):
+    """Har bir foydalanuvchi: eng uzun va oxirgi ketma-ket kunlar, oxirgi kun"""
+    import numpy as np
+    longest = np.zeros(n, np.int64)
+    last = np.zeros(n, np.int64)
+    last_day = np.full(n, -1, np.int64)
+    days = day[good].astype(np.int64)
+    if days.size == 0:
+        return longest, last, last_day
+    # (foydalanuvchi, kun) juftliklari — tartiblangan va noyob
+    key = np.unique((u[good].astype(np.int64) << 32) | (days - days.min()))
+    ku, kd = key >> 32, (key & 0xFFFFFFFF) + days.min()
+    start = np.ones(key.size, bool)
+    start[1:] = (ku[1:] != ku[:-1]) | (kd[1:] != kd[:-1] + 1)
+    run = np.cumsum(start) - 1
+    run_len = np.bincount(run)
+    run_user = ku[start]
+    first = np.flatnonzero(np.r_[True, run_user[1:] != run_user[:-1]])
+    longest[run_user[first]] = np.maximum.reduceat(run_len, first)
+    tail = np.flatnonzero(np.r_[ku[1:] != ku[:-1], True])
+    last[ku[tail]] = run_len[run[tail]]
+    last_day[ku[tail]] = kd[tail]
+    return longest, last, last_day
+
+
+def summarize(cols: dict) -> dict:
+    """Ustunlar -> {user_id: payload}"""
+    import numpy as np
+    users, u = np.unique(cols["user_id"], return_inverse=True)
+    n = len(users)
+    etype, planned, actual = cols["exit_type"], cols["planned"], cols["actual"]
+    distracted = (etype == EXIT_TYPES.index("distracted")).astype(np.float64)
+    has_plan = planned > 0
+
+    hours = _grid(u, cols["hour"], 24, n).astype(np.int64)
+    dist_hours = _grid(u, cols["hour"], 24, n, distracted).astype(np.int64)
+    planned_sum = np.bincount(u, weights=np.where(has_plan, planned, 0), minlength=n)
+    actual_sum = np.bincount(u, weights=np.where(has_plan, actual, 0), minlength=n)
+    with_plan = np.bincount(u, weights=has_plan.astype(np.float64), minlength=n)
+    reached = np.bincount(u, weights=(has_plan & (actual >= planned)).astype(np.float64), minlength=n)
+    exit_types = _grid(u, etype.astype(np.int64), len(EXIT_TYPES), n).astype(np.int64)
+    cats = _grid(u, cols["category"].astype(np.int64), len(CATEGORIES), n).astype(np.int64)
+    longest, last, last_day = _streaks(u, cols["day"], etype == EXIT_TYPES.index("completed"), n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.round(actual_sum / planned_sum, 3)
+        reached_share = np.round(reached / with_plan, 3)
+    peak = np.where(dist_hours.max(axis=1) > 0, dist_hours.argmax(axis=1), -1)
+
+    # per-user dict — sikl foydalanuvchilar bo'yicha, qatorlar bo'yicha emas
+    cols_py = [users.tolist(), hours.tolist(), dist_hours.tolist(), planned_sum.tolist(),
+               actual_sum.tolist(), ratio.tolist(), reached_share.tolist(), exit_types.tolist(),
+               cats.tolist(), longest.tolist(), last.tolist(), last_day.tolist(), peak.tolist()]
+    out = {}
+    for (uid, h, dh, ps, as_, r, rs, et, ct, lg, ls, ld, pk) in zip(*cols_py):
+        out[uid] = {
+            "sessions": sum(h),
+            "heatmap": {"sessions": h, "distracted": dh},
+            "peak_distraction_hour": pk if pk >= 0 else None,
+            "completion": {
+                "planned_minutes": int(ps),
+                "actual_minutes": int(as_),
+                "ratio": r if r == r and ps else None,  # NaN -> None
+                "reached_share": rs if rs == rs else None,
+            },
+            "streak": {
+                "longest": lg,
+                "last": ls,
+                "last_day": str(np.datetime64(ld, "D")) if ld >= 0 else None,
+            },
+            "exit_types": dict(zip(EXIT_TYPES, et)),
+            "reason_categories": dict(zip(reasons.CATEGORIES, ct)),
+        }
+    return out
+
+
+def empty_payload() -> dict:
+    return {
+        "sessions": 0,
+        "heatmap": {"sessions": [0] * 24, "distracted": [0] * 24},
+        "peak_distraction_hour": None,
+        "completion": {"planned_minutes": 0, "actual_minutes": 0, "ratio": None, "reached_share": None},
+        "streak": {"longest": 0, "last": 0, "last_day": None},
+        "exit_types": dict.fromkeys(EXIT_TYPES, 0),
+        "reason_categories": dict.fromkeys(reasons.CATEGORIES, 0),
+    }
+
+
+# -------------------------------------------------------
+# Kesh (user_analytics)
+# -------------------------------------------------------
+def _dump(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def batch(store) -> int:
+    """Barcha foydalanuvchilar: bitta yuklash, bitta hisoblash, bo'laklab yozish"""
+    computed_at = usertime.stamp(usertime.utcnow())
+    rows = [(uid, _dump(p), computed_at) for uid, p in summarize(load(store)).items()]
+    for i in range(0, len(rows), BATCH_WRITE):
+        store.put_analytics_many(rows[i:i + BATCH_WRITE])
+    return len(rows)
+
+
+def for_user(store, user_id: int, tz: str = None):
+    """Keshdagi natija (eskirgan bo'lsa — qayta hisoblanadi); numpy yo'q va
+    kesh bo'sh bo'lsa None"""
+    row = store.get_analytics(user_id)
+    fresh = row is not None and (
+        usertime.utcnow() - usertime.parse_ts(row["computed_at"]) < timedelta(hours=MAX_AGE_HOURS))
+    if row is not None and (fresh or not available()):
+        payload, computed_at = json.loads(row["payload"]), row["computed_at"]
+    elif not available():
+        return None
+    else:
+        payload = summarize(load(store, user_id)).get(user_id) or empty_payload()
+        computed_at = usertime.stamp(usertime.utcnow())
+        store.put_analytics_many([(user_id, _dump(payload), computed_at)])
+    # joriy streak foydalanuvchining "bugun"iga nisbatan (kesh kunlar o'tsa ham to'g'ri)
+    streak = payload["streak"]
+    today = datetime.strptime(usertime.today_for(tz), "%Y-%m-%d").date()
+    alive = streak["last_day"] and (today - datetime.strptime(streak["last_day"], "%Y-%m-%d").date()).days <= 1
+    streak["current"] = streak["last"] if alive else 0
+    payload["computed_at"] = computed_at
+    return payload
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import storage
+
+    parser = argparse.ArgumentParser(description="Fokus analitikasi (batch)")
+    parser.add_argument("db", nargs="?", default=os.path.join(os.path.dirname(__file__), "aliman.db"))
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="DB o'rniga N ta tasodifiy sessiyada summarize() tezligini o'lchash")
+    args = parser.parse_args()
+    if not available():
+        raise SystemExit("numpy o'rnatilmagan: pip install numpy")
+
+    import numpy as np
+
+    if args.synthetic:
+        rng = np.random.default_rng(1)
+        n = args.synthetic
+        cols = {
+            "user_id": rng.integers(1, max(2, n // 500), n),
+            "hour": rng.integers(0, 24, n),
+            "day": np.datetime64("2023-01-01") + rng.integers(0, 730, n).astype("timedelta64[D]"),
+            "planned": rng.choice([25.0, 45.0, 60.0], n),
+            "actual": rng.integers(0, 70, n).astype(np.float64),
+            "exit_type": rng.integers(0, len(EXIT_TYPES), n).astype(np.int8),
+            "category": rng.integers(0, len(CATEGORIES), n).astype(np.int8),
+        }
+        t0 = time.perf_counter()
+        result = summarize(cols)
+        print(f"✅ {n} sessiya, {len(result)} foydalanuvchi: {(time.perf_counter() - t0) * 1000:.0f} ms")
+    else:
+        store = storage.open_storage(os.environ.get("DATABASE_URL") or args.db)
+        store.init_schema()
+        t0 = time.perf_counter()
+        count = batch(store)
+        print(f"✅ {count} foydalanuvchi: {(time.perf_counter() - t0) * 1000:.0f} ms")
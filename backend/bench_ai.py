@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# ==============================================================
+# AI qoidalari micro-benchmark + aniqlik (ai_corpus.jsonl ustida)
+# Ishga tushirish: python3 bench_ai.py [--repeat 2000] [--json] [--out natijalar.jsonl]
+# ==============================================================
+# Korpus: o'zbek/rus/ingliz xabarlari va chiqish sabablari, har biri
+# belgilangan (label) va turi bilan: short | long | adversarial.
+# Har bir funksiya uchun: ns/chaqiruv (server ishlatadigan funksiya),
+# chaqiruv boshiga eng yuqori ajratilgan xotira (tracemalloc, bayt) va
+# aniqlik — umumiy, til va tur bo'yicha. Kalit so'zlar o'zgarsa, tezlik
+# va to'g'rilik birga o'lchanadi.
+#
+# --out — natija JSON qatori sifatida faylga qo'shiladi (vaqt o'tishi
+# bilan kuzatish uchun); --min-accuracy — pastroq bo'lsa chiqish kodi 1.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import ai
+
+CORPUS = os.path.join(os.path.dirname(__file__), "ai_corpus.jsonl")
+
+
+def _eod_args(e):
+    plans = [{"completed": c} for c in e["plans_completed"]]
+    return (e["stats"], plans)
+
+
+# fn -> (o'lchanadigan chaqiruv, argumentlar, bashorat qilingan label)
+SUITES = {
+    "analyze_exit": ("exit", ai.analyze_exit, lambda e: (e["text"],),
+                     lambda e: ai.analyze_exit(e["text"])["type"]),
+    "chat_response": ("chat", ai.chat_response, lambda e: (e["text"], e["context"], "ali"),
+                      lambda e: ai.chat_intent(e["text"], e["context"])),
+    "daily_question": ("daily", ai.daily_question, lambda e: (e["hour"],),
+                       lambda e: ai.question_period(e["hour"])),
+    "end_of_day": ("eod", ai.end_of_day_report, _eod_args,
+                   lambda e: ai.day_verdict(e["stats"])),
+}
+
+
+def load_corpus(path: str = CORPUS) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def time_ns(fn, calls: list, repeat: int) -> float:
+    """Butun korpus bo'ylab `repeat` marta; 5 o'lchovning eng kichigi, ns/chaqiruv"""
+    def run():
+        for args in calls:
+            fn(*args)
+    best = min(timeit.repeat(run, number=repeat, repeat=5))
+    return best * 1e9 / (repeat * len(calls))
+
+
+def alloc_bytes(fn, calls: list) -> float:
+    """Chaqiruv boshiga o'rtacha eng yuqori ajratilgan xotira (vaqtinchalik obyektlar bilan)"""
+    tracemalloc.start()
+    try:
+        total = 0
+        for args in calls:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(*args)
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / len(calls)
+
+
+def accuracy(cases: list, predict) -> dict:
+    hits, groups, misses = 0, {}, []
+    for e in cases:
+        got = predict(e)
+        ok = got == e["label"]
+        hits += ok
+        for key in ("lang", "kind"):
+            if key in e:
+                g = groups.setdefault(f"{key}:{e[key]}", [0, 0])
+                g[0] += ok
+                g[1] += 1
+        if not ok:
+            misses.append({"input": e.get("text", e.get("hour", e.get("stats"))),
+                           "expected": e["label"], "got": got})
+    return {"accuracy": round(hits / len(cases), 4),
+            "groups": {k: round(h / n, 4) for k, (h, n) in sorted(groups.items())},
+            "misses": misses}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__) or ".").stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(corpus: list, repeat: int) -> dict:
+    results = {}
+    for name, (fn_key, fn, args_of, predict) in SUITES.items():
+        cases = [e for e in corpus if e["fn"] == fn_key]
+        if not cases:
+            continue
+        calls = [args_of(e) for e in cases]
+        results[name] = {"cases": len(cases),
+                         "ns_per_call": round(time_ns(fn, calls, repeat), 1),
+                         "alloc_bytes_per_call": round(alloc_bytes(fn, calls), 1),
+                         **accuracy(cases, predict)}
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": git_commit(), "python": platform.python_version(),
+            "repeat": repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI qoidalari: tezlik va aniqlik")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--json", action="store_true", help="natijani JSON sifatida chiqarish")
+    parser.add_argument("--out", help="natijani JSON qatori sifatida shu faylga qo'shish")
+    parser.add_argument("--misses", action="store_true", help="noto'g'ri tasniflanganlarni ko'rsatish")
+    parser.add_argument("--min-accuracy", type=float, default=0.0)
+    args = parser.parse_args()
+
+    report = run(load_corpus(args.corpus), args.repeat)
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for name, r in report["results"].items():
+            print(f"{name:15} {r['cases']:4d} ta  {r['ns_per_call']:9.1f} ns/chaqiruv  "
+                  f"{r['alloc_bytes_per_call']:7.0f} B  aniqlik {r['accuracy']:.1%}")
+            weak = {k: v for k, v in r["groups"].items() if v < 1}
+            if weak:
+                print("                " + "  ".join(f"{k} {v:.0%}" for k, v in weak.items()))
+            if args.misses:
+                for m in r["misses"]:
+                    print(f"                ✗ {m['input']!r}: {m['expected']} ≠ {m['got']}")
+
+    low = [n for n, r in report["results"].items() if r["accuracy"] < args.min_accuracy]
+    if low:
+        print(f"⚠️  aniqlik {args.min_accuracy:.0%} dan past: {', '.join(low)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# ==============================================================
+# JSON micro-benchmark: orjson vs stdlib
+# Ishga tushirish: python3 bench_json.py [takrorlar]
+# ==============================================================
+# Dashboard va chat tarixi javoblariga o'xshash yuklamalarda har bir
+# serializatorning bitta chaqiruv uchun vaqtini (mikrosekund) o'lchaydi.
+
+import sys
+import timeit
+
+import fastjson
+
+
+def dashboard_payload(n_plans=20):
+    return {
+        "username": "aliman_user",
+        "ai_question": "🌅 Xayrli tong! Bugun nima qilmoqchisan? Rejangni yoz va fokuslanib boshla.",
+        "plans": [{"id": i, "user_id": 1, "plan_text": f"Reja №{i}: kitob o'qish va mashq",
+                   "date": "2024-05-01", "completed": i % 2} for i in range(n_plans)],
+        "stats": {"sessions": 7, "total_minutes": 175, "distractions": 2},
+    }
+
+
+def history_payload(n_msgs=200):
+    return {"messages": [
+        {"role": "user" if i % 2 == 0 else "assistant",
+         "content": "Salom! Bugun nima qilay? Привет, zerikdim 😅 " * 3,
+         "created_at": "2024-05-01 10:00:00"} for i in range(n_msgs)]}
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    engines = {"stdlib": fastjson.stdlib_dumps}
+    if fastjson.orjson is not None:
+        engines["orjson"] = fastjson.dumps
+    else:
+        print("⚠️  orjson o'rnatilmagan — faqat stdlib o'lchanadi")
+
+    for name, payload in [("dashboard", dashboard_payload()), ("history[200]", history_payload())]:
+        base = None
+        for engine, fn in engines.items():
+            t = min(timeit.repeat(lambda: fn(payload), number=number, repeat=5)) / number
+            base = base or t
+            print(f"{name:14} {engine:7} {t * 1e6:9.2f} µs/chaqiruv  x{base / t:.1f}  "
+                  f"{len(fn(payload))} bayt")
+
+
+if __name__ == "__main__":
+    main()
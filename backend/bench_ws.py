@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# ==============================================================
+# WebSocket hub benchmark: ulanishlar, xotira, kadr vs HTTP kechikishi
+# Ishga tushirish: python3 bench_ws.py [--conns 1000] [--repeat 300]
+# ==============================================================
+# main.py (FastAPI) uvicorn ostida alohida jarayonda, vaqtinchalik baza
+# bilan ishga tushadi. O'lchanadi:
+#   - --conns ta autentifikatsiyalangan bo'sh ulanish: server RSS o'sishi
+#     (KB/ulanish) — o'n minglab ulanishni baholash uchun
+#   - bitta ulanishda ketma-ket chat kadrlari vs keep-alive HTTP so'rovlari
+#     (p50/p95, ms)
+#   - push: bitta yozuvdan keyin foydalanuvchining barcha soketlariga
+#     "changed" yetib borish vaqti
+# Katta --conns uchun `ulimit -n` yetarli bo'lsin (ikkala jarayonda ham).
+# websockets / uvicorn / httpx o'rnatilmagan bo'lsa — chiqish kodi 3.
+# ==============================================================
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SKIPPED = 3
+USERS = 10
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def start_server(port: int):
+    tmp = tempfile.mkdtemp(prefix="bench-ws-")
+    env = dict(os.environ, DATABASE_URL=os.path.join(tmp, "aliman.db"), TOKEN_FORMAT="compact")
+    env.pop("CACHE_URL", None)
+    env.pop("RATELIMIT_URL", None)
+    for route in ("login", "register", "chat", "write", "read"):
+        for kind in ("user", "ip"):
+            env[f"RATELIMIT_{route.upper()}_{kind.upper()}"] = "1000000/1000000"
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+                             "--log-level", "warning", "--ws-per-message-deflate", "false"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+
+
+def percentiles(samples: list) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    return f"p50 {statistics.median(samples):7.3f}  p95 {p95:7.3f}"
+
+
+async def connect(url: str, token: str):
+    import websockets
+    ws = await websockets.connect(url, max_size=2 ** 20, compression=None)
+    await ws.send(json.dumps({"type": "auth", "token": token}))
+    ready = json.loads(await ws.recv())
+    assert ready["type"] == "ready", ready
+    return ws
+
+
+async def run(args, base: str, tokens: list, pid: int):
+    import httpx
+    url = base.replace("http", "ws", 1) + "/ws"
+
+    # 1) bo'sh ulanishlar va xotira
+    before = rss_kb(pid)
+    t0 = time.perf_counter()
+    sockets = []
+    for i in range(0, args.conns, 200):
+        sockets += await asyncio.gather(*(connect(url, tokens[j % USERS])
+                                          for j in range(i, min(i + 200, args.conns))))
+    await asyncio.sleep(0.5)
+    after = rss_kb(pid)
+    print(f"🔌 {len(sockets)} ulanish: {time.perf_counter() - t0:.1f} s, "
+          f"server RSS +{(after - before) / 1024:.1f} MB ({(after - before) / max(1, len(sockets)):.1f} KB/ulanish)")
+
+    # 2) ketma-ket chat: kadr vs HTTP
+    ws = sockets[0]
+    frames = []
+    for i in range(args.repeat):
+        t = time.perf_counter()
+        await ws.send(json.dumps({"id": i, "method": "POST", "path": "/api/chat",
+                                  "body": {"message": f"salom {i}"}}))
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg.get("id") == i:
+                break
+        frames.append((time.perf_counter() - t) * 1000)
+    http = []
+    with httpx.Client(base_url=base, headers={"Authorization": f"Bearer {tokens[0]}"}) as client:
+        for i in range(args.repeat):
+            t = time.perf_counter()
+            client.post("/api/chat", json={"message": f"salom {i}"}).raise_for_status()
+            http.append((time.perf_counter() - t) * 1000)
+    print(f"💬 chat, ms    kadr: {percentiles(frames)}")
+    print(f"               HTTP: {percentiles(http)}")
+
+    # 3) push fan-out: user 1 ning barcha soketlari
+    # (oldingi chat push lari faqat user 0 soketlariga ketgan)
+    mine = [s for i, s in enumerate(sockets) if i % USERS == 1]
+    t = time.perf_counter()
+    httpx.post(base + "/api/plans", json={"plan_text": "push"},
+               headers={"Authorization": f"Bearer {tokens[1]}"}).raise_for_status()
+
+    async def changed(s):
+        while json.loads(await s.recv()).get("type") != "changed":
+            pass
+        return (time.perf_counter() - t) * 1000
+
+    reached = await asyncio.gather(*(changed(s) for s in mine))
+    print(f"📣 push: {len(mine)} soket, oxirgisi {max(reached):.1f} ms")
+
+    await asyncio.gather(*(s.close() for s in sockets))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket hub: ulanishlar, xotira, kechikish")
+    parser.add_argument("--conns", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    try:
+        import httpx
+        import uvicorn  # noqa: F401
+        import websockets  # noqa: F401
+    except ImportError as e:
+        print(f"⚪ o'tkazib yuborildi: {e.name} o'rnatilmagan")
+        sys.exit(SKIPPED)
+
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = start_server(port)
+    try:
+        for _ in range(100):
+            try:
+                if httpx.get(base + "/readyz").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.1)
+        else:
+            sys.exit("❌ server ishga tushmadi")
+        tokens = [httpx.post(base + "/api/register", json={"username": f"ws{i}", "password": "secret12"})
+                  .json()["token"] for i in range(USERS)]
+        asyncio.run(run(args, base, tokens, proc.pid))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# ==============================================================
+# Aliman AI - Ikki darajali kesh (L1 jarayon ichida + umumiy L2)
+# ==============================================================
+# L1 — har bir workerdagi LRU; L2 (CACHE_URL, ixtiyoriy) — workerlar
+# uchun umumiy qatlam, shuning uchun yangi worker boshqalar isitgan
+# qiymatlardan foydalanadi:
+#   (bo'sh, standart)              — faqat L1, bitta worker uchun
+#   sqlite:///dev/shm/aliman.cache — bir xostdagi workerlar uchun umumiy
+#   redis://localhost:6379/1       — Redis-mos server (pip install redis)
+#
+# Invalidatsiya — avlod (generation) hisoblagichlari: kalit
+# `ns:scope:gen:key`, bu yerda gen — scope (masalan, "u42") ning joriy
+# avlodi. bump(scope) hisoblagichni oshiradi va scope ning barcha eski
+# yozuvlari (har bir workerning L1 ida ham) o'qilmay qoladi, keyin
+# TTL bilan o'chadi. Avlodlar L2 da saqlanadi — bump darhol hamma
+# workerlarga ko'rinadi.
+#
+# etag(scope, variant) — shu avlodlardan olingan zaif ETag: javob
+# ma'lumoti o'zgarmagan bo'lsa, so'rovni bajarmasdan 304 qaytarish uchun.
+# Avlodlar qayta ishga tushishda noldan boshlanadi, shuning uchun ETag
+# ga L2 (yoki jarayon) "epoxasi" ham qo'shiladi — eski ETag mos kelmaydi.
+#
+# Miss bo'lganda load() single-flight orqali (singleflight.py): bir xil
+# to'liq kalit (ns, scope, avlod, key) bo'yicha parallel so'rovlar — bir
+# nechta tab, takroriy yuklashlar — bitta hisoblashni kutib, natijani
+# baham ko'radi. Avlod kalitda: bump dan keyingi so'rovlar eski
+# hisoblashga qo'shilmaydi.
+# ==============================================================
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from singleflight import SingleFlight
+
+L1_SIZE = int(os.environ.get("CACHE_L1_SIZE", 50_000))
+L1_MAX_TTL = 60.0  # L2 bo'lsa: L1 nusxasi shundan uzoq yashamaydi
+FLIGHT_TIMEOUT = float(os.environ.get("CACHE_FLIGHT_TIMEOUT", 10))  # soniya
+MISS = object()
+
+
+class LRU:
+    """Thread-safe LRU; yozuv: kalit -> (muddati, qiymat)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, now: float):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return MISS
+            if entry[0] <= now:
+                del self.data[key]
+                return MISS
+            self.data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, expires: float):
+        with self.lock:
+            self.data[key] = (expires, value)
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def __len__(self):
+        return len(self.data)
+
+
+# -------------------------------------------------------
+# L2 backendlar: get/set (bytes) va avlod hisoblagichlari
+# -------------------------------------------------------
+class SQLiteL2:
+    """Bir xostdagi workerlar uchun umumiy fayl (/dev/shm da — xotirada)"""
+
+    PURGE_EVERY = 1000  # o'rtacha har N ta yozuvda muddati o'tganlar tozalanadi
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS entries "
+                     "(key TEXT PRIMARY KEY, value BLOB, expires REAL) WITHOUT ROWID")
+        conn.execute("CREATE TABLE IF NOT EXISTS generations "
+                     "(scope TEXT PRIMARY KEY, gen INTEGER NOT NULL) WITHOUT ROWID")
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA synchronous=OFF")
+            self.local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute("SELECT value, expires FROM entries WHERE key=?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, raw: bytes, ttl: float):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, raw, now + ttl))
+        if random.randrange(self.PURGE_EVERY) == 0:
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+
+    def generation(self, scope: str) -> int:
+        row = self._conn().execute("SELECT gen FROM generations WHERE scope=?", (scope,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, scope: str) -> int:
+        return self._conn().execute(
+            "INSERT INTO generations VALUES (?, 1) "
+            "ON CONFLICT(scope) DO UPDATE SET gen=gen+1 RETURNING gen", (scope,)).fetchone()[0]
+
+    def epoch(self, candidate: int) -> int:
+        conn = self._conn()
+        conn.execute("INSERT OR IGNORE INTO generations VALUES ('#epoch', ?)", (candidate,))
+        return self.generation("#epoch")
+
+
+class RedisL2:
+    """Redis (yoki mos server): qiymatlar SET EX, avlodlar INCR"""
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        return self.client.get("c:" + key)
+
+    def set(self, key: str, raw: bytes, ttl: float):
+        self.client.set("c:" + key, raw, ex=max(1, int(ttl)))
+
+    def generation(self, scope: str) -> int:
+        return int(self.client.get("g:" + scope) or 0)
+
+    def bump(self, scope: str) -> int:
+        return self.client.incr("g:" + scope)
+
+    def epoch(self, candidate: int) -> int:
+        self.client.set("g:#epoch", candidate, nx=True)
+        return self.generation("#epoch")
+
+
+def open_l2(url: str):
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisL2(url)
+    if url.startswith("sqlite://"):
+        return SQLiteL2(url[len("sqlite://"):])
+    return None
+
+
+# -------------------------------------------------------
+# Kesh
+# -------------------------------------------------------
+class Cache:
+    def __init__(self, l2=None, l1_size: int = L1_SIZE):
+        self.l1 = LRU(l1_size)
+        self.l2 = l2
+        self.l1_max_ttl = L1_MAX_TTL if l2 is not None else float("inf")
+        self.gens = {}  # L2 yo'q bo'lganda avlodlar shu yerda
+        self._epoch = None
+        self.lock = threading.Lock()
+        self.flights = SingleFlight(FLIGHT_TIMEOUT)
+        self.counters = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "bumps": 0}
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def generation(self, scope: str) -> int:
+        if self.l2 is not None:
+            return self.l2.generation(scope)
+        return self.gens.get(scope, 0)
+
+    def bump(self, scope: str) -> int:
+        """scope ning barcha yozuvlarini eskirtirish; yangi avlodni qaytaradi"""
+        self._count("bumps")
+        if self.l2 is not None:
+            return self.l2.bump(scope)
+        with self.lock:
+            gen = self.gens[scope] = self.gens.get(scope, 0) + 1
+            return gen
+
+    def epoch(self) -> int:
+        """Avlodlar to'plamining identifikatori (L2 tozalansa yoki jarayon qayta ishga tushsa — yangisi)"""
+        if self._epoch is None:
+            candidate = random.getrandbits(31)
+            self._epoch = self.l2.epoch(candidate) if self.l2 is not None else candidate
+        return self._epoch
+
+    def etag(self, scope: str, variant: str = "") -> str:
+        """Zaif ETag qiymati (qo'shtirnoqsiz): scope ga yozuv bo'lsa o'zgaradi"""
+        return f"{self.epoch():x}.{self.generation(scope)}.{variant}"
+
+    def get_or_set(self, ns: str, scope: str, key: str, ttl: float, load):
+        """Keshdan yoki load() dan. Avlod load() dan OLDIN o'qiladi: hisoblash
+        paytida bump bo'lsa, natija eski avlod kalitiga yoziladi va o'qilmaydi"""
+        full = f"{ns}:{scope}:{self.generation(scope)}:{key}"
+        now = time.monotonic()
+        value = self.l1.get(full, now)
+        if value is not MISS:
+            self._count("l1_hits")
+            return value
+        if self.l2 is not None:
+            raw = self.l2.get(full)
+            if raw is not None:
+                self._count("l2_hits")
+                value = json.loads(raw)
+                self.l1.set(full, value, now + min(ttl, self.l1_max_ttl))
+                return value
+        return self.flights.do(full, lambda: self._load(full, load, ttl))
+
+    def _load(self, full: str, load, ttl: float):
+        self._count("misses")
+        value = load()
+        self._store(full, value, ttl, time.monotonic())
+        return value
+
+    def put(self, ns: str, scope: str, key: str, value, ttl: float):
+        self._store(f"{ns}:{scope}:{self.generation(scope)}:{key}", value, ttl, time.monotonic())
+
+    def _store(self, full: str, value, ttl: float, now: float):
+        self.l1.set(full, value, now + min(ttl, self.l1_max_ttl))
+        if self.l2 is not None:
+            self.l2.set(full, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(), ttl)
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        return {"l2": type(self.l2).__name__ if self.l2 is not None else None,
+                "l1_size": len(self.l1), **counters, "flights": self.flights.stats()}
+
+
+default = Cache(open_l2(os.environ.get("CACHE_URL", "")))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# ==============================================================
+# So'rov rejalari regressiyasini tekshirish (SQLite)
+# Ishga tushirish: python3 check_plans.py [--users 1000] [--keep /tmp/plans.db]
+# ==============================================================
+# Katta sintetik baza quriladi (standart: 1000 foydalanuvchi, 200k fokus
+# sessiyasi, 100k chat xabari, 30k reja), so'ng queries.py dagi har bir
+# nomlangan so'rov uchun EXPLAIN QUERY PLAN olinadi. Xato hisoblanadi:
+#   - issiq jadvalda SCAN (to'liq jadval yoki to'liq indeks aylanishi)
+#   - USE TEMP B-TREE (ORDER BY / GROUP BY indeksdan olinmagan)
+#   - EXPECTED_INDEX dagi so'rov boshqa indeksni tanlagan
+# ALLOWED dagi so'rovlar bundan mustasno (ishga tushish / tungi batch).
+# Standart o'lchamda issiq so'rovlar uchun vaqt byudjetlari ham tekshiriladi
+# (p95, ms). Biror shart buzilsa — chiqish kodi 1 (CI uchun).
+# ==============================================================
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import queries
+import storage
+
+HOT_TABLES = ("focus_sessions", "chat_messages", "daily_plans", "jobs",
+              "idempotency_keys", "daily_reviews", "users", "user_analytics", "change_log")
+
+# nom -> ruxsat etilgan plan qismlari va sababi
+ALLOWED = {
+    "focus_columns_all": (("SCAN focus_sessions",), "tungi analytics_batch: butun jadval bitta o'qishda"),
+    "focus_open": (("SCAN focus_sessions USING INDEX idx_focus_one_open",), "ishga tushishda: qisman indeks faqat ochiq sessiyalar"),
+    "jobs_pending": (("SCAN jobs USING INDEX idx_jobs_pending",), "ishga tushishda: qisman indeks faqat pending"),
+    "jobs_running": (("SCAN jobs USING INDEX idx_jobs_running",), "ishga tushishda: qisman indeks faqat running"),
+    "jobs_purge": (("SCAN jobs",), "tungi jobs_purge: kuniga bir marta butun jadval"),
+}
+
+# shu so'rovlar aynan shu indeksdan foydalanishi shart (boshqa indeks tanlansa —
+# masalan, diapazon o'rniga faqat user_id bo'yicha — qatorlar ko'p ko'riladi)
+EXPECTED_INDEX = {
+    "plans_for_day": "idx_plans_user_date",
+    "focus_day_stats": "idx_focus_user",
+    "chat_recent": "idx_chat_user",
+    "sync_window": "idx_change_seq",
+    "sync_plans": "idx_change_seq",
+    "sync_sessions": "idx_change_seq",
+    "sync_chat": "idx_change_seq",
+}
+
+# issiq so'rovlar: p95 byudjeti (ms) standart o'lchamda
+BUDGETS_MS = {
+    "user_by_id": 0.2,
+    "plans_for_day": 0.5,
+    "focus_get": 0.2,
+    "focus_day_stats": 0.5,
+    "focus_columns": 5.0,
+    "chat_recent": 0.5,
+    "review_get": 0.2,
+    "analytics_get": 0.2,
+    "idem_get": 0.2,
+    "sync_head": 0.2,
+    "sync_window": 0.5,
+    "sync_chat": 1.0,
+}
+
+DEFAULT_USERS = 1000
+DAYS = 60
+
+
+def seed(store, users: int, rnd: random.Random):
+    """Har bir foydalanuvchiga: 200 sessiya, 100 chat xabari, 30 reja (DAYS kun ichida)"""
+    conn = store.connect()
+    days = [f"2026-{m:02d}-{d:02d}" for m in (8, 9) for d in range(1, 31)][:DAYS]
+    conn.executemany("INSERT INTO users (id, username, password_hash, timezone) VALUES (?, ?, 'x', ?)",
+                     ((u, f"u{u}", "Asia/Tashkent") for u in range(1, users + 1)))
+    conn.executemany(
+        "INSERT INTO focus_sessions (user_id, started_at, ended_at, planned_minutes, actual_minutes,"
+        " exit_reason, exit_type, exit_category) VALUES (?, ?, ?, 25, ?, ?, ?, ?)",
+        ((u, f"{rnd.choice(days)}T{rnd.randrange(24):02d}:{rnd.randrange(60):02d}:00+05:00",
+          "x", rnd.randrange(30), rnd.choice(("youtube", "suv", "")), rnd.choice(("completed", "distracted")),
+          rnd.choice(("distracted", "valid", None)))
+         for _ in range(200) for u in range(1, users + 1)))
+    conn.executemany(
+        "INSERT INTO chat_messages (user_id, role, content) VALUES (?, ?, ?)",
+        ((u, "user" if i % 2 else "assistant", f"salom {i} bugun reja kitob o'qish")
+         for i in range(100) for u in range(1, users + 1)))
+    conn.executemany(
+        "INSERT INTO daily_plans (user_id, plan_text, date, completed) VALUES (?, ?, ?, ?)",
+        ((u, f"reja {i}", rnd.choice(days), i % 2) for i in range(30) for u in range(1, users + 1)))
+    conn.executemany(
+        "INSERT INTO daily_reviews (user_id, day, analysis, computed_at) VALUES (?, ?, 'ok', 'x')",
+        ((u, d) for u in range(1, users + 1) for d in days[:5]))
+    conn.executemany(
+        "INSERT INTO jobs (kind, user_id, job_key, run_at, status) VALUES ('eod_review', ?, ?, ?, ?)",
+        ((u, d, f"{d}T23:30:00", "done") for u in range(1, users + 1) for d in days[:5]))
+    for ddl in queries.SYNC_BACKFILL:  # init_schema bo'sh jadvallar ustida bajargan
+        conn.execute(ddl)
+    conn.commit()
+    conn.close()
+    return days
+
+
+def params_for(name: str, sql: str, users: int, days: list, rnd: random.Random) -> tuple:
+    """Vakillik qiluvchi parametrlar (reja qiymatga emas, shaklga bog'liq)"""
+    uid = rnd.randrange(1, users + 1)
+    day = rnd.choice(days)
+    special = {
+        "user_by_name": (f"u{uid}",),
+        "plans_for_day": (uid, day),
+        "focus_day_stats": (uid, day, storage._next_day(day)),
+        "chat_recent": (uid, 20),
+        "review_get": (uid, days[0]),
+        "review_delete": (uid, days[0]),
+        "idem_get": (uid, "k"),
+        # oxirgi ~50 o'zgarish: odatiy qayta ulanish
+        "sync_window": (uid, 280, 500),
+        "sync_plans": (uid, 280, 330),
+        "sync_sessions": (uid, 280, 330),
+        "sync_chat": (uid, 280, 330),
+        "sync_bump": (1, uid),
+        "sync_log": (uid, "chat", 1, 331),
+        "search_chat": (f'owner : "u{uid}" AND body : ("kit"*)', 2 ** 62, 200),
+        "search_plans": (f'owner : "u{uid}" AND body : ("rej"*)', 2 ** 62, 200),
+    }
+    if name in special:
+        return special[name]
+    return (uid,) * sql.count("?")
+
+
+def plan_of(conn, sql: str, params) -> list:
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def violations(name: str, plan: list) -> list:
+    allowed = ALLOWED.get(name, ((), ""))[0]
+    bad = []
+    for detail in plan:
+        if any(detail.startswith(a) for a in allowed):
+            continue
+        if detail.startswith("SCAN ") and detail.split()[1] in HOT_TABLES:
+            bad.append(detail)
+        elif detail.startswith("USE TEMP B-TREE"):
+            bad.append(detail)
+    index = EXPECTED_INDEX.get(name)
+    if index and not any(f"INDEX {index} " in d for d in plan):
+        bad.append(f"{index} ishlatilmadi")
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN regressiyalari va vaqt byudjetlari")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--keep", help="sintetik bazani shu yo'lda saqlash / qayta ishlatish")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    path = args.keep or os.path.join(tempfile.mkdtemp(), "plans.db")
+    fresh = not os.path.exists(path)
+    store = storage.SQLiteStorage(path)
+    store.init_schema()
+    t0 = time.perf_counter()
+    days = seed(store, args.users, rnd) if fresh else \
+        [f"2026-{m:02d}-{d:02d}" for m in (8, 9) for d in range(1, 31)][:DAYS]
+    if fresh:
+        print(f"🌱 Sintetik baza: {args.users} foydalanuvchi, {time.perf_counter() - t0:.1f} s")
+
+    failed = 0
+    conn = store.connect()
+    conn.row_factory = None
+    sql_all = {**queries.SQL, **queries.SEARCH_SQL}
+    for name, sql in sql_all.items():
+        plan = plan_of(conn, sql, params_for(name, sql, args.users, days, rnd))
+        bad = violations(name, plan)
+        mark = "❌" if bad else ("⚪" if name in ALLOWED else "✅")
+        print(f"{mark} {name:24} {' | '.join(plan)}")
+        if name in ALLOWED:
+            print(f"      ↳ ruxsat: {ALLOWED[name][1]}")
+        if bad:
+            failed += 1
+            for detail in bad:
+                print(f"      ↳ {detail}")
+
+    if args.users == DEFAULT_USERS:
+        print("\n⏱️  Vaqt byudjetlari (p95, ms):")
+        for name, budget in BUDGETS_MS.items():
+            sql = sql_all[name]
+            samples = []
+            for _ in range(args.runs):
+                params = params_for(name, sql, args.users, days, rnd)
+                t = time.perf_counter()
+                conn.execute(sql, params).fetchall()
+                samples.append((time.perf_counter() - t) * 1000)
+            p95 = statistics.quantiles(samples, n=20)[-1]
+            ok = p95 <= budget
+            failed += not ok
+            print(f"{'✅' if ok else '❌'} {name:24} p50 {statistics.median(samples):7.3f}  "
+                  f"p95 {p95:7.3f}  byudjet {budget}")
+    else:
+        print(f"\n(vaqt byudjetlari faqat --users {DEFAULT_USERS} da tekshiriladi)")
+    conn.close()
+
+    if failed:
+        print(f"\n❌ {failed} ta muammo", file=sys.stderr)
+        sys.exit(1)
+    print("\n✅ Barcha rejalar va byudjetlar joyida")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# ==============================================================
+# Aliman AI - Javoblarni siqish (gzip / brotli)
+# ==============================================================
+# Accept-Encoding bo'yicha kelishuv: br (brotli o'rnatilgan bo'lsa),
+# keyin gzip. Siqilmaydi: COMPRESS_MIN_SIZE dan kichik tanalar (sarlavha
+# va CPU tejalganidan qimmat), allaqachon kodlangan yoki matn bo'lmagan
+# javoblar, 204/206/304.
+#
+# Generator (stream) javoblar bo'laklab siqiladi: har bir bo'lakdan keyin
+# flush — mijoz ma'lumotni kechikmasdan oladi, Content-Length olib
+# tashlanadi. Statistika (siqish nisbati, CPU vaqti) kodlash bo'yicha
+# yig'iladi: GET /api/admin/compression-stats.
+#
+#   python3 compress.py [n_messages]   — chat tarixi namunasida o'lchash
+# ==============================================================
+
+import os
+import threading
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:  # ixtiyoriy bog'liqlik
+    brotli = None
+
+MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", 4))  # dinamik javoblar uchun tez
+
+COMPRESSIBLE = ("text/", "application/json", "application/javascript",
+                "application/manifest+json", "image/svg+xml")
+
+
+def negotiate(accept: str):
+    """Accept-Encoding dan eng yaxshi kodlash: 'br', 'gzip' yoki None"""
+    if not accept:
+        return None
+    q = {}
+    for part in accept.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        q[name.strip()] = weight
+    star = q.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in (("br", "gzip") if brotli is not None else ("gzip",)):
+        weight = q.get(name, star)
+        if weight > best_q:
+            best, best_q = name, weight
+    return best
+
+
+# -------------------------------------------------------
+# Siqgichlar: process(bo'lak) / finish() — bir xil interfeys
+# -------------------------------------------------------
+class _Gzip:
+    def __init__(self):
+        self.z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip sarlavhasi
+
+    def process(self, data: bytes, flush: bool = False) -> bytes:
+        out = self.z.compress(data)
+        return out + self.z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self.z.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self.c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def process(self, data: bytes, flush: bool = False) -> bytes:
+        out = self.c.process(data)
+        return out + self.c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self.c.finish()
+
+
+ENCODERS = {"gzip": _Gzip, "br": _Brotli}
+
+
+def _weaken_etag(headers):
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        # tana baytlari o'zgardi — kuchli ETag endi to'g'ri emas
+        headers["ETag"] = "W/" + etag
+
+
+class Compressor:
+    def __init__(self, min_size: int = MIN_SIZE):
+        self.min_size = min_size
+        self.lock = threading.Lock()
+        self.stats_by = {}  # kodlash -> hisoblagichlar
+        self.skipped = {"small": 0, "type": 0, "encoded": 0, "status": 0, "no_accept": 0}
+
+    def _skip(self, why: str):
+        with self.lock:
+            self.skipped[why] += 1
+
+    def _record(self, encoding: str, raw: int, out: int, cpu: float, streamed: bool):
+        with self.lock:
+            s = self.stats_by.setdefault(encoding, {"responses": 0, "streamed": 0, "bytes_in": 0,
+                                                    "bytes_out": 0, "cpu_seconds": 0.0})
+            s["responses"] += 1
+            s["streamed"] += streamed
+            s["bytes_in"] += raw
+            s["bytes_out"] += out
+            s["cpu_seconds"] += cpu
+
+    def _choose(self, accept: str, status: int, mimetype: str, encoded: bool, length):
+        """(Vary qo'shilsinmi, kodlash | None); length None — noma'lum (stream)"""
+        if not 200 <= status < 300 or status in (204, 206):
+            self._skip("status")
+            return False, None
+        if not (mimetype or "").startswith(COMPRESSIBLE):
+            self._skip("type")
+            return False, None
+        # shu nuqtadan siqiladimi-yo'qmi, javob Accept-Encoding ga bog'liq — keshlar uchun
+        if encoded:
+            self._skip("encoded")
+            return True, None
+        if length is not None and length < self.min_size:
+            self._skip("small")
+            return True, None
+        encoding = negotiate(accept)
+        if encoding is None:
+            self._skip("no_accept")
+        return True, encoding
+
+    def _compress(self, encoding: str, data: bytes) -> bytes:
+        t0 = time.thread_time()
+        enc = ENCODERS[encoding]()
+        out = enc.process(data) + enc.finish()
+        self._record(encoding, len(data), len(out), time.thread_time() - t0, False)
+        return out
+
+    def apply(self, accept: str, response):
+        """after_request: mos bo'lsa javobni joyida siqadi (werkzeug Response)"""
+        streamed = response.direct_passthrough or response.is_streamed
+        vary, encoding = self._choose(
+            accept, response.status_code, response.mimetype, "Content-Encoding" in response.headers,
+            response.content_length if streamed else len(response.get_data()))
+        if vary:
+            response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+        if streamed:
+            response.direct_passthrough = False
+            response.response = self._stream(encoding, response.response)
+            del response.headers["Content-Length"]
+        else:
+            response.set_data(self._compress(encoding, response.get_data()))
+        response.headers["Content-Encoding"] = encoding
+        _weaken_etag(response.headers)
+        return response
+
+    def apply_parts(self, accept: str, status: int, mimetype: str, headers: dict, body):
+        """Framework'siz variant (main.py): headers joyida o'zgaradi, yangi tana qaytadi.
+        body — bytes yoki bo'laklar iteratori"""
+        streamed = not isinstance(body, bytes)
+        vary, encoding = self._choose(accept, status, mimetype, "Content-Encoding" in headers,
+                                      None if streamed else len(body))
+        if vary:
+            current = headers.get("Vary")
+            headers["Vary"] = f"{current}, Accept-Encoding" if current else "Accept-Encoding"
+        if encoding is None:
+            return body
+        if streamed:
+            body = self._stream(encoding, body)
+            headers.pop("Content-Length", None)
+        else:
+            body = self._compress(encoding, body)
+        headers["Content-Encoding"] = encoding
+        _weaken_etag(headers)
+        return body
+
+    def _stream(self, encoding: str, chunks):
+        """Generator javobni bo'laklab siqish; statistika oqim tugaganda yoziladi"""
+        enc = ENCODERS[encoding]()
+        raw = out = 0
+        cpu = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                if not chunk:
+                    continue
+                t0 = time.thread_time()
+                data = enc.process(chunk, flush=True)
+                cpu += time.thread_time() - t0
+                raw += len(chunk)
+                out += len(data)
+                yield data
+            t0 = time.thread_time()
+            tail = enc.finish()
+            cpu += time.thread_time() - t0
+            out += len(tail)
+            yield tail
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()  # send_file fayli / generator yopiladi
+        self._record(encoding, raw, out, cpu, True)
+
+    def stats(self) -> dict:
+        with self.lock:
+            by = {}
+            for name, s in self.stats_by.items():
+                by[name] = dict(s, ratio=round(s["bytes_out"] / s["bytes_in"], 4) if s["bytes_in"] else None,
+                                cpu_ms_per_mb=round(s["cpu_seconds"] * 1000 / (s["bytes_in"] / 1e6), 2)
+                                if s["bytes_in"] else None)
+            return {"min_size": self.min_size, "brotli": brotli is not None,
+                    "encodings": by, "skipped": dict(self.skipped)}
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    messages = [{"id": i, "role": "user" if i % 2 else "assistant",
+                 "content": f"Bugun {i % 7 + 1} soat kitob o'qidim va rejalarimni bajardim 📚",
+                 "created_at": f"2026-10-{i % 28 + 1:02d} 12:{i % 60:02d}:00"} for i in range(n)]
+    body = json.dumps({"messages": messages}, ensure_ascii=False).encode()
+    print(f"chat/history: {n} xabar, {len(body)} bayt")
+    for name in ENCODERS if brotli is not None else ("gzip",):
+        t0 = time.perf_counter()
+        enc = ENCODERS[name]()
+        out = enc.process(body) + enc.finish()
+        dt = time.perf_counter() - t0
+        print(f"  {name:5s} {len(out):8d} bayt  nisbat {len(out) / len(body):.3f}  {dt * 1000:.2f} ms")
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# ==============================================================
+# Adapterlar mosligi + tezligi: Flask (server.py) va FastAPI (main.py)
+# Ishga tushirish: python3 conformance.py [--repeat 300] [--json] [--out natijalar.jsonl]
+# ==============================================================
+# Har bir adapter alohida jarayonda, o'zining vaqtinchalik bazasi bilan
+# ishga tushadi (core modul darajasidagi holat aralashmasligi uchun) va
+# bir xil ssenariyni bajaradi: auth, yozuvlar, idempotency, ETag/304,
+# xatolar, admin, muddati o'tgan JWT. Javoblar (status, asosiy sarlavhalar,
+# normallashtirilgan JSON) qadamma-qadam taqqoslanadi — farq bo'lsa
+# chiqish kodi 1.
+#
+# Keyin issiq endpointlar jarayon ichidagi test mijozi orqali `--repeat`
+# marta o'lchanadi (p50/p95, mks). Bu tarmoqsiz adapter + core narxi;
+# mijozlar turlicha (werkzeug / httpx), shuning uchun farqni tendensiya
+# sifatida o'qing. FastAPI yoki httpx o'rnatilmagan bo'lsa — o'tkazib
+# yuboriladi. Rate limitlar o'lchov uchun o'chirilgan (yuqori chegaralar).
+# ==============================================================
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ADAPTERS = ("flask", "fastapi")
+ADMIN_TOKEN = "conformance-admin"
+SKIPPED = 3  # bola jarayon chiqish kodi: adapter kutubxonasi yo'q
+
+COMPARED_HEADERS = ("content-type", "etag", "cache-control", "idempotent-replayed",
+                    "retry-after", "content-encoding", "vary", "access-control-allow-origin")
+_loads = json.loads  # Recorder da `json` argument nomi bilan to'qnashmasligi uchun
+VOLATILE_KEYS = {"token": "<token>", "created_at": "<ts>", "computed_at": "<ts>", "started_at": "<ts>",
+                 "ended_at": "<ts>", "value": "<sig>", "ws": "<adapter>"}  # ws: faqat FastAPI da /ws bor
+
+
+# -------------------------------------------------------
+# Bola jarayon: adapterni ko'tarish va call(method, path, ...) berish
+# -------------------------------------------------------
+def flask_client():
+    import server
+    client = server.app.test_client()
+
+    def call(method, path, json=None, headers=None, data=None):
+        r = client.open(path, method=method, json=json, data=data, headers=headers)
+        return r.status_code, dict(r.headers), r.get_data()
+    return call, None
+
+
+def fastapi_client():
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:  # fastapi yoki httpx yo'q
+        return None, None
+    import main
+    client = TestClient(main.app, raise_server_exceptions=False)
+    client.__enter__()  # lifespan: isitish
+
+    def call(method, path, json=None, headers=None, data=None):
+        r = client.request(method, path, json=json, content=data, headers=headers)
+        return r.status_code, dict(r.headers), r.content
+    return call, lambda: client.__exit__(None, None, None)
+
+
+def normalize(value):
+    """Vaqt, token va imzo kabi har safar farq qiladigan qiymatlarni belgilar bilan almashtirish"""
+    if isinstance(value, dict):
+        return {k: VOLATILE_KEYS[k] if k in VOLATILE_KEYS and value[k] is not None else normalize(v)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    return value
+
+
+def scrub_header(name: str, value: str) -> str:
+    if name == "content-type":
+        return value.split(";")[0].strip()
+    if name == "etag":
+        # W/"<epoch>.<avlod>.<variant>" — epoch jarayonga xos
+        return value.split(".", 1)[-1]
+    return value
+
+
+class Recorder:
+    def __init__(self, call):
+        self.call = call
+        self.token = None
+        self.steps = []
+
+    def __call__(self, name, method, path, json=None, headers=None, data=None, auth=True,
+                 compare=("status", "headers", "body")):
+        h = {"Accept-Encoding": "identity"}
+        if auth and self.token:
+            h["Authorization"] = "Bearer " + self.token
+        h.update(headers or {})
+        status, hdrs, raw = self.call(method, path, json=json, headers=h, data=data)
+        hdrs = {k.lower(): v for k, v in hdrs.items()}
+        body = None
+        if hdrs.get("content-type", "").startswith("application/json") and raw \
+                and "content-encoding" not in hdrs:
+            body = _loads(raw)
+        step = {"step": name, "status": status}
+        if "headers" in compare:
+            step["headers"] = {k: scrub_header(k, hdrs[k]) for k in COMPARED_HEADERS if k in hdrs}
+        elif "content-type" in compare:
+            step["headers"] = {"content-type": scrub_header("content-type", hdrs.get("content-type", ""))}
+        if "body" in compare:
+            step["body"] = normalize(body) if body is not None else hashlib.sha1(raw).hexdigest()[:12]
+        self.steps.append(step)
+        return status, hdrs, body
+
+
+def scenario(call) -> list:
+    import jwt
+    import core
+
+    rec = Recorder(call)
+    admin = {"X-Admin-Token": ADMIN_TOKEN}
+    rec("healthz", "GET", "/healthz")
+    rec("readyz", "GET", "/readyz")
+    rec("options", "OPTIONS", "/api/plans", compare=("status",))
+    rec("frontend", "GET", "/", compare=("status", "content-type"))
+
+    # === auth ===
+    _, _, body = rec("register", "POST", "/api/register",
+                     json={"username": "conform", "password": "secret1", "timezone": "Asia/Tashkent"})
+    rec.token = body["token"]
+    rec("register_taken", "POST", "/api/register", json={"username": "conform", "password": "secret1"})
+    rec("register_short", "POST", "/api/register", json={"username": "ab", "password": "secret1"})
+    rec("register_not_json", "POST", "/api/register", data=b"salom",
+        headers={"Content-Type": "text/plain"})
+    rec("login_bad", "POST", "/api/login", json={"username": "conform", "password": "xato"}, auth=False)
+    rec("login", "POST", "/api/login", json={"username": "conform", "password": "secret1"}, auth=False)
+    rec("no_auth", "GET", "/api/dashboard", auth=False)
+    rec("bad_token", "GET", "/api/dashboard", headers={"Authorization": "Bearer yaroqsiz"})
+    now = int(time.time())
+    expired = jwt.encode({"sub": "1", "username": "conform", "exp": now - 60}, core.SECRET_KEY, algorithm="HS256")
+    rec("jwt_expired", "GET", "/api/dashboard", headers={"Authorization": "Bearer " + expired})
+    no_exp = jwt.encode({"sub": "1", "username": "conform"}, core.SECRET_KEY, algorithm="HS256")
+    rec("jwt_no_exp", "GET", "/api/dashboard", headers={"Authorization": "Bearer " + no_exp})
+    valid = jwt.encode({"sub": "1", "username": "conform", "exp": now + 600}, core.SECRET_KEY, algorithm="HS256")
+    rec("jwt_valid", "GET", "/api/review", headers={"Authorization": "Bearer " + valid})
+    rec("timezone_bad", "PUT", "/api/profile/timezone", json={"timezone": "Mars/Olympus"})
+
+    # === dashboard va ETag ===
+    _, hdrs, _ = rec("dashboard", "GET", "/api/dashboard")
+    rec("dashboard_304", "GET", "/api/dashboard", headers={"If-None-Match": hdrs.get("etag", "")})
+
+    # === rejalar, idempotency ===
+    rec("plan_empty", "POST", "/api/plans", json={"plan_text": "  "})
+    _, _, body = rec("plan", "POST", "/api/plans", json={"plan_text": "kitob o'qish"},
+                     headers={"Idempotency-Key": "k-1"})
+    rec("plan_replay", "POST", "/api/plans", json={"plan_text": "kitob o'qish"},
+        headers={"Idempotency-Key": "k-1"})
+    rec("plan_key_mismatch", "POST", "/api/plans", json={"plan_text": "boshqa"},
+        headers={"Idempotency-Key": "k-1"})
+    rec("plan_complete", "PUT", f"/api/plans/{body['id']}/complete")
+    rec("dashboard_after_write", "GET", "/api/dashboard", headers={"If-None-Match": hdrs.get("etag", "")})
+
+    # === fokus ===
+    rec("focus_bad_minutes", "POST", "/api/focus/start", json={"planned_minutes": "ko'p"})
+    _, _, body = rec("focus_start", "POST", "/api/focus/start", json={"planned_minutes": 25})
+    rec("focus_end", "POST", "/api/focus/end",
+        json={"session_id": body["session_id"], "exit_reason": "youtube", "exit_type": "distracted"})
+    rec("focus_end_missing", "POST", "/api/focus/end", json={"session_id": 999999})
+    rec("analyze_exit", "GET", "/api/focus/analyze-exit?reason=suv%20ichish")
+
+    # === chat va siqish ===
+    rec("chat_empty", "POST", "/api/chat", json={"message": ""})
+    for i, text in enumerate(("salom", "zerikdim", "bugun reja", "yordam", "kitob o'qidim",
+                              "charchadim", "nima qilay", "rahmat")):
+        rec(f"chat_{i}", "POST", "/api/chat", json={"message": text})
+    rec("chat_history", "GET", "/api/chat/history?limit=5")
+    rec("chat_history_bad_limit", "GET", "/api/chat/history?limit=abc")
+    # tana httpx tomonidan ochiladi, werkzeug — yo'q: faqat sarlavhalar
+    rec("chat_history_gzip", "GET", "/api/chat/history?limit=50",
+        headers={"Accept-Encoding": "gzip"}, compare=("status", "headers"))
+
+    # === delta sync ===
+    _, _, body = rec("sync_full", "GET", "/api/sync?since=0")
+    head = body["seq"]
+    rec("sync_empty", "GET", f"/api/sync?since={head}")
+    rec("sync_page", "GET", "/api/sync?since=0&limit=3")
+    rec("sync_reset", "GET", f"/api/sync?since={head + 1000}")
+    rec("sync_bad_since", "GET", "/api/sync?since=x")
+    mutations = [{"id": "m1", "op": "plan.create", "plan_text": "oflayn reja"},
+                 {"id": "m2", "op": "plan.complete", "plan_id": "$m1"},
+                 {"id": "m3", "op": "chat.send", "message": "salom"},
+                 {"id": "m4", "op": "plan.create", "plan_text": ""},
+                 {"id": "m5", "op": "focus.start"}]
+    rec("sync_push", "POST", "/api/sync", json={"since": head, "mutations": mutations})
+    rec("sync_push_replay", "POST", "/api/sync", json={"since": head, "mutations": mutations[:3]})
+
+    # === o'qish endpointlari ===
+    rec("review", "GET", "/api/review")
+    rec("analytics", "GET", "/api/analytics", compare=("status",))
+    rec("search", "GET", "/api/search?q=kit")
+    rec("search_bad_type", "GET", "/api/search?q=kit&type=foo")
+    rec("not_found", "GET", "/api/yoq", compare=("status",))
+
+    # === admin ===
+    rec("admin_forbidden", "GET", "/api/admin/cache-stats")
+    rec("admin_cache", "GET", "/api/admin/cache-stats", headers=admin, compare=("status",))
+    rec("admin_slow_bad", "GET", "/api/admin/slow-queries?threshold_ms=x", headers=admin)
+    rec("admin_profile_sign", "POST", "/api/admin/profile", json={"seconds": 5, "header": True}, headers=admin)
+    rec("admin_profile_missing", "GET", "/api/admin/profile/yoq", headers=admin)
+
+    # === chat stream (SSE) — oxirida: javob fonda yoziladi, keyingi qadamlarga ta'sir qilmasin ===
+    rec("chat_stream_empty", "POST", "/api/chat/stream", json={"message": " "})
+    rec("chat_stream", "POST", "/api/chat/stream", json={"message": "zerikdim"})
+    return rec.steps
+
+
+# -------------------------------------------------------
+# Tezlik: issiq endpointlar
+# -------------------------------------------------------
+def bench(call, repeat: int) -> dict:
+    status, _, raw = call("POST", "/api/register", json={"username": "bench", "password": "secret1"},
+                          headers={})
+    auth = {"Authorization": "Bearer " + json.loads(raw)["token"]}
+    call("POST", "/api/plans", json={"plan_text": "bench reja"}, headers=auth)
+    for i in range(20):
+        call("POST", "/api/chat", json={"message": f"salom {i}"}, headers=auth)
+    _, hdrs, _ = call("GET", "/api/dashboard", headers=auth)
+    etag = {k.lower(): v for k, v in hdrs.items()}["etag"]
+    head = json.loads(call("GET", "/api/sync?since=0", headers=auth)[2])["seq"]
+
+    cases = {
+        "healthz": ("GET", "/healthz", None, {}),
+        "dashboard": ("GET", "/api/dashboard", None, auth),
+        "dashboard_304": ("GET", "/api/dashboard", None, {**auth, "If-None-Match": etag}),
+        "chat_history": ("GET", "/api/chat/history?limit=20", None, auth),
+        "analyze_exit": ("GET", "/api/focus/analyze-exit?reason=youtube", None, auth),
+        "review": ("GET", "/api/review", None, auth),
+        "sync_head": ("GET", f"/api/sync?since={head}", None, auth),
+        "sync_delta": ("GET", "/api/sync?since=0", None, auth),
+        "plan_create": ("POST", "/api/plans", {"plan_text": "o'lchov"}, auth),
+    }
+    out = {}
+    for name, (method, path, body, headers) in cases.items():
+        for _ in range(10):
+            call(method, path, json=body, headers=headers)
+        samples = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            call(method, path, json=body, headers=headers)
+            samples.append((time.perf_counter() - t) * 1e6)
+        out[name] = {"p50_us": round(statistics.median(samples), 1),
+                     "p95_us": round(statistics.quantiles(samples, n=20)[-1], 1)}
+    return out
+
+
+def child(adapter: str, repeat: int, result: str):
+    if not os.environ.get("DATABASE_URL"):
+        sys.exit("--child faqat run_child orqali (vaqtinchalik baza bilan) ishga tushadi")
+    import core
+    call, close = (flask_client if adapter == "flask" else fastapi_client)()
+    if call is None:
+        sys.exit(SKIPPED)
+    if not core.READY.wait(30):
+        sys.exit("isitish tugamadi")
+    report = {"steps": scenario(call), "timings": bench(call, repeat)}
+    if close:
+        close()
+    with open(result, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False)
+
+
+# -------------------------------------------------------
+# Ota jarayon: har bir adapterni alohida ishga tushirish va taqqoslash
+# -------------------------------------------------------
+def run_child(adapter: str, repeat: int):
+    tmp = tempfile.mkdtemp(prefix=f"conform-{adapter}-")
+    result = os.path.join(tmp, "result.json")
+    env = dict(os.environ, DATABASE_URL=os.path.join(tmp, "aliman.db"), ADMIN_TOKEN=ADMIN_TOKEN,
+               PROFILE_DIR=os.path.join(tmp, "profiles"), TOKEN_FORMAT="compact")
+    env.pop("CACHE_URL", None)
+    env.pop("RATELIMIT_URL", None)
+    for route in ("login", "register", "chat", "write", "read"):
+        for kind in ("user", "ip"):
+            env[f"RATELIMIT_{route.upper()}_{kind.upper()}"] = "1000000/1000000"
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", adapter,
+                           "--repeat", str(repeat), "--result", result],
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                          capture_output=True, text=True)
+    if proc.returncode == SKIPPED:
+        return None
+    if proc.returncode != 0:
+        sys.exit(f"❌ {adapter}: bola jarayon xatosi\n{proc.stdout}\n{proc.stderr}")
+    with open(result, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(reports: dict) -> list:
+    """Birinchi adapter namuna; qolganlari qadamma-qadam taqqoslanadi"""
+    names = list(reports)
+    base = reports[names[0]]["steps"]
+    diffs = []
+    for other in names[1:]:
+        steps = reports[other]["steps"]
+        for a, b in zip(base, steps):
+            if a != b:
+                diffs.append({"step": a["step"], names[0]: a, other: b})
+        if len(base) != len(steps):
+            diffs.append({"step": "<qadamlar soni>", names[0]: len(base), other: len(steps)})
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask va FastAPI adapterlari: moslik va tezlik")
+    parser.add_argument("--adapters", default=",".join(ADAPTERS))
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--json", action="store_true", help="natijani JSON sifatida chiqarish")
+    parser.add_argument("--out", help="natijani JSON qatori sifatida shu faylga qo'shish")
+    parser.add_argument("--child", choices=ADAPTERS, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.repeat, args.result)
+        return
+
+    reports, skipped = {}, []
+    for adapter in args.adapters.split(","):
+        report = run_child(adapter, args.repeat)
+        if report is None:
+            skipped.append(adapter)
+        else:
+            reports[adapter] = report
+    diffs = compare(reports) if len(reports) > 1 else []
+    summary = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+               "repeat": args.repeat, "skipped": skipped,
+               "steps": len(next(iter(reports.values()))["steps"]) if reports else 0,
+               "diffs": diffs, "timings": {a: r["timings"] for a, r in reports.items()}}
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        for adapter in skipped:
+            print(f"⚪ {adapter}: o'tkazib yuborildi (kutubxona o'rnatilmagan)")
+        if len(reports) > 1:
+            mark = "❌" if diffs else "✅"
+            print(f"{mark} Moslik: {summary['steps']} qadam, {len(diffs)} ta farq ({', '.join(reports)})")
+            for d in diffs:
+                print(f"   ↳ {d['step']}:")
+                for adapter in reports:
+                    print(f"      {adapter:8} {json.dumps(d.get(adapter), ensure_ascii=False)}")
+        print("\n⏱️  Tezlik (p50 / p95, mks):")
+        print(f"{'':15}" + "".join(f"{a:>22}" for a in reports))
+        for name in next(iter(reports.values()))["timings"] if reports else ():
+            print(f"{name:15}" + "".join(
+                f"{r['timings'][name]['p50_us']:>11.1f} / {r['timings'][name]['p95_us']:<8.1f}"
+                for r in reports.values()))
+
+    if diffs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1019 @@
+# ==============================================================
+# Aliman AI - Umumiy yadro (framework'dan mustaqil)
+# ==============================================================
+# Ma'lumotlar (storage.py), keshlar, AI qoidalari, analitika, auth,
+# rate limiting, idempotency va barcha endpointlar mantiqi — shu yerda,
+# bir marta. Adapterlar faqat HTTP so'rovni Request ga va Response ni
+# o'z javob turiga o'giradi:
+#   server.py — Flask (WSGI)      main.py — FastAPI (ASGI)
+#
+# Marshrutlar ROUTES jadvalida (@route); dispatch() ularni bir xil
+# quvur orqali o'tkazadi: profiler -> admin/auth -> rate limit ->
+# idempotency -> handler. Xatolar — ApiError(status, detail).
+# Ikkala stek bir xil javob berishini conformance.py tekshiradi.
+# ==============================================================
+
+import hashlib
+import hmac
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import ai
+import analytics
+import cache
+import compress
+import fastjson
+import focus
+import idempotency
+import profiler
+import queries
+import ratelimit
+import reasons
+import scheduler
+import search
+import slowlog
+import storage
+import tokens
+import usertime
+
+# -------------------------------------------------------
+# Konfiguratsiya
+# -------------------------------------------------------
+SECRET_KEY = "aliman-ai-secret-2024-uzbekistan"
+JWT_EXPIRE_HOURS = 24
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")  # bo'sh bo'lsa admin endpointlar o'chiq
+TOKEN_FORMAT = os.environ.get("TOKEN_FORMAT", "compact")  # 'compact' (tokens.py) yoki 'jwt'
+DB_PATH = os.path.join(os.path.dirname(__file__), "aliman.db")
+FRONTEND_PATH = os.path.join(os.path.dirname(__file__), "..", "frontend")
+TRUST_PROXY = os.environ.get("TRUST_PROXY") == "1"  # Heroku/nginx ortida X-Forwarded-For
+
+# Frontend bilan ishlash uchun; adapterlar har bir javobga qo'shadi
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, Idempotency-Key, If-None-Match, X-Profile',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Expose-Headers': 'ETag',
+}
+
+# Adapter imkoniyatlari: main.py /ws ni ulaganda FEATURES["ws"] = True.
+# login/register javobida mijozga beriladi — Flask da soket ochilmaydi.
+FEATURES = {"ws": False}
+
+# -------------------------------------------------------
+# So'rov / javob / xato
+# -------------------------------------------------------
+_UNSET = object()
+
+
+class ApiError(Exception):
+    """Handler yoki quvurdan: {"detail": ...} javobi"""
+
+    def __init__(self, status: int, detail: str, headers: dict = None):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.headers = headers
+
+    def response(self):
+        return json_response({"detail": self.detail}, self.status, self.headers)
+
+
+class Request:
+    """Adapter to'ldiradi: args va headers — .get() li mapping (headers katta-kichik
+    harfga befarq), body — xom baytlar"""
+
+    __slots__ = ("method", "path", "endpoint", "args", "headers", "body", "remote_addr", "user", "_json")
+
+    def __init__(self, method: str, path: str, args, headers, body: bytes = b"",
+                 remote_addr: str = None, endpoint: str = None):
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint
+        self.args = args
+        self.headers = headers
+        self.body = body or b""
+        self.remote_addr = remote_addr
+        self.user = None
+        self._json = _UNSET
+
+    def json(self, silent: bool = False) -> dict:
+        """JSON obyekt tanasi; silent — xato o'rniga {}"""
+        if self._json is _UNSET:
+            try:
+                data = fastjson.loads(self.body) if self.body else None
+            except ValueError:
+                data = None
+            self._json = data if isinstance(data, dict) else None
+        if self._json is None:
+            if silent:
+                return {}
+            raise ApiError(400, "So'rov tanasi JSON obyekt bo'lishi kerak")
+        return self._json
+
+    def arg(self, name: str, default=None, type=None):
+        """Query parametri; type o'gira olmasa — default (Flask args.get kabi)"""
+        value = self.args.get(name)
+        if value is None:
+            return default
+        if type is None:
+            return value
+        try:
+            return type(value)
+        except (TypeError, ValueError):
+            return default
+
+
+class Response:
+    __slots__ = ("status", "body", "mimetype", "headers")
+
+    def __init__(self, body=b"", status: int = 200, mimetype: str = "application/json",
+                 headers: dict = None):
+        self.body = body  # bytes yoki bo'laklar iteratori (stream)
+        self.status = status
+        self.mimetype = mimetype
+        self.headers = headers or {}
+
+
+def json_response(obj, status: int = 200, headers: dict = None) -> Response:
+    return Response(fastjson.dumps(obj), status, "application/json", dict(headers) if headers else None)
+
+
+def _to_response(rv) -> Response:
+    """Handler qaytargan qiymat: Response, dict yoki (dict, status)"""
+    if isinstance(rv, Response):
+        return rv
+    if isinstance(rv, tuple):
+        return json_response(rv[0], rv[1])
+    return json_response(rv)
+
+# -------------------------------------------------------
+# Ma'lumotlar bazasi va umumiy komponentlar
+# -------------------------------------------------------
+store = storage.from_env(DB_PATH)
+data_cache = cache.default  # L1 + ixtiyoriy umumiy L2 (CACHE_URL)
+focus_registry = focus.FocusRegistry(store)
+jobs = scheduler.JobScheduler(store)
+compressor = compress.Compressor()  # gzip/brotli, adapterlar javobga qo'llaydi
+
+# Profiler (profiler.py): ADMIN_TOKEN bo'lmasa dispatch uni chaqirmaydi.
+# X-Profile imzo kaliti — PROFILE_SECRET yoki ADMIN_TOKEN dan (SECRET_KEY
+# repoda ochiq: undan olingan kalit bilan har kim sarlavha imzolay olardi)
+request_profiler = profiler.Profiler(
+    hmac.new((os.environ.get("PROFILE_SECRET") or ADMIN_TOKEN).encode(),
+             b"aliman-profile", hashlib.sha256).digest())
+
+
+def init_db():
+    """Jadvallarni yaratish (sxema versiyasi mos bo'lsa — o'tkazib yuboriladi)"""
+    if store.init_schema():
+        print("✅ Ma'lumotlar bazasi yaratildi/yangilandi:", store.name)
+    else:
+        print("✅ Ma'lumotlar bazasi tayyor:", store.name)
+
+# -------------------------------------------------------
+# Tez ishga tushish: fon rejimida isitish va /readyz
+# -------------------------------------------------------
+FAST_START = os.environ.get("FAST_START") == "1"  # init_db ham fonda bajariladi
+READY = threading.Event()
+
+
+def warmup(run_init_db: bool):
+    """Og'ir importlar, DB puli va statement keshlarini oldindan tayyorlash"""
+    t0 = time.perf_counter()
+    try:
+        if run_init_db:
+            init_db()
+        import jwt  # noqa: F401 — birinchi so'rovda ~60ms yo'qotmaslik uchun
+        store.warm()
+        focus_registry.load()
+        jobs.load()
+        schedule_nightly('exit_classify')
+        schedule_nightly('jobs_purge')
+        if analytics.available():
+            schedule_nightly('analytics_batch')
+        READY.set()
+        print(f"🔥 Isitish tugadi: {(time.perf_counter() - t0) * 1000:.0f} ms")
+        if store.search_pending:
+            # migratsiyadan oldingi yozuvlar — qidiruv shu vaqtda qisman ishlaydi
+            search.backfill(store, store.search_pending)
+            store.search_pending = {}
+    except Exception as e:
+        print("❌ Isitish xatosi:", e)
+
+
+def start_warmup(run_init_db: bool = False):
+    threading.Thread(target=warmup, args=(run_init_db,), name="warmup", daemon=True).start()
+
+# -------------------------------------------------------
+# Parol va Token funksiyalari
+# -------------------------------------------------------
+def hash_password(password: str) -> str:
+    """SHA-256 bilan parolni hashlash (salt bilan)"""
+    salt = "aliman_salt_2024"
+    return hashlib.sha256(f"{salt}{password}{salt}".encode()).hexdigest()
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return hash_password(plain) == hashed
+
+
+# Ixcham tokenlar kaliti: TOKEN_KEYS bo'lmasa SECRET_KEY dan hosil qilinadi
+compact_tokens = tokens.CompactTokens(
+    tokens.parse_keys(os.environ.get("TOKEN_KEYS", ""))
+    or {1: hmac.new(SECRET_KEY.encode(), b"aliman-compact-token", hashlib.sha256).digest()}
+)
+
+# Ixcham tokenda faqat user_id bor — username va zona shu keshdan olinadi
+# (cache.py, "a<id>" scope — zona o'zgarsa bump bilan eskiradi)
+USER_TTL = JWT_EXPIRE_HOURS * 3600
+
+
+def remember_user(user_id: int, username: str, tz: str = None):
+    data_cache.put("user", f"a{user_id}", "", [username, tz], USER_TTL)
+
+
+def cached_user(user_id: int):
+    def load():
+        row = store.get_user_by_id(user_id)
+        return [row['username'], row['timezone']] if row else None
+    return data_cache.get_or_set("user", f"a{user_id}", "", USER_TTL, load)
+
+
+def create_token(user_id: int, username: str, tz: str = None) -> str:
+    """Token yaratish: TOKEN_FORMAT ga qarab ixcham yoki JWT"""
+    remember_user(user_id, username, tz)
+    if TOKEN_FORMAT == "compact":
+        return compact_tokens.encode(user_id, JWT_EXPIRE_HOURS * 3600)
+    import jwt
+    payload = {
+        "sub": str(user_id),  # PyJWT 2.10+ sub ni satr sifatida talab qiladi
+        "username": username,
+        "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRE_HOURS)
+    }
+    if tz:
+        payload["tz"] = tz  # har so'rovda DB dan zona o'qimaslik uchun
+    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+
+
+def decode_token(token: str) -> dict:
+    """Token ni tekshirish va decode qilish (ikkala format ham qabul qilinadi).
+    JWT da exp majburiy tekshiriladi — muddati o'tgan token None"""
+    if '.' not in token:
+        decoded = compact_tokens.decode(token)
+        if decoded is None:
+            return None
+        user = cached_user(decoded[0])
+        if user is None:
+            return None
+        return {"sub": decoded[0], "username": user[0], "tz": user[1]}
+    import jwt
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=["HS256"], options={"require": ["exp"]})
+    except Exception:
+        return None
+
+# -------------------------------------------------------
+# Quvur bosqichlari: auth, admin, rate limit, idempotency
+# -------------------------------------------------------
+def authenticate(req: Request) -> dict:
+    auth = req.headers.get('Authorization', '')
+    if not auth.startswith('Bearer '):
+        raise ApiError(401, "Avtorizatsiya talab etiladi")
+    payload = decode_token(auth[len('Bearer '):])
+    if not payload:
+        raise ApiError(401, "Token yaroqsiz yoki muddati o'tgan")
+    user = {"id": int(payload["sub"]), "username": payload["username"], "tz": payload.get("tz")}
+    ensure_review_job(user['id'], user['tz'])
+    return user
+
+
+def check_admin(req: Request):
+    """X-Admin-Token sarlavhasi ADMIN_TOKEN ga teng bo'lishi kerak"""
+    given = req.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN or not hmac.compare_digest(given.encode(), ADMIN_TOKEN.encode()):
+        raise ApiError(403, "Ruxsat yo'q")
+
+
+def client_ip(req: Request) -> str:
+    if TRUST_PROXY:
+        fwd = req.headers.get('X-Forwarded-For')
+        if fwd:
+            return fwd.split(',')[0].strip()
+    return req.remote_addr
+
+
+def check_rate(route: str, req: Request):
+    """Token bucket: foydalanuvchi ID va IP bo'yicha"""
+    wait = ratelimit.check(route, user_id=req.user and req.user['id'], ip=client_ip(req))
+    if wait:
+        raise ApiError(429, "Juda ko'p so'rov. Biroz kutib, qayta urinib ko'ring",
+                       {'Retry-After': str(math.ceil(wait))})
+
+
+def run_idempotent(req: Request, key: str, call) -> Response:
+    """Idempotency-Key bilan takrorlangan so'rovga saqlangan javobni qaytarish"""
+    if len(key) > idempotency.MAX_KEY_LENGTH:
+        raise ApiError(400, "Idempotency-Key juda uzun")
+    uid = req.user['id']
+    fp = idempotency.fingerprint(req.method, req.path, req.body)
+    state, row = idempotency.begin(store, uid, key, fp)
+    if state == idempotency.REPLAY:
+        return Response(row['body'].encode('utf-8'), row['status_code'],
+                        headers={'Idempotent-Replayed': 'true'})
+    if state == idempotency.MISMATCH:
+        raise ApiError(422, "Bu Idempotency-Key boshqa so'rov uchun ishlatilgan")
+    if state == idempotency.BUSY:
+        raise ApiError(409, "Xuddi shu so'rov hali bajarilmoqda", {'Retry-After': '1'})
+    try:
+        resp = call()
+    except Exception:
+        idempotency.abort(store, uid, key)
+        raise
+    idempotency.finish(store, uid, key, resp.status, resp.body.decode('utf-8'))
+    return resp
+
+
+def etag_matches(header: str, tag: str) -> bool:
+    """If-None-Match zaif taqqoslash: W/ va qo'shtirnoqlar e'tiborsiz, '*' — har qanday"""
+    if not header:
+        return False
+    for part in header.split(','):
+        part = part.strip()
+        if part == '*':
+            return True
+        if part.startswith('W/'):
+            part = part[2:]
+        if part.strip('"') == tag:
+            return True
+    return False
+
+# -------------------------------------------------------
+# Marshrutlar jadvali va dispatch
+# -------------------------------------------------------
+class Route:
+    __slots__ = ("method", "path", "endpoint", "handler", "auth", "limit", "idempotent", "admin")
+
+    def __init__(self, method, path, handler, auth, limit, idempotent, admin):
+        self.method = method
+        self.path = path  # Flask sintaksisi: /api/plans/<int:plan_id>/complete
+        self.endpoint = handler.__name__
+        self.handler = handler
+        self.auth = auth
+        self.limit = limit
+        self.idempotent = idempotent
+        self.admin = admin
+
+
+ROUTES = []
+
+
+def route(method: str, path: str, auth: bool = False, limit: str = None,
+          idempotent: bool = False, admin: bool = False):
+    """Endpointni ROUTES ga qo'shish; handler(req, **path_params)"""
+    def register(f):
+        ROUTES.append(Route(method, path, f, auth, limit, idempotent, admin))
+        return f
+    return register
+
+
+def _call(r: Route, req: Request, params: dict) -> Response:
+    try:
+        return _to_response(r.handler(req, **params))
+    except ApiError as e:  # idempotency saqlashi uchun shu yerda javobga aylanadi
+        return e.response()
+
+
+def dispatch(r: Route, req: Request, params: dict = None, user: dict = None) -> Response:
+    """Adapterlar uchun yagona kirish nuqtasi. user — ulanish boshida tekshirilgan
+    foydalanuvchi (wshub.py): har so'rovda token qayta decode qilinmaydi"""
+    req.endpoint = r.endpoint
+    try:
+        if ADMIN_TOKEN:
+            request_profiler.begin(r.endpoint, req.path, req.headers.get(profiler.HEADER))
+        if r.admin:
+            check_admin(req)
+        if r.auth:
+            req.user = user or authenticate(req)
+        if r.limit:
+            check_rate(r.limit, req)
+        key = req.headers.get('Idempotency-Key') if r.idempotent else None
+        if key:
+            return run_idempotent(req, key, lambda: _call(r, req, params or {}))
+        return _call(r, req, params or {})
+    except ApiError as e:
+        return e.response()
+    finally:
+        if ADMIN_TOKEN:
+            request_profiler.end()
+
+# -------------------------------------------------------
+# AI Mantiq (Kalit so'z tahlili, ai.py)
+# -------------------------------------------------------
+def ai_end_of_day(user_id: int, day: str = None) -> str:
+    today = day or datetime.now().strftime('%Y-%m-%d')
+    return ai.end_of_day_report(store.day_stats(user_id, today), store.plans_for_day(user_id, today))
+
+# -------------------------------------------------------
+# Kun yakuni: foydalanuvchi kuni tugashiga yaqin oldindan hisoblash
+# -------------------------------------------------------
+REVIEW_AT = (23, 30)  # foydalanuvchining mahalliy vaqti
+REVIEW_JOB_MEMO = 10000  # to'lsa tozalanadi: eskilari uchun faqat bitta ortiqcha INSERT OR IGNORE
+_review_job_day = {}  # user_id -> shu jarayonda vazifa qo'yilgan kun
+_review_job_lock = threading.Lock()
+
+
+def ensure_review_job(user_id: int, tz: str = None):
+    """Faol foydalanuvchi uchun bugungi kun yakuni vazifasini bir marta qo'yish"""
+    now = usertime.now_for(tz)
+    day = now.strftime('%Y-%m-%d')
+    with _review_job_lock:
+        if _review_job_day.get(user_id) == day:
+            return
+        if len(_review_job_day) >= REVIEW_JOB_MEMO:
+            _review_job_day.clear()
+        _review_job_day[user_id] = day
+    run_at = now.replace(hour=REVIEW_AT[0], minute=REVIEW_AT[1], second=0, microsecond=0)
+    if run_at > now:
+        jobs.enqueue('eod_review', user_id, day, run_at)
+
+
+def precompute_review(user_id: int, day: str):
+    store.put_review(user_id, day, ai_end_of_day(user_id, day), usertime.stamp(usertime.utcnow()))
+
+
+jobs.register('eod_review', precompute_review)
+
+
+# O'zgarish obunachilari: fn(user_id, topic) — yozuvchi oqimida chaqiriladi,
+# shuning uchun tez va bloklanmaydigan bo'lishi kerak (wshub.Hub.publish)
+CHANGE_LISTENERS = []
+
+
+def publish_change(user_id: int, topic: str):
+    for listener in CHANGE_LISTENERS:
+        listener(user_id, topic)
+
+
+def data_changed(user_id: int, tz: str = None):
+    """Har bir yozuvdan keyin: "u<id>" keshlari (dashboard, review) eskiradi"""
+    data_cache.bump(f"u{user_id}")
+    review_dirty(user_id, tz)
+    publish_change(user_id, "dashboard")
+
+
+def conditional(req: Request, variant: str, build) -> Response:
+    """Shartli GET: If-None-Match joriy ETag ga mos bo'lsa — so'rovlarsiz 304.
+    ETag build() dan OLDIN olinadi: parallel yozuv bo'lsa keyingi so'rov yangilanadi"""
+    tag = data_cache.etag(f"u{req.user['id']}", variant)
+    if etag_matches(req.headers.get('If-None-Match'), tag):
+        response = Response(b"", 304, None)
+    else:
+        response = _to_response(build())
+    response.headers['ETag'] = f'W/"{tag}"'
+    response.headers['Cache-Control'] = 'private, no-cache'  # brauzer har safar qayta tekshiradi
+    return response
+
+
+def review_dirty(user_id: int, tz: str = None):
+    """Saqlangan bugungi tahlil (oldindan yoki joyida hisoblangan) yozuvdan keyin eskiradi"""
+    store.delete_review(user_id, usertime.today_for(tz))
+
+# -------------------------------------------------------
+# Tungi batchlar: barcha foydalanuvchilar bo'yicha, server vaqtida
+# -------------------------------------------------------
+NIGHTLY = {
+    'exit_classify': (3, 0),     # reasons.py: exit_category backfill
+    'analytics_batch': (3, 30),  # analytics.py: user_analytics keshi
+    'jobs_purge': (4, 0),        # tugagan vazifalar: har kuni har foydalanuvchiga bitta eod_review
+}
+JOB_RETENTION_DAYS = 14
+
+
+def schedule_nightly(kind: str):
+    now = datetime.now().astimezone()
+    hour, minute = NIGHTLY[kind]
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    jobs.enqueue(kind, 0, run_at.strftime('%Y-%m-%d'), run_at)
+
+
+# Keyingi kechasi xato bo'lsa ham qo'yiladi: MAX_ATTEMPTS dan keyin vazifa
+# 'failed' bo'lib qoladi va handler boshqa chaqirilmaydi
+def run_exit_classify(_user_id: int, _day: str):
+    try:
+        t0 = time.perf_counter()
+        count = reasons.backfill(store)
+        print(f"🏷️  Chiqish sabablari: {count} ta tasniflandi, {(time.perf_counter() - t0) * 1000:.0f} ms")
+    finally:
+        schedule_nightly('exit_classify')
+
+
+def run_analytics_batch(_user_id: int, _day: str):
+    try:
+        t0 = time.perf_counter()
+        count = analytics.batch(store)
+        print(f"📈 Analitika: {count} foydalanuvchi, {(time.perf_counter() - t0) * 1000:.0f} ms")
+    finally:
+        schedule_nightly('analytics_batch')
+
+
+def run_jobs_purge(_user_id: int, _day: str):
+    try:
+        before = usertime.stamp(usertime.utcnow() - timedelta(days=JOB_RETENTION_DAYS))
+        print(f"🧹 Eski vazifalar: {store.purge_jobs(before)} ta o'chirildi")
+    finally:
+        schedule_nightly('jobs_purge')
+
+
+jobs.register('exit_classify', run_exit_classify)
+jobs.register('analytics_batch', run_analytics_batch)
+jobs.register('jobs_purge', run_jobs_purge)
+
+# -------------------------------------------------------
+# API Endpointlar
+# -------------------------------------------------------
+
+# === AUTH ===
+
+@route('POST', '/api/register', limit='register')
+def register(req):
+    data = req.json()
+    uname = (data.get('username') or '').strip()
+    pwd = data.get('password') or ''
+
+    if len(uname) < 3:
+        raise ApiError(400, "Username kamida 3 ta belgi bo'lishi kerak")
+    if len(pwd) < 6:
+        raise ApiError(400, "Parol kamida 6 ta belgi bo'lishi kerak")
+
+    tz = data.get('timezone')
+    tz = tz if usertime.valid_zone(tz) else None
+
+    try:
+        uid = store.create_user(uname, hash_password(pwd), tz)
+    except storage.UsernameTaken:
+        raise ApiError(400, "Bu username allaqachon band")
+    token = create_token(uid, uname, tz)
+    return {"token": token, "username": uname, "ws": FEATURES["ws"],
+            "message": "Muvaffaqiyatli ro'yxatdan o'tdingiz!"}
+
+
+@route('POST', '/api/login', limit='login')
+def login(req):
+    data = req.json()
+    uname = (data.get('username') or '').strip()
+    pwd = data.get('password') or ''
+
+    user = store.get_user_by_username(uname)
+
+    if not user or not verify_password(pwd, user['password_hash']):
+        raise ApiError(401, "Username yoki parol noto'g'ri")
+
+    tz = user['timezone']
+    new_tz = data.get('timezone')
+    if new_tz != tz and usertime.valid_zone(new_tz):
+        store.set_timezone(user['id'], new_tz)
+        data_cache.bump(f"a{user['id']}")  # boshqa workerlardagi eski zona
+        tz = new_tz
+
+    token = create_token(user['id'], user['username'], tz)
+    return {"token": token, "username": user['username'], "ws": FEATURES["ws"], "message": "Xush kelibsiz!"}
+
+
+@route('PUT', '/api/profile/timezone', auth=True, limit='write')
+def set_timezone(req):
+    """Vaqt zonasini o'zgartirish; zona tokenda saqlangani uchun yangi token qaytadi"""
+    tz = req.json(silent=True).get('timezone')
+    if not usertime.valid_zone(tz):
+        raise ApiError(400, "Noma'lum vaqt zonasi")
+    store.set_timezone(req.user['id'], tz)
+    data_cache.bump(f"a{req.user['id']}")
+    token = create_token(req.user['id'], req.user['username'], tz)
+    return {"token": token, "timezone": tz}
+
+# === DASHBOARD ===
+
+DASHBOARD_TTL = 3600  # yozuvlar keshni bump orqali darhol eskirtiradi
+REVIEW_TTL = 3600
+
+
+@route('GET', '/api/dashboard', auth=True, limit='read')
+def dashboard(req):
+    uid = req.user['id']
+    now = usertime.now_for(req.user['tz'])
+    today = now.strftime('%Y-%m-%d')
+
+    def build():
+        data = data_cache.get_or_set("dash", f"u{uid}", today, DASHBOARD_TTL, lambda: {
+            "plans": store.plans_for_day(uid, today),
+            "stats": store.day_stats(uid, today),
+        })
+        return {
+            "username": req.user['username'],
+            "ai_question": ai.daily_question(now.hour),
+            "plans": data["plans"],
+            "stats": data["stats"]
+        }
+
+    # savol soatga bog'liq — variantda kun va soat
+    return conditional(req, f"d{today}T{now.hour}", build)
+
+# === REJALAR ===
+
+@route('POST', '/api/plans', auth=True, limit='write', idempotent=True)
+def create_plan(req):
+    text = (req.json().get('plan_text') or '').strip()
+    if not text:
+        raise ApiError(400, "Reja matni bo'sh bo'lmasin")
+
+    today = usertime.today_for(req.user['tz'])
+    pid = store.add_plan(req.user['id'], text, today)
+    data_changed(req.user['id'], req.user['tz'])
+
+    return {"id": pid, "plan_text": text, "message": "Reja qo'shildi!"}
+
+
+@route('PUT', '/api/plans/<int:plan_id>/complete', auth=True, limit='write')
+def complete_plan(req, plan_id):
+    store.complete_plan(req.user['id'], plan_id)
+    data_changed(req.user['id'], req.user['tz'])
+    return {"message": "Barakalla! Reja bajarildi ✅"}
+
+# === FOKUS ===
+
+FOCUS_MINUTES = (1, 600)  # planned_minutes chegarasi (stale_after shundan hisoblanadi)
+
+@route('POST', '/api/focus/start', auth=True, limit='write', idempotent=True)
+def focus_start(req):
+    try:
+        minutes = int(req.json().get('planned_minutes', 25))
+    except (TypeError, ValueError, OverflowError):
+        raise ApiError(400, "planned_minutes son bo'lishi kerak")
+    if not FOCUS_MINUTES[0] <= minutes <= FOCUS_MINUTES[1]:
+        raise ApiError(400, f"planned_minutes {FOCUS_MINUTES[0]}..{FOCUS_MINUTES[1]} oralig'ida bo'lishi kerak")
+
+    sid = focus_registry.start(req.user['id'], minutes, req.user['tz'])
+    data_changed(req.user['id'], req.user['tz'])
+
+    return {
+        "session_id": sid,
+        "message": f"Fokus boshlandi! {minutes} daqiqa.",
+        "tips": "📵 Telefon/ijtimoiy tarmoqlarni o'chiring!"
+    }
+
+
+@route('POST', '/api/focus/end', auth=True, limit='write')
+def focus_end(req):
+    data = req.json()
+    sid = data.get('session_id')
+    reason = data.get('exit_reason')
+    etype = data.get('exit_type', 'completed')
+
+    try:
+        actual = focus_registry.end(req.user['id'], sid, reason, etype)
+    except storage.SessionClosed:
+        raise ApiError(409, "Sessiya allaqachon tugagan")
+    if actual is None:
+        raise ApiError(404, "Sessiya topilmadi")
+    data_changed(req.user['id'], req.user['tz'])
+
+    ai_resp = None
+    if reason and etype == 'distracted':
+        ai_resp = ai.analyze_exit(reason)['response']
+
+    return {
+        "actual_minutes": actual,
+        "ai_response": ai_resp,
+        "message": "Sessiya tugadi" if etype == 'completed' else "Sessiya to'xtatildi"
+    }
+
+
+@route('GET', '/api/focus/analyze-exit', auth=True, limit='read')
+def analyze_exit(req):
+    return ai.analyze_exit(req.arg('reason', ''))
+
+# === CHAT ===
+
+@route('POST', '/api/chat', auth=True, limit='chat', idempotent=True)
+def chat(req):
+    data = req.json()
+    message = (data.get('message') or '').strip()
+    context = data.get('context', 'dashboard')
+    uid = req.user['id']
+
+    if not message:
+        raise ApiError(400, "Xabar bo'sh")
+
+    reply = ai.chat_response(message, context, req.user['username'])
+
+    store.add_chat_turn(uid, message, reply)
+    data_cache.bump(f"u{uid}")  # chat/history ETag
+    publish_change(uid, "chat")
+
+    return {"reply": reply}
+
+
+# Stream: javob SSE hodisalari bilan bo'lakma-bo'lak — birinchi bayt javob
+# to'liq tayyor bo'lishini kutmaydi:
+#   event: start  data: {"message_id": 12}
+#   event: delta  data: {"text": "Salom, "}   (bir necha marta)
+#   event: done   data: {}
+# Savol oqimdan oldin yoziladi; javob — oqim tugagach chat_writer oqimida
+# (commit mijozga yetib borishni kechiktirmaydi). Mijoz uzilsa generatsiya
+# to'xtaydi va u ko'rgan qism saqlanadi.
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}  # nginx buferlamasin
+chat_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-writer")  # tartib saqlanadi
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (event.encode(), fastjson.dumps(data))
+
+
+def save_reply(user_id: int, reply: str):
+    store.add_chat_message(user_id, 'assistant', reply)
+    data_cache.bump(f"u{user_id}")
+    publish_change(user_id, "chat")
+
+
+@route('POST', '/api/chat/stream', auth=True, limit='chat')
+def chat_stream(req):
+    data = req.json()
+    message = (data.get('message') or '').strip()
+    context = data.get('context', 'dashboard')
+    uid = req.user['id']
+
+    if not message:
+        raise ApiError(400, "Xabar bo'sh")
+
+    mid = store.add_chat_message(uid, 'user', message)
+    data_cache.bump(f"u{uid}")
+    parts = ai.chat_stream(message, context, req.user['username'])
+
+    def events():
+        sent = []
+        try:
+            yield _sse("start", {"message_id": mid})
+            for part in parts:
+                sent.append(part)
+                yield _sse("delta", {"text": part})
+            yield _sse("done", {})
+        finally:  # GeneratorExit — mijoz uzildi
+            parts.close()
+            if sent:
+                chat_writer.submit(save_reply, uid, "".join(sent))
+
+    return Response(events(), mimetype='text/event-stream', headers=dict(STREAM_HEADERS))
+
+
+@route('GET', '/api/chat/history', auth=True, limit='read')
+def chat_history(req):
+    uid = req.user['id']
+    limit = req.arg('limit', 20, type=int)
+
+    return conditional(req, f"h{limit}", lambda: {"messages": store.chat_history(uid, limit)})
+
+# === ANALITIKA ===
+
+@route('GET', '/api/analytics', auth=True, limit='read')
+def user_analytics(req):
+    """Chalg'ish soatlari, streak, reja bajarilishi — keshdan (tungi batch)"""
+    payload = analytics.for_user(store, req.user['id'], req.user['tz'])
+    if payload is None:
+        raise ApiError(501, "Analitika uchun numpy o'rnatilmagan")
+    return payload
+
+# === QIDIRUV ===
+
+@route('GET', '/api/search', auth=True, limit='read')
+def search_history(req):
+    """Chat tarixi va rejalar bo'yicha to'liq matnli qidiruv (kursorli sahifalash)"""
+    if not store.SEARCH:
+        raise ApiError(501, "Qidiruv bu ma'lumotlar bazasida mavjud emas")
+    kind = req.arg('type', 'all')
+    if kind != 'all' and kind not in search.KINDS:
+        raise ApiError(400, "type: all, chat yoki plans")
+    try:
+        return search.search(
+            store, req.user['id'], req.arg('q', ''),
+            kinds=search.KINDS if kind == 'all' else (kind,),
+            cursor=req.arg('cursor'),
+            limit=req.arg('limit', search.PAGE_SIZE, type=int),
+        )
+    except search.BadQuery as e:
+        raise ApiError(400, str(e))
+
+# === KUN YAKUNI ===
+
+@route('GET', '/api/review', auth=True, limit='read')
+def review(req):
+    """Saqlangan tahlil — bitta qator o'qish; bo'lmasa joyida hisoblanib saqlanadi
+    (kun davomida ham): keyingi yozuvgacha (review_dirty) qayta hisoblanmaydi"""
+    uid = req.user['id']
+    today = usertime.today_for(req.user['tz'])
+
+    def load():
+        analysis = store.get_review(uid, today)
+        if analysis is None:
+            gen = data_cache.generation(f"u{uid}")
+            analysis = ai_end_of_day(uid, today)
+            # hisoblash paytida yozuv bo'lgan bo'lsa — eskirgan natija saqlanmaydi
+            if data_cache.generation(f"u{uid}") == gen:
+                store.put_review(uid, today, analysis, usertime.stamp(usertime.utcnow()))
+        return analysis
+
+    return {"analysis": data_cache.get_or_set("review", f"u{uid}", today, REVIEW_TTL, load)}
+
+# === DELTA SYNC (offline-first mijozlar) ===
+# Mijoz oxirgi ko'rgan seq ni yuboradi — javobda faqat undan keyin o'zgargan
+# rejalar, sessiyalar va chat qatorlari (storage.changes_since) va yangi seq.
+# more=true — yana sahifa bor, darhol qayta so'rash kerak; reset=true —
+# mijoz holatini tashlab, noldan qurishi kerak.
+#
+# POST — oflayn to'plangan o'zgarishlar bitta so'rovda, tartib bilan:
+#   {"since": 12, "mutations": [{"id": "m1", "op": "plan.create", "plan_text": "..."},
+#                               {"id": "m2", "op": "plan.complete", "plan_id": "$m1"},
+#                               {"id": "m3", "op": "chat.send", "message": "..."}]}
+# Har biri oddiy endpoint handleri orqali bajariladi (tekshiruvlar, rate limit);
+# id — Idempotency-Key: tarmoq uzilib qayta yuborilsa, takror yozilmaydi.
+# "$m1" — shu to'plamda yaratilgan yozuvning server id si.
+# Fokus sessiyalari yo'q: ularning vaqti server soati bo'yicha hisoblanadi.
+
+SYNC_LIMIT = 500
+MAX_MUTATIONS = 100
+SYNC_OPS = {
+    # op -> (endpoint, path parametrlari)
+    "plan.create": ("create_plan", ()),
+    "plan.complete": ("complete_plan", ("plan_id",)),
+    "chat.send": ("chat", ()),
+}
+
+
+def _sync_since(value) -> int:
+    try:
+        since = int(value or 0)
+    except (TypeError, ValueError):
+        raise ApiError(400, "since butun son bo'lishi kerak")
+    if since < 0:
+        raise ApiError(400, "since manfiy bo'lmasin")
+    return since
+
+
+def _sync_limit(req) -> int:
+    return max(1, min(req.arg('limit', SYNC_LIMIT, type=int), SYNC_LIMIT))
+
+
+def apply_mutation(req: Request, m: dict, created: dict) -> dict:
+    """Bitta oflayn o'zgarish -> {"id", "status", "body"}; 429 da ApiError ko'tariladi"""
+    mid = m.get('id')
+    if mid is not None and not isinstance(mid, str):
+        raise ApiError(400, "mutation id satr bo'lishi kerak")
+    if m.get('op') not in SYNC_OPS:
+        raise ApiError(400, f"op: {', '.join(SYNC_OPS)}")
+    endpoint, path_args = SYNC_OPS[m['op']]
+    r = next(r for r in ROUTES if r.endpoint == endpoint)
+    params = {}
+    for name in path_args:
+        value = m.get(name)
+        if isinstance(value, str) and value.startswith('$'):
+            value = created.get(value[1:])
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ApiError(400, f"{name} butun son yoki oldingi mutation havolasi ($id) bo'lishi kerak")
+        params[name] = value
+    body = {k: v for k, v in m.items() if k not in ('id', 'op') and k not in path_args}
+    sub = Request(r.method, f"/api/sync/{m['op']}", {}, {}, fastjson.dumps(body),
+                  req.remote_addr, r.endpoint)
+    sub.user = req.user
+    check_rate(r.limit, sub)
+    call = lambda: _call(r, sub, params)
+    resp = run_idempotent(sub, f"sync:{mid}", call) if mid else call()
+    result = fastjson.loads(resp.body)
+    if mid and resp.status == 200 and isinstance(result.get('id'), int):
+        created[mid] = result['id']
+    return {"id": mid, "status": resp.status, "body": result}
+
+
+@route('GET', '/api/sync', auth=True, limit='read')
+def sync_pull(req):
+    """?since=<seq>&limit=N — faqat o'zgarishlar"""
+    return store.changes_since(req.user['id'], _sync_since(req.arg('since')), _sync_limit(req))
+
+
+@route('POST', '/api/sync', auth=True, limit='write')
+def sync_push(req):
+    """Oflayn o'zgarishlarni qo'llash, so'ng since dan keyingi delta (ular ham ichida)"""
+    data = req.json()
+    since = _sync_since(data.get('since'))
+    mutations = data.get('mutations') or []
+    if not isinstance(mutations, list) or len(mutations) > MAX_MUTATIONS:
+        raise ApiError(400, f"mutations — ko'pi bilan {MAX_MUTATIONS} ta elementli ro'yxat")
+    results, created = [], {}
+    for i, m in enumerate(mutations):
+        if not isinstance(m, dict):
+            results.append({"id": None, "status": 400, "body": {"detail": "mutation obyekt bo'lishi kerak"}})
+            continue
+        try:
+            results.append(apply_mutation(req, m, created))
+        except ApiError as e:
+            results.append({"id": m.get('id'), "status": e.status, "body": {"detail": e.detail}})
+            if e.status == 429:
+                # qolganlari bajarilmadi — mijoz Retry-After dan keyin qayta yuboradi
+                results += [{"id": rest.get('id') if isinstance(rest, dict) else None, "status": 429,
+                             "body": {"detail": e.detail}} for rest in mutations[i + 1:]]
+                break
+    return {"results": results,
+            **store.changes_since(req.user['id'], since, _sync_limit(req))}
+
+# === HOLAT (liveness/readiness) ===
+
+@route('GET', '/healthz')
+def healthz(req):
+    return {"status": "ok"}
+
+
+@route('GET', '/readyz')
+def readyz(req):
+    if not READY.is_set():
+        return {"status": "warming"}, 503
+    return {"status": "ready"}
+
+# === ADMIN ===
+
+@route('GET', '/api/admin/sql-stats', admin=True)
+def sql_stats(req):
+    """Nomlangan so'rovlar bo'yicha vaqt va qatorlar statistikasi"""
+    snapshot = queries.stats.snapshot()
+    if req.arg('reset') == '1':
+        queries.stats.reset()
+    return {"backend": store.name, "statements": snapshot}
+
+
+@route('GET', '/api/admin/slow-queries', admin=True)
+def slow_queries(req):
+    """Sekin so'rovlar (slowlog.py): fingerprint bo'yicha, rejasi bilan.
+    ?threshold_ms=N — chegarani ish vaqtida o'zgartirish (manfiy — o'chirish)"""
+    threshold = req.arg('threshold_ms')
+    if threshold is not None:
+        try:
+            slowlog.slow_log.set_threshold(float(threshold))
+        except ValueError:
+            raise ApiError(400, "threshold_ms son bo'lishi kerak")
+    snapshot = slowlog.slow_log.snapshot()
+    if req.arg('reset') == '1':
+        slowlog.slow_log.reset()
+    return {"backend": store.name, **snapshot}
+
+# === PROFILING (profiler.py) ===
+
+@route('GET', '/api/admin/profile', admin=True)
+def profile_status(req):
+    return {"armed": request_profiler.armed, "endpoints": request_profiler.endpoints(),
+            "dropped": request_profiler.dropped}
+
+
+@route('POST', '/api/admin/profile', admin=True)
+def profile_arm(req):
+    """{"seconds": 60, "route": "review" | "/api/review" | null, "header": false}
+    header=true — oyna o'rniga imzolangan X-Profile sarlavhasi qaytariladi"""
+    data = req.json(silent=True)
+    try:
+        seconds = float(data.get('seconds', 60))
+    except (TypeError, ValueError):
+        raise ApiError(400, "seconds son bo'lishi kerak")
+    if not 0 < seconds <= profiler.MAX_WINDOW:
+        raise ApiError(400, f"seconds 1..{profiler.MAX_WINDOW} oralig'ida bo'lsin")
+    route_name = data.get('route') or None
+    if data.get('header'):
+        return {"header": profiler.HEADER, "value": request_profiler.sign(seconds, route_name)}
+    return {"armed": request_profiler.arm(seconds, route_name)}
+
+
+@route('DELETE', '/api/admin/profile', admin=True)
+def profile_disarm(req):
+    request_profiler.disarm()
+    if req.arg('clear') == '1':
+        request_profiler.clear()
+    return {"armed": None}
+
+
+@route('GET', '/api/admin/profile/<endpoint>', admin=True)
+def profile_folded(req, endpoint):
+    """Collapsed stacks (flamegraph.pl / speedscope uchun), barcha workerlardan"""
+    folded = request_profiler.folded(endpoint)
+    if not folded:
+        raise ApiError(404, "Bu endpoint uchun namunalar yo'q")
+    return Response(folded.encode('utf-8'), mimetype='text/plain')
+
+
+@route('GET', '/api/admin/compression-stats', admin=True)
+def compression_stats(req):
+    return compressor.stats()
+
+
+@route('GET', '/api/admin/cache-stats', admin=True)
+def cache_stats(req):
+    return data_cache.stats()
@@ -0,0 +1,39 @@
+# ==============================================================
+# Aliman AI - Tez JSON serializatsiya
+# ==============================================================
+# orjson o'rnatilgan bo'lsa — u ishlatiladi (bytes, UTF-8, tez),
+# aks holda stdlib json (ensure_ascii=False, ixcham ajratgichlar).
+# Freymvorkdan mustaqil: Flask provayderi (FastJSONProvider) server.py
+# da — core.py / main.py importi Flask'ni yuklamasin.
+# ==============================================================
+
+import json
+
+try:
+    import orjson
+except ImportError:  # ixtiyoriy bog'liqlik
+    orjson = None
+
+
+def _default(obj):
+    # Rows allaqachon dict; bu yerga faqat kutilmagan turlar tushadi
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+    ENGINE = "orjson"
+else:
+    dumps = stdlib_dumps
+    loads = json.loads
+    ENGINE = "json"
@@ -0,0 +1,129 @@
+# ==============================================================
+# Aliman AI - Faol fokus sessiyalari registri
+# ==============================================================
+# Holatlar: active -> completed | distracted | other | abandoned
+#
+# Har bir foydalanuvchida ko'pi bilan bitta faol sessiya. Registr xotirada
+# (user_id -> ActiveSession), manbasi esa DB: ishga tushishda tugamagan
+# sessiyalar yuklanadi. /api/focus/end — registrdan qidirish + bitta UPDATE.
+# Tashlab ketilgan sessiyalar (tab yopilgan) timer wheel orqali
+# rejalangan vaqt + STALE_GRACE dan keyin 'abandoned' sifatida yopiladi.
+#
+# Bir nechta worker: sessiya boshqa workerda boshlangan bo'lsa, registrda
+# topilmaydi va eski yo'l (SELECT + UPDATE) ishlatiladi; UPDATE lar
+# `ended_at IS NULL` sharti bilan — ikki marta yopilmaydi; UPDATE hech
+# narsani o'zgartirmasa end() SessionClosed ko'taradi. "Bitta ochiq sessiya" DB da
+# (idx_focus_one_open): start() istalgan workerdagi ochiq sessiyani yopadi,
+# boshqa workerdagi registr yozuvi esa g'ildirak yoki end() da tushib ketadi.
+# ==============================================================
+
+import threading
+from datetime import datetime
+
+import reasons
+import usertime
+from storage import SessionClosed
+from timerwheel import TimerWheel
+
+STALE_GRACE_MINUTES = 30
+
+
+class ActiveSession:
+    __slots__ = ("id", "user_id", "started_at", "planned_minutes")
+
+    def __init__(self, id: int, user_id: int, started_at: datetime, planned_minutes: int):
+        self.id = id
+        self.user_id = user_id
+        self.started_at = started_at
+        self.planned_minutes = planned_minutes
+
+    def stale_after(self, now: datetime) -> float:
+        """Necha soniyadan keyin sessiya tashlab ketilgan hisoblanadi"""
+        limit = (self.planned_minutes + STALE_GRACE_MINUTES) * 60
+        return limit - (now - self.started_at).total_seconds()
+
+
+class FocusRegistry:
+    def __init__(self, store, wheel: TimerWheel = None):
+        self.store = store
+        self.active = {}  # user_id -> ActiveSession
+        self.lock = threading.Lock()
+        self.wheel = wheel if wheel is not None else TimerWheel(tick=10, slots=512, name="focus-stale")
+
+    # === Ishga tushish ===
+    def load(self):
+        """DB dagi tugamagan sessiyalarni registrga yuklash"""
+        now = usertime.utcnow()
+        for row in self.store.open_sessions():
+            s = ActiveSession(row['id'], row['user_id'],
+                              usertime.parse_ts(row['started_at']), row['planned_minutes'] or 0)
+            with self.lock:
+                prev = self.active.get(s.user_id)
+                if prev is not None and prev.id > s.id:
+                    prev, s = s, prev
+                self.active[s.user_id] = s
+            if prev is not None:
+                # bitta foydalanuvchida bir nechta ochiq sessiya — eskisi yopiladi
+                self._schedule(prev, 0)
+            self._schedule(s, s.stale_after(now))
+        self.wheel.start()
+
+    # === Holat o'tishlari ===
+    def start(self, user_id: int, planned_minutes: int, tz: str = None) -> int:
+        """Yangi sessiya; oldingi ochiq sessiya (istalgan workerda) shu tranzaksiyada
+        'abandoned' qilib yopiladi. started_at foydalanuvchi zonasida yoziladi
+        (kunlik statistika uchun)"""
+        now = usertime.now_for(tz)
+        with self.lock:
+            prev = self.active.pop(user_id, None)
+        if prev is not None:
+            self.wheel.cancel(prev.id)
+        sid = self.store.start_session(user_id, planned_minutes, usertime.stamp(now))
+        s = ActiveSession(sid, user_id, now, planned_minutes)
+        with self.lock:
+            self.active[user_id] = s
+        self._schedule(s, s.stale_after(now))
+        return sid
+
+    def end(self, user_id: int, session_id: int, reason, exit_type: str):
+        """Haqiqiy daqiqalarni qaytaradi; sessiya topilmasa None, allaqachon yopilgan
+        bo'lsa (muddati o'tgan, boshqa worker) SessionClosed.
+        Sabab toifasi shu yerda bir marta hisoblanib, exit_category ga yoziladi"""
+        category = reasons.classify(reason) if reason else None
+        with self.lock:
+            s = self.active.get(user_id)
+            if s is not None and s.id == session_id:
+                del self.active[user_id]
+            else:
+                s = None
+        if s is None:
+            # boshqa worker boshlagan yoki qayta yopilayotgan sessiya
+            return self.store.end_session(user_id, session_id, reason, exit_type, category)
+        self.wheel.cancel(s.id)
+        now = datetime.now(s.started_at.tzinfo)
+        actual = int((now - s.started_at).total_seconds() / 60)
+        if not self._close(s, now, reason, exit_type, actual, category):
+            raise SessionClosed(s.id)
+        return actual
+
+    def get(self, user_id: int):
+        with self.lock:
+            return self.active.get(user_id)
+
+    # === Ichki ===
+    def _close(self, s: ActiveSession, now: datetime, reason, exit_type: str, actual: int,
+               category: str = None):
+        return self.store.close_session(s.user_id, s.id, usertime.stamp(now), actual,
+                                        reason, exit_type, category)
+
+    def _schedule(self, s: ActiveSession, delay: float):
+        self.wheel.schedule(s.id, delay, lambda _key: self._expire(s))
+
+    def _expire(self, s: ActiveSession):
+        """Timer wheel callback: tashlab ketilgan sessiyani yopish"""
+        with self.lock:
+            if self.active.get(s.user_id) is s:
+                del self.active[s.user_id]
+        # tasdiqlanmagan fokus vaqti hisobga olinmaydi
+        self._close(s, datetime.now(s.started_at.tzinfo), None, 'abandoned', actual=0)
+
@@ -0,0 +1,80 @@
+# ==============================================================
+# Aliman AI - Idempotency-Key (takroriy so'rovlar)
+# ==============================================================
+# Mijoz yozuvchi so'rovga `Idempotency-Key` sarlavhasini qo'shsa, birinchi
+# javob (status + tana) `idempotency_keys` jadvalida TTL davomida saqlanadi.
+# Xuddi shu kalit bilan qayta yuborilgan so'rov asosiy jadvallarga
+# tegmasdan saqlangan javobni oladi.
+#
+# Parallel dublikatlar: kalit INSERT OR IGNORE bilan band qilinadi — faqat
+# bittasi bajariladi, qolganlari natija tayyor bo'lguncha 409 oladi.
+# Band qilish — LEASE_SECONDS lik ijara: worker so'rov o'rtasida yiqilsa,
+# javobsiz qator shundan keyin keyingi urinishga (shartli UPDATE) o'tadi.
+# ==============================================================
+
+import hashlib
+import threading
+import time
+
+TTL_SECONDS = 24 * 3600
+LEASE_SECONDS = 60  # javobsiz (status_code IS NULL) qator shuncha vaqt band
+PURGE_EVERY = 600
+MAX_KEY_LENGTH = 255
+
+NEW, REPLAY, BUSY, MISMATCH = "new", "replay", "busy", "mismatch"
+
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    """Bir xil kalit boshqa so'rov tanasi bilan kelsa — aniqlash uchun"""
+    h = hashlib.sha256(f"{method} {path}\n".encode())
+    h.update(body or b"")
+    return h.hexdigest()[:32]
+
+
+def begin(store, user_id: int, key: str, fp: str):
+    """(holat, saqlangan qator) — NEW bo'lsa so'rovni bajarish kerak"""
+    now = time.time()
+    _maybe_purge(store, now)
+    if store.idem_reserve(user_id, key, fp, now):
+        return NEW, None
+    row = store.idem_get(user_id, key)
+    if row is None or row['created_at'] < now - TTL_SECONDS:
+        # muddati o'tgan yoki shu orada o'chirilgan — qayta band qilishga urinish
+        if row is not None:
+            store.idem_release(user_id, key)
+        if store.idem_reserve(user_id, key, fp, now):
+            return NEW, None
+        return BUSY, None
+    if row['fingerprint'] != fp:
+        return MISMATCH, row
+    if row['status_code'] is None:
+        if row['created_at'] < now - LEASE_SECONDS and store.idem_takeover(user_id, key, now, now - LEASE_SECONDS):
+            return NEW, None
+        return BUSY, row
+    return REPLAY, row
+
+
+def finish(store, user_id: int, key: str, status_code: int, body: str):
+    if status_code >= 500:
+        # server xatosi — mijoz qayta urinib ko'rishi mumkin bo'lsin
+        store.idem_release(user_id, key)
+    else:
+        store.idem_complete(user_id, key, status_code, body)
+
+
+def abort(store, user_id: int, key: str):
+    store.idem_release(user_id, key)
+
+
+def _maybe_purge(store, now: float):
+    global _last_purge
+    if now - _last_purge < PURGE_EVERY or not _purge_lock.acquire(blocking=False):
+        return
+    try:
+        _last_purge = now
+        store.idem_purge(now - TTL_SECONDS)
+    finally:
+        _purge_lock.release()
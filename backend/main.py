@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# ==============================================================
+# Aliman AI - Backend (FastAPI adapteri)
+# ==============================================================
+# server.py (Flask) bilan bir xil core.ROUTES, bir xil javoblar; faqat
+# ASGI qatlami: core sinxron, shuning uchun har bir so'rov threadpool da
+# bajariladi (siqish ham — event loop bloklanmaydi).
+# Qo'shimcha: /ws — WebSocket orqali chat/fokus/dashboard (wshub.py)
+# Ishga tushirish: python3 main.py   yoki   uvicorn main:app --port 8000
+# (pip install fastapi "uvicorn[standard]" — WebSocket uchun websockets kerak)
+# ==============================================================
+
+import re
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+
+import core
+import wshub
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    # init_db sxema versiyasini tekshiradi — takroriy chaqiruv arzon
+    core.start_warmup(run_init_db=True)
+    yield
+
+
+app = FastAPI(title="Aliman AI", version="1.0.0", lifespan=lifespan)
+
+# -------------------------------------------------------
+# CORS: barcha javoblarga (statik fayllar ham), Flask after_request kabi
+# -------------------------------------------------------
+_CORS_RAW = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in core.CORS_HEADERS.items()]
+
+
+class CORSHeaders:
+    """Sof ASGI middleware — BaseHTTPMiddleware dagi qo'shimcha navbatlarsiz"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + _CORS_RAW
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+app.add_middleware(CORSHeaders)
+
+# -------------------------------------------------------
+# API: core.ROUTES -> FastAPI marshrutlari
+# -------------------------------------------------------
+_PARAM = re.compile(r"<(?:(\w+):)?(\w+)>")
+
+
+def asgi_path(path: str) -> str:
+    """Flask sintaksisi -> Starlette: <int:plan_id> -> {plan_id:int}"""
+    return _PARAM.sub(lambda m: "{%s%s}" % (m[2], ":" + m[1] if m[1] else ""), path)
+
+
+def _handle(route, req, params: dict, accept: str):
+    resp = core.dispatch(route, req, params)
+    headers = dict(resp.headers)
+    body = core.compressor.apply_parts(accept, resp.status, resp.mimetype, headers, resp.body)
+    return resp, headers, body
+
+
+def make_view(route):
+    async def view(request: Request):
+        req = core.Request(request.method, request.url.path, request.query_params, request.headers,
+                           await request.body(), request.client.host if request.client else None)
+        resp, headers, body = await run_in_threadpool(
+            _handle, route, req, request.path_params, request.headers.get("accept-encoding", ""))
+        if isinstance(body, bytes):
+            return Response(body, resp.status, headers, resp.mimetype)
+        return StreamingResponse(body, resp.status, headers, resp.mimetype)
+    return view
+
+
+for _route in core.ROUTES:
+    app.add_api_route(asgi_path(_route.path), make_view(_route), methods=[_route.method],
+                      name=_route.endpoint, include_in_schema=_route.path.startswith("/api/"))
+
+
+# -------------------------------------------------------
+# WebSocket: Starlette WebSocket -> wshub interfeysi
+# -------------------------------------------------------
+class HubSocket:
+    __slots__ = ("ws",)
+
+    def __init__(self, ws: WebSocket):
+        self.ws = ws
+
+    def accept(self):
+        return self.ws.accept()
+
+    async def receive(self):
+        """Matn kadri; None — mijoz uzildi"""
+        message = await self.ws.receive()
+        if message["type"] == "websocket.disconnect":
+            return None
+        if message.get("text") is not None:
+            return message["text"]
+        return (message.get("bytes") or b"").decode("utf-8", "replace")
+
+    def send(self, text: str):
+        return self.ws.send_text(text)
+
+    def close(self, code: int):
+        return self.ws.close(code)
+
+
+core.FEATURES["ws"] = True  # login javobi: mijoz /ws ga ulanadi
+
+
+@app.websocket("/ws")
+async def websocket(ws: WebSocket):
+    await wshub.hub.serve(HubSocket(ws), ws.client.host if ws.client else None,
+                          ws.headers.get("x-forwarded-for"))
+
+
+@app.options("/{path:path}", include_in_schema=False)
+async def handle_options(path: str):
+    return JSONResponse({})
+
+# === FRONTEND SERVE === (API marshrutlaridan keyin: "/" ularni yopmasligi uchun)
+app.mount("/", StaticFiles(directory=core.FRONTEND_PATH, html=True), name="frontend")
+
+# -------------------------------------------------------
+# Ishga tushirish
+# -------------------------------------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    print("=" * 50)
+    print("🎯 ALIMAN AI serveri (FastAPI) ishga tushmoqda...")
+    print("=" * 50)
+    print("🌐 Manzil: http://localhost:8000")
+    print("📚 API: http://localhost:8000/docs")
+    print("=" * 50)
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,235 @@
+# ==============================================================
+# Aliman AI - So'rovlar uchun namunaviy (sampling) profiler
+# ==============================================================
+# Admin yoqadi (core.py: /api/admin/profile), uch xil:
+#   - vaqt oynasi: N soniya davomida barcha so'rovlar
+#   - marshrut:    oyna davomida faqat bitta endpoint (masalan, review yoki /api/review)
+#   - sarlavha:    imzolangan X-Profile sarlavhali so'rovlar (HMAC, muddatli)
+#
+# Profillanayotgan so'rov davomida fon oqimi har PROFILE_INTERVAL_MS da
+# sys._current_frames() dan shu oqim stekini oladi. Natija — collapsed
+# stack ("a;b;c 12") formati, endpoint va worker (pid) bo'yicha fayllarda:
+#   PROFILE_DIR/<endpoint>.<pid>.folded  ->  flamegraph.pl / speedscope
+# Fayl MAX_FOLDED_BYTES dan oshsa bir xil steklar qo'shilib qayta yoziladi;
+# shundan keyin ham katta bo'lsa — yangi namunalar tashlanadi (disk to'lmaydi).
+#
+# O'chiq holatda: sampler oqimi yo'q; har so'rovda faqat bitta vaqt
+# taqqoslash va sarlavha tekshiruvi (ADMIN_TOKEN bo'lmasa — hooklar umuman
+# ulanmaydi). Bir nechta worker: boshqaruv fayli (armed.json) PROFILE_DIR
+# da — har bir worker uni ko'pi bilan soniyasiga bir marta o'qiydi.
+# ==============================================================
+
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/aliman-profiles")
+INTERVAL = int(os.environ.get("PROFILE_INTERVAL_MS", 5)) / 1000
+HEADER = "X-Profile"
+MAX_WINDOW = 600  # soniya
+CHECK_EVERY = 1.0  # boshqaruv faylini qayta o'qish oralig'i
+IDLE_STOP = 2.0  # profillanadigan so'rov bo'lmasa, sampler shuncha soniyadan keyin to'xtaydi
+MAX_FOLDED_BYTES = int(os.environ.get("PROFILE_MAX_BYTES", 4 * 1024 * 1024))  # har bir fayl
+
+
+def _frame_name(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse(frame) -> str:
+    """Stek ildizdan bargacha, ';' bilan"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profiler:
+    def __init__(self, secret: bytes, directory: str = PROFILE_DIR, interval: float = INTERVAL):
+        self.secret = secret
+        self.dir = directory
+        self.interval = interval
+        self.control = os.path.join(directory, "armed.json")
+        self.armed = None  # {"until": epoch, "route": str | None}
+        self.next_check = 0.0
+        self.active = {}  # oqim id -> endpoint
+        self.counts = {}  # endpoint -> {stek: namunalar}
+        self.lock = threading.Lock()
+        self.sampler = None
+        self.dropped = 0  # fayl chegarasi tufayli tashlangan namunalar
+
+    # === Boshqaruv (admin) ===
+    def arm(self, seconds: float, route: str = None) -> dict:
+        config = {"until": time.time() + min(seconds, MAX_WINDOW), "route": route or None}
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = f"{self.control}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(config, f)
+        os.replace(tmp, self.control)  # boshqa workerlar yarim yozilgan faylni ko'rmaydi
+        self.armed, self.next_check = config, time.monotonic() + CHECK_EVERY
+        return config
+
+    def disarm(self):
+        try:
+            os.remove(self.control)
+        except FileNotFoundError:
+            pass
+        self.armed, self.next_check = None, 0.0
+
+    def sign(self, seconds: float, route: str = None) -> str:
+        """X-Profile sarlavhasi qiymati: <muddat>.<marshrut|*>.<hmac>"""
+        payload = f"{int(time.time() + min(seconds, MAX_WINDOW))}.{route or '*'}"
+        return payload + "." + hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def _header_ok(self, value: str, endpoint: str, path: str) -> bool:
+        payload, _, sig = value.rpartition(".")
+        expected = hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        # baytlar: str dagi ASCII bo'lmagan belgi compare_digest da TypeError beradi
+        if not hmac.compare_digest(sig.encode(), expected.encode()):
+            return False
+        until, _, route = payload.partition(".")
+        return until.isdigit() and int(until) > time.time() and route in ("*", endpoint, path)
+
+    def _refresh(self, now: float):
+        self.next_check = now + CHECK_EVERY
+        try:
+            with open(self.control) as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            self.armed = None
+            return
+        self.armed = config if config.get("until", 0) > time.time() else None
+
+    # === So'rov hooklari ===
+    def begin(self, endpoint: str, path: str, header: str = None):
+        """before_request: shu so'rov profillanadimi — qaror va ro'yxatga olish"""
+        now = time.monotonic()
+        if now >= self.next_check:
+            self._refresh(now)
+        armed = self.armed
+        if armed is not None and armed["until"] <= time.time():
+            armed = self.armed = None
+        if armed is not None and armed["route"] in (None, endpoint, path):
+            pass
+        elif header is None or not self._header_ok(header, endpoint, path):
+            return
+        with self.lock:
+            self.active[threading.get_ident()] = endpoint or "unknown"
+            if self.sampler is None:
+                self.sampler = threading.Thread(target=self._run, daemon=True, name="profiler")
+                self.sampler.start()
+
+    def end(self):
+        """teardown_request"""
+        if self.active:
+            with self.lock:
+                self.active.pop(threading.get_ident(), None)
+
+    # === Sampler ===
+    def _run(self):
+        idle_since = None
+        flushed = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                targets = dict(self.active)
+            now = time.monotonic()
+            if not targets:
+                idle_since = idle_since or now
+                if now - idle_since >= IDLE_STOP:
+                    with self.lock:
+                        if not self.active:
+                            self.sampler = None
+                            break
+                continue
+            idle_since = None
+            frames = sys._current_frames()
+            for tid, endpoint in targets.items():
+                frame = frames.get(tid)
+                if frame is not None:
+                    stacks = self.counts.setdefault(endpoint, {})
+                    stack = collapse(frame)
+                    stacks[stack] = stacks.get(stack, 0) + 1
+            del frames
+            if now - flushed >= 2.0:
+                self.flush()
+                flushed = now
+        self.flush()
+
+    def flush(self):
+        """To'plangan namunalarni worker fayllariga qo'shish (faqat sampler oqimi chaqiradi)"""
+        counts, self.counts = self.counts, {}
+        if not counts:
+            return
+        os.makedirs(self.dir, exist_ok=True)
+        for endpoint, stacks in counts.items():
+            path = os.path.join(self.dir, f"{endpoint}.{os.getpid()}.folded")
+            text = "".join(f"{stack} {n}\n" for stack, n in stacks.items())
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                size = 0
+            if size + len(text.encode()) < MAX_FOLDED_BYTES:
+                with open(path, "a") as f:
+                    f.write(text)
+            elif not self._compact(path, stacks):
+                self.dropped += sum(stacks.values())
+
+    def _compact(self, path: str, stacks: dict) -> bool:
+        """Fayldagi bir xil steklarni qo'shib, yangilari bilan qayta yozish;
+        natija hali ham chegaradan katta bo'lsa — fayl o'zgarmaydi, False"""
+        merged = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    stack, _, n = line.rstrip("\n").rpartition(" ")
+                    merged[stack] = merged.get(stack, 0) + int(n)
+        except FileNotFoundError:
+            pass
+        for stack, n in stacks.items():
+            merged[stack] = merged.get(stack, 0) + n
+        text = "".join(f"{stack} {n}\n" for stack, n in merged.items())
+        if len(text.encode()) >= MAX_FOLDED_BYTES:
+            return False
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return True
+
+    # === Natijalar (barcha workerlar fayllari) ===
+    def endpoints(self) -> dict:
+        """endpoint -> namunalar soni"""
+        out = {}
+        for name in self._files():
+            endpoint = name.split(".", 1)[0]
+            with open(os.path.join(self.dir, name)) as f:
+                out[endpoint] = out.get(endpoint, 0) + sum(int(line.rsplit(" ", 1)[1]) for line in f)
+        return out
+
+    def folded(self, endpoint: str) -> str:
+        """Bitta endpoint uchun barcha workerlar namunalari, bir xil steklar qo'shilgan"""
+        merged = {}
+        for name in self._files():
+            if name.split(".", 1)[0] != endpoint:
+                continue
+            with open(os.path.join(self.dir, name)) as f:
+                for line in f:
+                    stack, _, n = line.rstrip("\n").rpartition(" ")
+                    merged[stack] = merged.get(stack, 0) + int(n)
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(merged.items()))
+
+    def clear(self):
+        for name in self._files():
+            os.remove(os.path.join(self.dir, name))
+
+    def _files(self) -> list:
+        try:
+            return [n for n in os.listdir(self.dir) if n.endswith(".folded")]
+        except FileNotFoundError:
+            return []
@@ -0,0 +1,545 @@
+# ==============================================================
+# Aliman AI - SQL so'rovlar reestri
+# ==============================================================
+# Barcha SQL shu yerda, nomlangan holda. Ombor (storage.py) so'rovlarni
+# nomi bilan bajaradi; har bir nom uchun chaqiruvlar soni, vaqt va
+# qatorlar soni yig'iladi (stats.snapshot()).
+# ==============================================================
+
+import threading
+
+# -------------------------------------------------------
+# SQL (SQLite dialekti, `?` parametrlar)
+# -------------------------------------------------------
+# SCHEMA o'zgarsa — versiyani oshiring: aks holda mavjud bazalarda
+# DDL qayta bajarilmaydi (SQLite: PRAGMA user_version, PG: schema_meta)
+SCHEMA_VERSION = 11
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TEXT DEFAULT (datetime('now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        plan_text TEXT NOT NULL,
+        date TEXT DEFAULT (date('now')),
+        completed INTEGER DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS focus_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        started_at TEXT DEFAULT (datetime('now')),
+        ended_at TEXT,
+        planned_minutes INTEGER DEFAULT 25,
+        actual_minutes INTEGER DEFAULT 0,
+        exit_reason TEXT,
+        exit_type TEXT DEFAULT 'completed',
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TEXT DEFAULT (datetime('now')),
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        job_key TEXT NOT NULL,
+        run_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        UNIQUE (kind, user_id, job_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_reviews (
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        analysis TEXT NOT NULL,
+        computed_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, day)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        user_id INTEGER NOT NULL,
+        idem_key TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        status_code INTEGER,
+        body TEXT,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (user_id, idem_key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_analytics (
+        user_id INTEGER PRIMARY KEY,
+        payload TEXT NOT NULL,
+        computed_at TEXT NOT NULL
+    )
+    """,
+    # delta sync: har bir o'zgargan yozuvning oxirgi seq i (users.change_seq dan)
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        user_id INTEGER NOT NULL,
+        entity TEXT NOT NULL,
+        entity_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        PRIMARY KEY (user_id, entity, entity_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Mavjud jadvallarga keyin qo'shilgan ustunlar: (jadval, ustun, tur)
+COLUMNS = [
+    ("users", "timezone", "TEXT"),
+    # reasons.classify natijasi: distracted | valid | unknown (sabab yo'q — NULL)
+    ("focus_sessions", "exit_category", "TEXT"),
+    # foydalanuvchi bo'yicha monoton o'zgarishlar hisoblagichi (delta sync)
+    ("users", "change_seq", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# Ikkala dialektda bir xil indekslar (ustunlardan keyin yaratiladi)
+INDEXES = [
+    # tugamagan sessiyalar — ishga tushishda faol sessiyalar registriga yuklash.
+    # Noyob: foydalanuvchida ko'pi bilan bitta ochiq sessiya (barcha workerlar
+    # uchun). Eski bazalardagi ortiqchalari indeksdan oldin yopiladi
+    """
+    UPDATE focus_sessions SET ended_at=started_at, actual_minutes=0, exit_type='abandoned'
+    WHERE ended_at IS NULL AND id < (SELECT max(f.id) FROM focus_sessions f
+                                     WHERE f.user_id=focus_sessions.user_id AND f.ended_at IS NULL)
+    """,
+    "DROP INDEX IF EXISTS idx_focus_open",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_focus_one_open ON focus_sessions(user_id) WHERE ended_at IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs(run_at) WHERE status='pending'",
+    # jarayon yiqilganda 'running' da qolgan vazifalar — ishga tushishda qayta olinadi
+    "CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs(run_at) WHERE status='running'",
+    "CREATE INDEX IF NOT EXISTS idx_idem_created ON idempotency_keys(created_at)",
+    # kunlik statistika va bitta foydalanuvchi analitikasi
+    "CREATE INDEX IF NOT EXISTS idx_focus_user ON focus_sessions(user_id, started_at)",
+    # toifalar bo'yicha hisobotlar: GROUP BY exit_category faqat indeksdan o'qiladi
+    "CREATE INDEX IF NOT EXISTS idx_focus_category ON focus_sessions(user_id, exit_category)",
+    # dashboard rejalari va chat tarixi: ORDER BY id DESC indeksdagi rowid dan
+    "CREATE INDEX IF NOT EXISTS idx_plans_user_date ON daily_plans(user_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_chat_user ON chat_messages(user_id)",
+    # /api/sync: seq > ? oralig'i; PK ustunlari (entity, entity_id) indeksda — qoplovchi
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_change_seq ON change_log(user_id, seq)",
+]
+
+# -------------------------------------------------------
+# Delta sync (change_log)
+# -------------------------------------------------------
+# Sinxronlanadigan turlar: javob kaliti -> (manba jadval, ustunlar).
+# Yozuv o'zgarsa change_log dagi qatori yangi seq oladi (upsert) — jurnal
+# hajmi yozuvlar soniga teng, tarix emas. O'chirish yo'q, shuning uchun
+# "tombstone" ham yo'q.
+SYNC_ENTITIES = {
+    "plans": ("daily_plans", "id, plan_text, date, completed"),
+    "sessions": ("focus_sessions", "id, started_at, ended_at, planned_minutes, actual_minutes,"
+                                   " exit_reason, exit_type"),
+    "chat": ("chat_messages", "id, role, content, created_at"),
+}
+
+# change_log yangi yaratilganda (migratsiya) mavjud yozuvlar jurnalga
+# bir marta yoziladi: seq har bir foydalanuvchida 1 dan boshlab
+SYNC_BACKFILL = [
+    """
+    INSERT INTO change_log (user_id, entity, entity_id, seq)
+    SELECT user_id, entity, id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY ord, id)
+    FROM (SELECT user_id, 'plans' AS entity, id, 0 AS ord FROM daily_plans
+          UNION ALL SELECT user_id, 'sessions', id, 1 FROM focus_sessions
+          UNION ALL SELECT user_id, 'chat', id, 2 FROM chat_messages) AS t
+    """,
+    """
+    UPDATE users SET change_seq = COALESCE(
+        (SELECT max(seq) FROM change_log WHERE change_log.user_id = users.id), 0)
+    """,
+]
+
+# -------------------------------------------------------
+# To'liq matnli qidiruv (faqat SQLite, FTS5)
+# -------------------------------------------------------
+# External-content FTS5: matn nusxalanmaydi, indeks manbasi — view.
+# `owner` ustuni ('u<id>') foydalanuvchi bo'yicha filtr uchun indekslanadi,
+# shuning uchun MATCH faqat shu foydalanuvchining hujjatlari bilan kesishadi.
+# Triggerlar manba jadval bilan sinxron saqlaydi; eski bazalar uchun
+# indeks search.py orqali bo'laklab to'ldiriladi.
+SEARCH_SOURCES = {
+    # tur -> (fts jadvali, manba jadvali, matn ustuni)
+    "chat": ("chat_fts", "chat_messages", "content"),
+    "plans": ("plan_fts", "daily_plans", "plan_text"),
+}
+
+SEARCH_SCHEMA = []
+for _fts, _table, _col in SEARCH_SOURCES.values():
+    SEARCH_SCHEMA += [
+        f"""
+        CREATE VIEW IF NOT EXISTS {_fts}_src AS
+        SELECT id, 'u' || user_id AS owner, {_col} AS body FROM {_table}
+        """,
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {_fts} USING fts5(
+            owner, body, content='{_fts}_src', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {_fts}_ai AFTER INSERT ON {_table} BEGIN
+            INSERT INTO {_fts} (rowid, owner, body) VALUES (new.id, 'u' || new.user_id, new.{_col});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {_fts}_ad AFTER DELETE ON {_table} BEGIN
+            INSERT INTO {_fts} ({_fts}, rowid, owner, body)
+            VALUES ('delete', old.id, 'u' || old.user_id, old.{_col});
+        END
+        """,
+        # faqat matn o'zgarganda (masalan, completed=1 indeksga tegmaydi)
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {_fts}_au AFTER UPDATE OF user_id, {_col} ON {_table} BEGIN
+            INSERT INTO {_fts} ({_fts}, rowid, owner, body)
+            VALUES ('delete', old.id, 'u' || old.user_id, old.{_col});
+            INSERT INTO {_fts} (rowid, owner, body) VALUES (new.id, 'u' || new.user_id, new.{_col});
+        END
+        """,
+    ]
+
+SQL = {
+    "user_insert": "INSERT INTO users (username, password_hash, timezone) VALUES (?, ?, ?)",
+    "user_by_name": "SELECT * FROM users WHERE username=?",
+    "user_by_id": "SELECT id, username, timezone FROM users WHERE id=?",
+    "user_set_tz": "UPDATE users SET timezone=? WHERE id=?",
+    "plans_for_day": "SELECT * FROM daily_plans WHERE user_id=? AND date=? ORDER BY id DESC",
+    "plan_insert": "INSERT INTO daily_plans (user_id, plan_text, date) VALUES (?, ?, ?)",
+    "plan_complete": "UPDATE daily_plans SET completed=1 WHERE id=? AND user_id=?",
+    "focus_insert": "INSERT INTO focus_sessions (user_id, planned_minutes, started_at) VALUES (?, ?, ?)",
+    "focus_get": "SELECT * FROM focus_sessions WHERE id=? AND user_id=?",
+    "focus_end": """
+        UPDATE focus_sessions
+        SET ended_at=?, actual_minutes=?, exit_reason=?, exit_type=?, exit_category=?
+        WHERE id=? AND ended_at IS NULL
+    """,
+    "focus_close": """
+        UPDATE focus_sessions
+        SET ended_at=?, actual_minutes=?, exit_reason=?, exit_type=?, exit_category=?
+        WHERE id=? AND user_id=? AND ended_at IS NULL
+    """,
+    "focus_open": "SELECT id, user_id, started_at, planned_minutes FROM focus_sessions WHERE ended_at IS NULL",
+    # yangi sessiyadan oldin: shu foydalanuvchining ochiq sessiyasi (istalgan workerdagi)
+    "focus_abandon_open": """
+        UPDATE focus_sessions SET ended_at=?, actual_minutes=0, exit_type='abandoned'
+        WHERE user_id=? AND ended_at IS NULL RETURNING id
+    """,
+    # toifasi yo'q sabablar (migratsiyadan oldingi yoki eski worker yozgan qatorlar)
+    "focus_unclassified": """
+        SELECT id, exit_reason FROM focus_sessions
+        WHERE id > ? AND exit_category IS NULL AND exit_reason IS NOT NULL AND exit_reason <> ''
+        ORDER BY id LIMIT ?
+    """,
+    # kalit so'zlar o'zgarganda — hammasini qayta tasniflash
+    "focus_reasons": """
+        SELECT id, exit_reason FROM focus_sessions
+        WHERE id > ? AND exit_reason IS NOT NULL AND exit_reason <> ''
+        ORDER BY id LIMIT ?
+    """,
+    "focus_set_category": "UPDATE focus_sessions SET exit_category=? WHERE id=?",
+    # kun — [day, ertasi) oralig'i: substr() o'rniga idx_focus_user bo'yicha diapazon
+    "focus_day_stats": """
+        SELECT COUNT(*) as sessions,
+               COALESCE(SUM(actual_minutes), 0) as total_minutes,
+               COALESCE(SUM(CASE WHEN exit_type='distracted' THEN 1 ELSE 0 END), 0) as distractions
+        FROM focus_sessions WHERE user_id=? AND started_at >= ? AND started_at < ?
+    """,
+    # analitika: yopilgan sessiyalar ustunlar ko'rinishida (analytics.py);
+    # sabab matni faqat toifasi hali yozilmagan qatorlar uchun qaytariladi
+    "focus_columns": """
+        SELECT user_id, CAST(substr(started_at, 12, 2) AS INTEGER) AS hour,
+               substr(started_at, 1, 10) AS day,
+               COALESCE(planned_minutes, 0), COALESCE(actual_minutes, 0),
+               COALESCE(exit_type, 'other') AS exit_type, COALESCE(exit_category, '') AS exit_category,
+               CASE WHEN exit_category IS NULL THEN COALESCE(exit_reason, '') ELSE '' END AS exit_reason
+        FROM focus_sessions WHERE ended_at IS NOT NULL AND user_id=?
+    """,
+    "focus_columns_all": """
+        SELECT user_id, CAST(substr(started_at, 12, 2) AS INTEGER) AS hour,
+               substr(started_at, 1, 10) AS day,
+               COALESCE(planned_minutes, 0), COALESCE(actual_minutes, 0),
+               COALESCE(exit_type, 'other') AS exit_type, COALESCE(exit_category, '') AS exit_category,
+               CASE WHEN exit_category IS NULL THEN COALESCE(exit_reason, '') ELSE '' END AS exit_reason
+        FROM focus_sessions WHERE ended_at IS NOT NULL
+    """,
+    "chat_insert": "INSERT INTO chat_messages (user_id, role, content) VALUES (?, ?, ?)",
+    "chat_recent": """
+        SELECT role, content, created_at FROM chat_messages
+        WHERE user_id=? ORDER BY id DESC LIMIT ?
+    """,
+    "job_insert": "INSERT OR IGNORE INTO jobs (kind, user_id, job_key, run_at) VALUES (?, ?, ?, ?)",
+    "jobs_pending": "SELECT id, kind, user_id, job_key, run_at FROM jobs WHERE status='pending'",
+    # run_at — olingan vaqt: 'running' qatorning ijara muddati shundan hisoblanadi
+    "job_claim": "UPDATE jobs SET status='running', attempts=attempts+1, run_at=? WHERE id=? AND status='pending'",
+    "jobs_running": "SELECT id, run_at FROM jobs WHERE status='running'",
+    "job_requeue": "UPDATE jobs SET status='pending' WHERE id=? AND status='running' AND run_at<=?",
+    "job_finish": "UPDATE jobs SET status=?, run_at=?, last_error=? WHERE id=?",
+    "job_get": "SELECT id, kind, user_id, job_key, run_at, attempts FROM jobs WHERE id=?",
+    "jobs_purge": "DELETE FROM jobs WHERE status IN ('done', 'failed') AND run_at < ?",
+    "review_get": "SELECT analysis FROM daily_reviews WHERE user_id=? AND day=?",
+    "review_put": """
+        INSERT OR REPLACE INTO daily_reviews (user_id, day, analysis, computed_at)
+        VALUES (?, ?, ?, ?)
+    """,
+    "review_delete": "DELETE FROM daily_reviews WHERE user_id=? AND day=?",
+    "analytics_get": "SELECT payload, computed_at FROM user_analytics WHERE user_id=?",
+    "analytics_put": """
+        INSERT OR REPLACE INTO user_analytics (user_id, payload, computed_at) VALUES (?, ?, ?)
+    """,
+    "idem_insert": """
+        INSERT OR IGNORE INTO idempotency_keys (user_id, idem_key, fingerprint, created_at)
+        VALUES (?, ?, ?, ?)
+    """,
+    "idem_get": """
+        SELECT fingerprint, status_code, body, created_at FROM idempotency_keys
+        WHERE user_id=? AND idem_key=?
+    """,
+    "idem_complete": "UPDATE idempotency_keys SET status_code=?, body=? WHERE user_id=? AND idem_key=?",
+    "idem_delete": "DELETE FROM idempotency_keys WHERE user_id=? AND idem_key=?",
+    # ijarasi o'tgan javobsiz qator — faqat bitta chaqiruvchi oladi (created_at yangilanadi)
+    "idem_takeover": """
+        UPDATE idempotency_keys SET created_at=?
+        WHERE user_id=? AND idem_key=? AND status_code IS NULL AND created_at < ?
+    """,
+    "idem_purge": "DELETE FROM idempotency_keys WHERE created_at < ?",
+    # seq yozuv bilan bitta tranzaksiyada ajratiladi: users qatori qulfi
+    # tufayli bir foydalanuvchining seq lari commit tartibida o'sadi
+    "sync_bump": "UPDATE users SET change_seq = change_seq + ? WHERE id=? RETURNING change_seq",
+    "sync_log": """
+        INSERT INTO change_log (user_id, entity, entity_id, seq) VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id, entity, entity_id) DO UPDATE SET seq=excluded.seq
+    """,
+    "sync_head": "SELECT change_seq FROM users WHERE id=?",
+    "sync_window": "SELECT seq FROM change_log WHERE user_id=? AND seq > ? ORDER BY seq LIMIT ?",
+}
+for _entity, (_table, _cols) in SYNC_ENTITIES.items():
+    SQL[f"sync_{_entity}"] = f"""
+        SELECT l.seq, {', '.join('e.' + c.strip() for c in _cols.split(','))}
+        FROM change_log l JOIN {_table} e ON e.id = l.entity_id
+        WHERE l.user_id=? AND l.seq > ? AND l.seq <= ? AND l.entity='{_entity}'
+        ORDER BY l.seq
+    """
+
+
+# Qidiruv so'rovlari (faqat SQLite ombori yuklaydi). Oyna — eng yangi
+# mosliklar rowid bo'yicha kamayish tartibida: FTS5 uni oqim sifatida
+# o'qiydi, bm25() esa butun doclist bo'yicha df hisoblagani uchun
+# ishlatilmaydi (tartiblash search.py da, oyna ichida).
+SEARCH_SQL = {
+    "search_chat": """
+        SELECT chat_fts.rowid AS id, highlight(chat_fts, 1, char(2), char(3)) AS body,
+               m.role, m.created_at
+        FROM chat_fts JOIN chat_messages m ON m.id = chat_fts.rowid
+        WHERE chat_fts MATCH ? AND chat_fts.rowid <= ?
+        ORDER BY chat_fts.rowid DESC LIMIT ?
+    """,
+    "search_plans": """
+        SELECT plan_fts.rowid AS id, highlight(plan_fts, 1, char(2), char(3)) AS body,
+               p.date, p.completed
+        FROM plan_fts JOIN daily_plans p ON p.id = plan_fts.rowid
+        WHERE plan_fts MATCH ? AND plan_fts.rowid <= ?
+        ORDER BY plan_fts.rowid DESC LIMIT ?
+    """,
+}
+for _kind, (_fts, _table, _col) in SEARCH_SOURCES.items():
+    SEARCH_SQL.update({
+        f"search_{_kind}_max": f"SELECT COALESCE(max(id), 0) AS id FROM {_table}",
+        f"search_{_kind}_index": f"""
+            INSERT INTO {_fts} (rowid, owner, body)
+            SELECT id, owner, body FROM {_fts}_src WHERE id > ? AND id <= ?
+        """,
+        f"search_{_kind}_clear": f"INSERT INTO {_fts} ({_fts}) VALUES ('delete-all')",
+        f"search_{_kind}_optimize": f"INSERT INTO {_fts} ({_fts}) VALUES ('optimize')",
+    })
+
+
+# Har bir ulanishning statement keshi barcha nomlangan so'rovlarni
+# sig'dirishi kerak (+ DDL va vaqtinchalik so'rovlar uchun zaxira)
+STATEMENT_CACHE_SIZE = (len(SQL) + len(SEARCH_SQL) + len(SCHEMA) + len(SEARCH_SCHEMA)
+                        + len(INDEXES) + 8)
+
+
+# -------------------------------------------------------
+# PostgreSQL dialekti
+# -------------------------------------------------------
+PG_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id BIGSERIAL PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TEXT DEFAULT to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS')
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_plans (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL REFERENCES users(id),
+        plan_text TEXT NOT NULL,
+        date TEXT DEFAULT to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD'),
+        completed INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS focus_sessions (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL REFERENCES users(id),
+        started_at TEXT DEFAULT to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS'),
+        ended_at TEXT,
+        planned_minutes INTEGER DEFAULT 25,
+        actual_minutes INTEGER DEFAULT 0,
+        exit_reason TEXT,
+        exit_type TEXT DEFAULT 'completed'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL REFERENCES users(id),
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TEXT DEFAULT to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD HH24:MI:SS')
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id BIGSERIAL PRIMARY KEY,
+        kind TEXT NOT NULL,
+        user_id BIGINT NOT NULL,
+        job_key TEXT NOT NULL,
+        run_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        UNIQUE (kind, user_id, job_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_reviews (
+        user_id BIGINT NOT NULL,
+        day TEXT NOT NULL,
+        analysis TEXT NOT NULL,
+        computed_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, day)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        user_id BIGINT NOT NULL,
+        idem_key TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        status_code INTEGER,
+        body TEXT,
+        created_at DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (user_id, idem_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_analytics (
+        user_id BIGINT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        computed_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        user_id BIGINT NOT NULL,
+        entity TEXT NOT NULL,
+        entity_id BIGINT NOT NULL,
+        seq BIGINT NOT NULL,
+        PRIMARY KEY (user_id, entity, entity_id)
+    )
+    """,
+]
+
+# SQLite'dan farq qiladigan so'rovlar
+PG_OVERRIDES = {
+    "user_insert": SQL["user_insert"] + " RETURNING id",
+    "plan_insert": SQL["plan_insert"] + " RETURNING id",
+    "focus_insert": SQL["focus_insert"] + " RETURNING id",
+    "chat_insert": SQL["chat_insert"] + " RETURNING id",
+    "job_insert": SQL["job_insert"].replace("INSERT OR IGNORE", "INSERT")
+                  + " ON CONFLICT DO NOTHING RETURNING id",
+    "idem_insert": SQL["idem_insert"].replace("INSERT OR IGNORE", "INSERT") + " ON CONFLICT DO NOTHING",
+    "review_put": """
+        INSERT INTO daily_reviews (user_id, day, analysis, computed_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id, day) DO UPDATE
+        SET analysis=excluded.analysis, computed_at=excluded.computed_at
+    """,
+    "analytics_put": """
+        INSERT INTO user_analytics (user_id, payload, computed_at) VALUES (?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE
+        SET payload=excluded.payload, computed_at=excluded.computed_at
+    """,
+}
+
+
+def to_pg(sql: str) -> str:
+    """`?` parametrlarni psycopg uslubidagi `%s` ga almashtirish"""
+    return sql.replace("%", "%%").replace("?", "%s")
+
+
+# -------------------------------------------------------
+# Statistika
+# -------------------------------------------------------
+class QueryStats:
+    """Nom bo'yicha: chaqiruvlar, umumiy/maksimal vaqt, qatorlar"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+
+    def record(self, name: str, elapsed: float, rows: int):
+        with self.lock:
+            st = self.data.get(name)
+            if st is None:
+                st = self.data[name] = [0, 0.0, 0.0, 0]
+            st[0] += 1
+            st[1] += elapsed
+            st[2] = max(st[2], elapsed)
+            st[3] += max(rows, 0)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                name: {
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 3),
+                    "avg_ms": round(total * 1000 / calls, 3),
+                    "max_ms": round(mx * 1000, 3),
+                    "rows": rows,
+                }
+                for name, (calls, total, mx, rows) in sorted(self.data.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.data.clear()
+
+
+stats = QueryStats()
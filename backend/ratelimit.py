@@ -0,0 +1,167 @@
+# ==============================================================
+# Aliman AI - Rate limiting (token bucket)
+# ==============================================================
+# Har bir marshrut uchun ikki chelak: foydalanuvchi ID va mijoz IP.
+# Chelak `rate` token/soniya tezlikda to'ladi, sig'imi `burst`.
+#
+# Backendlar (RATELIMIT_URL):
+#   memory (standart)             — jarayon ichida, bitta worker uchun
+#   sqlite:///dev/shm/aliman.rl   — bir xostdagi workerlar uchun umumiy
+#   redis://localhost:6379/0      — Redis-mos server (pip install redis)
+# ==============================================================
+
+import os
+import sqlite3
+import threading
+import time
+
+# marshrut -> {kalit turi: (rate token/soniya, burst)}
+ROUTE_LIMITS = {
+    "login":    {"ip": (5 / 60, 10)},
+    "register": {"ip": (2 / 60, 5)},
+    "chat":     {"user": (1.0, 10), "ip": (5.0, 30)},
+    "write":    {"user": (2.0, 20)},
+    "read":     {"user": (5.0, 40)},
+}
+
+
+def _env_overrides():
+    """RATELIMIT_CHAT_USER=0.5/5 ko'rinishidagi sozlamalar"""
+    for route, kinds in ROUTE_LIMITS.items():
+        for kind in list(kinds):
+            val = os.environ.get(f"RATELIMIT_{route.upper()}_{kind.upper()}")
+            if val:
+                rate, burst = val.split("/")
+                kinds[kind] = (float(rate), int(burst))
+
+
+_env_overrides()
+
+
+# -------------------------------------------------------
+# Backendlar: take() -> 0 (ruxsat) yoki kutish soniyalari
+# -------------------------------------------------------
+class MemoryBackend:
+    """Jarayon ichidagi lug'at; MAX_KEYS dan oshsa to'la chelaklar tozalanadi"""
+
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self.lock:
+            tokens, ts = self.buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+            self.buckets[key] = (tokens - 1, now)
+            if len(self.buckets) > self.MAX_KEYS:
+                self._prune(now)
+            return 0.0
+
+    def _prune(self, now):
+        # allaqachon to'lib bo'lgan chelaklarni saqlashning ma'nosi yo'q
+        full_after = max(b for _, b in _all_limits()) / min(r for r, _ in _all_limits())
+        self.buckets = {k: v for k, v in self.buckets.items() if now - v[1] < full_after}
+
+
+class SQLiteBackend:
+    """Bir xostdagi workerlar uchun umumiy fayl (/dev/shm da — xotirada)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets "
+                     "(key TEXT PRIMARY KEY, tokens REAL, ts REAL) WITHOUT ROWID")
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA synchronous=OFF")
+            self.local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, ts FROM buckets WHERE key=?", (key,)).fetchone()
+            tokens, ts = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class RedisBackend:
+    """Redis (yoki mos server) — atomar Lua skript bilan"""
+
+    SCRIPT = """
+    local b = redis.call('HMGET', KEYS[1], 't', 'ts')
+    local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local tokens = tonumber(b[1]) or burst
+    local ts = tonumber(b[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens < 1 then wait = (1 - tokens) / rate else tokens = tokens - 1 end
+    redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        return float(self.script(keys=["rl:" + key], args=[rate, burst, time.time()]))
+
+
+def _all_limits():
+    return [lim for kinds in ROUTE_LIMITS.values() for lim in kinds.values()]
+
+
+def open_backend(url: str):
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisBackend(url)
+    if url.startswith("sqlite://"):
+        return SQLiteBackend(url[len("sqlite://"):])
+    return MemoryBackend()
+
+
+backend = open_backend(os.environ.get("RATELIMIT_URL", "memory"))
+
+
+# IP avval: IP chelagi rad etgan so'rov foydalanuvchi kvotasini sarflamaydi
+KIND_ORDER = ("ip", "user")
+
+
+def check(route: str, user_id=None, ip=None) -> float:
+    """Marshrut chelaklaridan navbat bilan token olish; birinchi rad etishda
+    to'xtaydi (keyingi chelaklar sarflanmaydi). 0 yoki kutish soniyalari"""
+    limits = ROUTE_LIMITS.get(route, {})
+    ids = {"user": user_id, "ip": ip}
+    for kind in KIND_ORDER:
+        ident = ids[kind]
+        if kind not in limits or ident is None:
+            continue
+        rate, burst = limits[kind]
+        wait = backend.take(f"{route}:{kind}:{ident}", rate, burst)
+        if wait:
+            return wait
+    return 0.0
@@ -0,0 +1,104 @@
+# ==============================================================
+# Aliman AI - Fokusdan chiqish sabablarini tasniflash
+# ==============================================================
+# Kalit so'zlar bo'yicha: distracted (chalg'itish), valid (uzrli sabab),
+# unknown. Server javobi (ai.analyze_exit) va analitika bir xil
+# tasniflagichdan foydalanadi.
+#
+# Toifa sessiya yopilganda focus_sessions.exit_category ga yoziladi.
+# Eski (yoki kalit so'zlar o'zgargandan keyin — --all) qatorlar uchun
+# backfill: o'qish/yozish asosiy jarayonda bo'laklab (executemany),
+# tasniflash — jarayonlar pulida. Tungi 'exit_classify' vazifasi ham shu.
+#   python3 reasons.py backfill [/path/aliman.db] [--workers 4] [--chunk 5000] [--all]
+# ==============================================================
+
+import os
+from collections import deque
+
+DISTRACTIONS = ("zerik", "bezdim", "zavq", "instagram", "youtube", "tiktok",
+                "telegram", "o'yin", "game", "film", "video", "kino", "shunchaki",
+                "ko'ngil", "keraksiz", "boshqa", "dam", "uxla")
+
+VALID_REASONS = ("hojat", "tualet", "suv", "ovqat", "osh", "qo'ng'iroq",
+                 "favqulodda", "shoshilinch", "zarur", "muhim", "ota", "ona",
+                 "bosh og'riq", "xasta", "kasal", "dori", "tez yordam")
+
+CATEGORIES = ("distracted", "valid", "unknown")
+
+
+def classify(reason: str) -> str:
+    r = reason.lower()
+    if any(w in r for w in DISTRACTIONS):
+        return "distracted"
+    if any(w in r for w in VALID_REASONS):
+        return "valid"
+    return "unknown"
+
+
+# -------------------------------------------------------
+# Backfill
+# -------------------------------------------------------
+BACKFILL_CHUNK = 5000
+WORKERS = int(os.environ.get("CLASSIFY_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def classify_chunk(rows: list) -> list:
+    """Worker: [(id, sabab), ...] -> [(toifa, id), ...]; bir xil sabab bir marta"""
+    seen = {}
+    out = []
+    for sid, reason in rows:
+        category = seen.get(reason)
+        if category is None:
+            category = seen[reason] = classify(reason)
+        out.append((category, sid))
+    return out
+
+
+def backfill(store, workers: int = WORKERS, chunk: int = BACKFILL_CHUNK,
+             reclassify_all: bool = False) -> int:
+    """Toifasi yo'q (reclassify_all — barcha) qatorlarni tasniflash; yangilanganlar soni.
+    Bir vaqtda ko'pi bilan 2*workers bo'lak ishlovda — xotira chegaralangan"""
+    unclassified_only = not reclassify_all
+    total, after = 0, 0
+    if workers <= 1:
+        while rows := store.exit_reasons(after, chunk, unclassified_only):
+            after = rows[-1][0]
+            total += store.set_exit_categories(classify_chunk(rows))
+        return total
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # spawn: ko'p oqimli server jarayonidan fork qilish xavfli
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        pending = deque()
+        while rows := store.exit_reasons(after, chunk, unclassified_only):
+            after = rows[-1][0]
+            pending.append(pool.submit(classify_chunk, rows))
+            if len(pending) >= 2 * workers:
+                total += store.set_exit_categories(pending.popleft().result())
+        for future in pending:
+            total += store.set_exit_categories(future.result())
+    return total
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import storage
+
+    parser = argparse.ArgumentParser(description="exit_reason -> exit_category backfill")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("db", nargs="?", default=os.path.join(os.path.dirname(__file__), "aliman.db"))
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--chunk", type=int, default=BACKFILL_CHUNK)
+    parser.add_argument("--all", action="store_true", help="toifasi borlarini ham qayta tasniflash")
+    args = parser.parse_args()
+
+    store = storage.open_storage(os.environ.get("DATABASE_URL") or args.db)
+    store.init_schema()
+    t0 = time.perf_counter()
+    n = backfill(store, args.workers, args.chunk, args.all)
+    print(f"✅ {n} ta sessiya tasniflandi: {time.perf_counter() - t0:.1f} s")
@@ -0,0 +1,94 @@
+# ==============================================================
+# Aliman AI - Fon vazifalari rejalashtiruvchisi
+# ==============================================================
+# Vazifalar `jobs` jadvalida saqlanadi (server qayta ishga tushsa ham
+# yo'qolmaydi) va jarayon ichidagi timer wheel orqali o'z vaqtida
+# bajariladi. (kind, user_id, job_key) — noyob: bitta foydalanuvchi uchun
+# bitta kunlik vazifa ikki marta qo'yilmaydi.
+#
+# Bir nechta worker: vazifani `pending -> running` UPDATE ini birinchi
+# bajargan worker oladi, qolganlari o'tkazib yuboradi.
+#
+# Jarayon vazifa o'rtasida yiqilsa, qator 'running' da qoladi: ishga
+# tushishda bunday qatorlar ijarasi (olingan vaqt + RUNNING_LEASE) tugashi
+# bilan qayta 'pending' qilinib bajariladi. Handlerlar ijaradan qisqa bo'lsin.
+#
+# G'ildirak faqat vaqtni kuzatadi: handlerlar JOB_WORKERS oqimli pulda
+# bajariladi — uzoq tungi batch boshqa taymerlarni (eod_review) ushlab turmaydi.
+# ==============================================================
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import usertime
+from timerwheel import TimerWheel
+
+RETRY_DELAY = timedelta(minutes=5)
+MAX_ATTEMPTS = 3
+RUNNING_LEASE = timedelta(hours=1)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+
+
+class JobScheduler:
+    def __init__(self, store, wheel: TimerWheel = None):
+        self.store = store
+        self.handlers = {}  # kind -> fn(user_id, job_key)
+        self.wheel = wheel if wheel is not None else TimerWheel(tick=15, slots=5760, name="jobs")
+        self.pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="jobs")
+
+    def register(self, kind: str, fn):
+        self.handlers[kind] = fn
+
+    def enqueue(self, kind: str, user_id: int, job_key: str, run_at: datetime) -> bool:
+        """Vazifa qo'shish; allaqachon mavjud bo'lsa False"""
+        run_at = run_at.astimezone(timezone.utc)
+        job_id = self.store.enqueue_job(kind, user_id, job_key, usertime.stamp(run_at))
+        if job_id is None:
+            return False
+        self._schedule(job_id, run_at)
+        return True
+
+    def load(self):
+        """DB dagi kutilayotgan va to'xtab qolgan vazifalarni g'ildirakka yuklash"""
+        for row in self.store.pending_jobs():
+            self._schedule(row['id'], usertime.parse_ts(row['run_at']))
+        for row in self.store.running_jobs():
+            lease_end = usertime.parse_ts(row['run_at']) + RUNNING_LEASE
+            delay = (lease_end - usertime.utcnow()).total_seconds()
+            self.wheel.schedule(("job", row['id']), delay,
+                                lambda key: self.pool.submit(self._recover, key))
+        self.wheel.start()
+
+    def _schedule(self, job_id: int, run_at: datetime):
+        delay = (run_at - usertime.utcnow()).total_seconds()
+        self.wheel.schedule(("job", job_id), delay, self._submit)
+
+    def _submit(self, key):
+        """G'ildirak oqimida: faqat pulga topshirish"""
+        self.pool.submit(self._fire, key)
+
+    def _recover(self, key):
+        """Ijarasi tugagan 'running' vazifa: hali ham shu holatda bo'lsa — qayta"""
+        cutoff = usertime.stamp(usertime.utcnow() - RUNNING_LEASE)
+        if self.store.requeue_job(key[1], cutoff):
+            print(f"⚠️  Vazifa #{key[1]} to'xtab qolgan edi — qayta bajariladi")
+            self._fire(key)
+
+    def _fire(self, key):
+        job_id = key[1]
+        if not self.store.claim_job(job_id, usertime.stamp(usertime.utcnow())):
+            return
+        job = self.store.get_job(job_id)
+        try:
+            self.handlers[job['kind']](job['user_id'], job['job_key'])
+        except Exception as e:
+            if job['attempts'] >= MAX_ATTEMPTS:
+                self.store.finish_job(job_id, 'failed', job['run_at'], repr(e))
+                print(f"❌ Vazifa #{job_id} ({job['kind']}) bajarilmadi:", e)
+                return
+            retry_at = usertime.utcnow() + RETRY_DELAY
+            self.store.finish_job(job_id, 'pending', usertime.stamp(retry_at), repr(e))
+            self._schedule(job_id, retry_at)
+            return
+        self.store.finish_job(job_id, 'done', job['run_at'])
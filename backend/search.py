@@ -0,0 +1,221 @@
+# ==============================================================
+# Aliman AI - Chat tarixi va rejalar bo'yicha qidiruv
+# ==============================================================
+# Indeks: SQLite FTS5 (queries.SEARCH_SCHEMA), triggerlar bilan sinxron.
+#
+# Tartiblash: bm25() har bir so'rovda butun doclist bo'yicha hujjat
+# chastotasini sanaydi — yillik tarixi bor foydalanuvchida o'nlab ms.
+# Shuning uchun FTS5 dan eng yangi WINDOW ta moslik oqim sifatida olinadi
+# (rowid DESC — ~1 ms) va shu oyna ichida tf asosidagi BM25 (idf siz)
+# bilan tartiblanadi. Oyna tugagach kursor keyingi (eskiroq) oynaga o'tadi,
+# shuning uchun butun tarix sahifalab ko'rib chiqiladi.
+#
+# Eski bazalar uchun indeksni to'ldirish / qayta qurish (bo'laklab):
+#   python3 search.py rebuild [/path/aliman.db] [--chunk 5000]
+# ==============================================================
+
+import base64
+import html
+import json
+import os
+import re
+
+import queries
+
+WINDOW = int(os.environ.get("SEARCH_WINDOW", 200))  # har bir tur uchun
+MAX_WINDOWS = 5  # bitta so'rovda ko'rib chiqiladigan oynalar (kechikish chegarasi)
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+MAX_TERMS = 8
+SNIPPET_CHARS = 160
+BACKFILL_CHUNK = 5000
+KINDS = tuple(queries.SEARCH_SOURCES)  # ('chat', 'plans')
+
+# BM25 parametrlari
+K1 = 1.2
+B = 0.75
+
+_TERM = re.compile(r"\w+")
+_MARK = re.compile("\x02(.*?)\x03", re.S)
+_TOP = 2 ** 62  # birinchi sahifa: yuqori chegara yo'q
+
+
+class BadQuery(ValueError):
+    """Bo'sh so'rov yoki buzilgan kursor"""
+
+
+# -------------------------------------------------------
+# So'rov va kursor
+# -------------------------------------------------------
+def build_match(user_id: int, q: str) -> str:
+    """Foydalanuvchi matnini xavfsiz FTS5 ifodasiga: har bir so'z — prefiks,
+    barchasi AND; owner ustuni bo'yicha faqat o'z hujjatlari"""
+    terms = _TERM.findall((q or "").lower())[:MAX_TERMS]
+    if not terms:
+        raise BadQuery("Qidiruv so'zi bo'sh")
+    # 1 harfli prefiks prefix='2 3' indeksiga tushmaydi — aniq moslik
+    body = " ".join(f'"{t}"*' if len(t) > 1 else f'"{t}"' for t in terms)
+    return f'owner : "u{int(user_id)}" AND body : ({body})'
+
+
+def encode_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+        windows = {k: int(v) for k, v in state["w"].items() if k in KINDS}
+        after = state.get("a")
+        if after is not None:
+            after = (float(after[0]), str(after[1]), int(after[2]))
+        return {"w": windows, "a": after}
+    except (ValueError, KeyError, TypeError, IndexError):
+        raise BadQuery("Noto'g'ri kursor")
+
+
+# -------------------------------------------------------
+# Tartiblash va snippet
+# -------------------------------------------------------
+def _score(rows: list):
+    """Oyna ichida BM25 (idf = 1): belgilangan so'zlar chastotasi va hujjat uzunligi"""
+    lengths = [len(r["_plain"].split()) or 1 for r in rows]
+    avg = sum(lengths) / len(lengths)
+    for r, length in zip(rows, lengths):
+        tf = {}
+        for term in r["_hits"]:
+            tf[term] = tf.get(term, 0) + 1
+        norm = K1 * (1 - B + B * length / avg)
+        r["score"] = round(sum(f * (K1 + 1) / (f + norm) for f in tf.values()), 6)
+
+
+def _snippet(parts: list, plain: str) -> str:
+    """Birinchi moslik atrofidagi SNIPPET_CHARS belgi; HTML escape, moslik <mark> da"""
+    first = len(parts[0])
+    start = max(0, first - SNIPPET_CHARS // 3)
+    if start:
+        space = plain.find(" ", start, first)
+        start = space + 1 if space != -1 else start
+    end = min(len(plain), start + SNIPPET_CHARS)
+    if end < len(plain):
+        space = plain.rfind(" ", max(first, start), end)
+        end = space if space > first else end
+    out, pos = [], 0
+    for i, part in enumerate(parts):
+        lo, hi = max(start, pos), min(end, pos + len(part))
+        if lo < hi:
+            chunk = html.escape(plain[lo:hi], quote=False)
+            out.append(f"<mark>{chunk}</mark>" if i % 2 else chunk)
+        pos += len(part)
+    return ("…" if start else "") + "".join(out) + ("…" if end < len(plain) else "")
+
+
+def _prepare(kind: str, row: dict) -> dict:
+    parts = _MARK.split(row.pop("body"))  # juft — oddiy matn, toq — moslik
+    row["_plain"] = "".join(parts)
+    row["_hits"] = [p.lower() for p in parts[1::2]]
+    row["snippet"] = _snippet(parts, row["_plain"])
+    row["type"] = kind
+    return row
+
+
+# -------------------------------------------------------
+# Qidiruv
+# -------------------------------------------------------
+def search(store, user_id: int, q: str, kinds=KINDS, cursor: str = None,
+           limit: int = PAGE_SIZE) -> dict:
+    """{"results": [...], "next_cursor": str | None}
+
+    Natija: oynalar yangidan eskiga, har bir oyna ichida — dolzarblik
+    bo'yicha. Kursor oyna chegaralarini (id) saqlaydi, shuning uchun
+    sahifalar orasida yangi yozuvlar qo'shilsa ham tartib siljimaydi."""
+    match = build_match(user_id, q)
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    if cursor:
+        state = decode_cursor(cursor)
+    else:
+        state = {"w": {k: _TOP for k in kinds}, "a": None}
+
+    results = []
+    for _ in range(MAX_WINDOWS):
+        if not state["w"] or len(results) >= limit:
+            break
+        window, bounds = [], {}
+        for kind, upto in state["w"].items():
+            rows = store.search_window(kind, match, upto, WINDOW)
+            window += [_prepare(kind, r) for r in rows]
+            if rows:
+                # oyna chegarasi: shu oynani qayta qurish va keyingisiga o'tish uchun
+                bounds[kind] = (rows[0]["id"], rows[-1]["id"], len(rows) == WINDOW)
+        if not window:
+            state = {"w": {}, "a": None}
+            break
+        _score(window)
+        window.sort(key=lambda r: (-r["score"], r["type"], -r["id"]))
+        after = state["a"]
+        if after is not None:
+            window = [r for r in window if (-r["score"], r["type"], -r["id"]) > after]
+        page = window[:limit - len(results)]
+        results += page
+        if len(page) < len(window):
+            # oyna ichida to'xtadik — keyingi sahifa shu oynadan davom etadi
+            last = page[-1]
+            state = {"w": {k: hi for k, (hi, _lo, _f) in bounds.items()},
+                     "a": (-last["score"], last["type"], -last["id"])}
+            break
+        # oyna tugadi — faqat to'la kelgan turlar uchun eskiroq oyna bor
+        state = {"w": {k: lo - 1 for k, (_hi, lo, is_full) in bounds.items() if is_full and lo > 1},
+                 "a": None}
+
+    for r in results:
+        del r["_plain"], r["_hits"]
+    return {"results": results,
+            "next_cursor": encode_cursor(state) if state["w"] else None}
+
+
+# -------------------------------------------------------
+# Indeksni to'ldirish / qayta qurish
+# -------------------------------------------------------
+def backfill(store, pending: dict, chunk: int = BACKFILL_CHUNK, log=print) -> dict:
+    """pending: tur -> max id; 0 < id <= max qatorlar bo'laklab indekslanadi.
+    Har bir bo'lak — alohida tranzaksiya, yozuvchilar uzoq bloklanmaydi"""
+    done = {}
+    for kind, hi in pending.items():
+        lo, n = 0, 0
+        while lo < hi:
+            step = min(lo + chunk, hi)
+            n += store.search_index_range(kind, lo, step)
+            lo = step
+        store.search_optimize(kind)
+        done[kind] = n
+        log(f"🔎 Qidiruv indeksi ({kind}): {n} ta yozuv")
+    return done
+
+
+def rebuild(store, chunk: int = BACKFILL_CHUNK, log=print) -> dict:
+    """Indeksni noldan qurish (buzilgan yoki tokenizer o'zgargan bo'lsa)"""
+    return backfill(store, {kind: store.search_reset(kind) for kind in KINDS}, chunk, log)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import storage
+
+    parser = argparse.ArgumentParser(description="FTS5 qidiruv indeksini qayta qurish")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("db", nargs="?",
+                        default=os.path.join(os.path.dirname(__file__), "aliman.db"))
+    parser.add_argument("--chunk", type=int, default=BACKFILL_CHUNK)
+    args = parser.parse_args()
+
+    store = storage.open_storage(os.environ.get("DATABASE_URL") or args.db)
+    if not store.SEARCH:
+        raise SystemExit(f"{store.name}: qidiruv indeksi faqat SQLite uchun")
+    store.init_schema()
+    t0 = time.perf_counter()
+    rebuild(store, args.chunk)
+    print(f"✅ Tayyor: {time.perf_counter() - t0:.1f} s")
@@ -0,0 +1,113 @@
+# ==============================================================
+# Aliman AI - Single-flight: bir xil parallel hisoblashlarni birlashtirish
+# ==============================================================
+# Bir kalit bo'yicha bir vaqtda faqat bitta fn() bajariladi (yetakchi);
+# shu payt kelgan boshqa chaqiruvlar uning natijasini kutib, baham ko'radi.
+# Natija saqlanmaydi: hisoblash tugashi bilan kalit bo'shaydi, keyingi
+# chaqiruv yangidan boshlaydi — kesh emas, eskirish qo'shmaydi.
+#
+# Yetakchi xato ko'tarsa — kutayotganlarning hammasida o'sha xato.
+# Kutish `timeout` dan oshsa, kutuvchi o'zi hisoblaydi: sekin (osilib
+# qolgan) yetakchi boshqalarni cheksiz ushlab turmaydi.
+#
+# Oqimlar uchun: Flask/WSGI workerlari ham, FastAPI threadpool ham.
+# Jarayon ichida — boshqa workerlar bilan birlashtirilmaydi.
+# ==============================================================
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.calls = {}  # kalit -> bajarilayotgan _Call
+        self.counters = {"leaders": 0, "shared": 0, "timeouts": 0}
+
+    def do(self, key, fn):
+        """fn() natijasi; shu kalit bo'yicha hisoblash ketayotgan bo'lsa — o'shaniki"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.counters["leaders"] += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                self._count("timeouts")
+                return fn()
+            self._count("shared")
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # avval kalit bo'shaydi: done dan keyin kelganlar yangi hisoblash boshlaydi
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"in_flight": len(self.calls), **self.counters}
+
+
+if __name__ == "__main__":
+    # O'z-o'zini tekshirish: python3 singleflight.py
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    sf = SingleFlight(timeout=1.0)
+    runs = []
+
+    def slow(value, delay=0.2):
+        runs.append(value)
+        time.sleep(delay)
+        return value
+
+    with ThreadPoolExecutor(20) as pool:
+        results = list(pool.map(lambda _: sf.do("k", lambda: slow("ok")), range(20)))
+    assert results == ["ok"] * 20 and len(runs) == 1, (results, runs)
+
+    def boom():
+        time.sleep(0.2)
+        raise ValueError("xato")
+
+    def caught(_):
+        try:
+            sf.do("e", boom)
+        except ValueError as e:
+            return e
+
+    with ThreadPoolExecutor(5) as pool:
+        errors = list(pool.map(caught, range(5)))
+    assert all(isinstance(e, ValueError) for e in errors), errors
+
+    runs.clear()
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(sf.do, "t", lambda: slow("leader", 2.0))
+        time.sleep(0.05)
+        second = pool.submit(sf.do, "t", lambda: slow("own", 0))
+        assert second.result() == "own" and first.result() == "leader"
+
+    print("✅ singleflight:", sf.stats())
@@ -0,0 +1,125 @@
+# ==============================================================
+# Aliman AI - Sekin so'rovlar jurnali (EXPLAIN QUERY PLAN bilan)
+# ==============================================================
+# storage.py dagi barcha nomlangan so'rovlar (_one/_all/_exec/_many/
+# _chunks) vaqtini o'lchaydi; SLOW_QUERY_MS dan oshganlari shu yerga
+# tushadi. Fingerprint (so'rov nomi + normallashtirilgan SQL xeshi)
+# bo'yicha yig'iladi: soni, umumiy/maksimal vaqt, parametrlar shakli
+# (qiymatlar emas — shaxsiy ma'lumot jurnalga yozilmaydi).
+#
+# Namuna (rejasi va ko'rilgan qatorlar) har bir fingerprint uchun ko'pi
+# bilan SLOW_SAMPLE_SECONDS da bir marta, umumiy — daqiqasiga
+# SLOW_SAMPLES_PER_MIN ta olinadi: sekin bazada EXPLAIN bo'roni bo'lmaydi.
+#   SQLite: EXPLAIN QUERY PLAN + SELECT qayta bajarilib VM qadamlari sanaladi
+#   PostgreSQL: SELECT uchun EXPLAIN (ANALYZE) — haqiqiy ko'rilgan qatorlar
+# Natija: stderr ga JSON qator va GET /api/admin/slow-queries.
+# ==============================================================
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_MS", 100))  # manfiy — o'chiq
+SAMPLE_SECONDS = float(os.environ.get("SLOW_SAMPLE_SECONDS", 60))
+SAMPLES_PER_MIN = int(os.environ.get("SLOW_SAMPLES_PER_MIN", 10))
+MAX_FINGERPRINTS = 500
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(name: str, sql: str) -> str:
+    normalized = _SPACE.sub(" ", _LITERAL.sub("?", sql)).strip().lower()
+    return f"{name}:{hashlib.sha1(normalized.encode()).hexdigest()[:10]}"
+
+
+def params_shape(params) -> list:
+    """Parametrlar turi va o'lchami: [int, str(12), null, ...]"""
+    if params is None:
+        return None
+    shape = []
+    for p in params:
+        if p is None:
+            shape.append("null")
+        elif isinstance(p, (str, bytes)):
+            shape.append(f"{type(p).__name__}({len(p)})")
+        else:
+            shape.append(type(p).__name__)
+    return shape
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = THRESHOLD_MS, log=None):
+        # tezkor yo'l: storage `elapsed >= threshold` ni tekshiradi (soniyalarda)
+        self.threshold = threshold_ms / 1000 if threshold_ms >= 0 else float("inf")
+        self.lock = threading.Lock()
+        self.data = {}  # fingerprint -> yig'indi
+        self.budget = SAMPLES_PER_MIN
+        self.budget_reset = time.monotonic() + 60
+        self.log = log or (lambda line: print(line, file=sys.stderr, flush=True))
+
+    def set_threshold(self, ms: float):
+        self.threshold = ms / 1000 if ms >= 0 else float("inf")
+
+    def observe(self, name: str, sql: str, params, elapsed: float, rows: int, explain=None):
+        """Sekin so'rov; explain() — (reja qatorlari, ko'rilganlar) ni qaytaradi,
+        faqat namuna olinganda chaqiriladi"""
+        fp = fingerprint(name, sql)
+        rows = int(rows)  # _one: True/False
+        now = time.monotonic()
+        with self.lock:
+            st = self.data.get(fp)
+            if st is None:
+                if len(self.data) >= MAX_FINGERPRINTS:
+                    return
+                st = self.data[fp] = {"name": name, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                      "rows": 0, "params": None, "plan": None, "scanned": None,
+                                      "next_sample": 0.0}
+            ms = elapsed * 1000
+            st["count"] += 1
+            st["total_ms"] += ms
+            st["max_ms"] = max(st["max_ms"], ms)
+            st["rows"] += max(rows, 0)
+            st["params"] = params_shape(params)
+            if now >= self.budget_reset:
+                self.budget, self.budget_reset = SAMPLES_PER_MIN, now + 60
+            sample = explain is not None and now >= st["next_sample"] and self.budget > 0
+            if sample:
+                st["next_sample"] = now + SAMPLE_SECONDS
+                self.budget -= 1
+        if not sample:
+            return
+        try:
+            plan, scanned = explain()
+        except Exception as e:  # jurnal so'rovni hech qachon buzmasligi kerak
+            plan, scanned = [f"EXPLAIN xatosi: {e}"], None
+        with self.lock:
+            st["plan"], st["scanned"] = plan, scanned
+        self.log(json.dumps({"slow_query": name, "fingerprint": fp, "ms": round(ms, 2),
+                             "rows": rows, "params": st["params"], "scanned": scanned,
+                             "plan": plan}, ensure_ascii=False))
+
+    def snapshot(self) -> dict:
+        """Umumiy vaqt bo'yicha kamayish tartibida"""
+        with self.lock:
+            items = [(fp, dict(st)) for fp, st in self.data.items()]
+        out = {}
+        for fp, st in sorted(items, key=lambda kv: -kv[1]["total_ms"]):
+            del st["next_sample"]
+            st["total_ms"] = round(st["total_ms"], 3)
+            st["max_ms"] = round(st["max_ms"], 3)
+            st["avg_ms"] = round(st["total_ms"] / st["count"], 3)
+            out[fp] = st
+        return {"threshold_ms": None if self.threshold == float("inf") else self.threshold * 1000,
+                "statements": out}
+
+    def reset(self):
+        with self.lock:
+            self.data.clear()
+
+
+slow_log = SlowQueryLog()
@@ -0,0 +1,657 @@
+# ==============================================================
+# Aliman AI - Ma'lumotlar ombori (data-access qatlami)
+# ==============================================================
+# Handlerlar SQL yozmaydi — faqat shu moduldagi ombor metodlarini
+# chaqiradi; SQL matnlarining o'zi queries.py da. Standart: SQLite. DATABASE_URL=postgresql://... bo'lsa
+# PostgreSQL (ulanishlar puli + server tomonidagi prepared statement).
+#
+# Tekshirish (mahalliy Postgres yoki SQLite faylga qarshi):
+#   python3 storage.py postgresql://localhost/aliman_test
+#   python3 storage.py /tmp/aliman_test.db
+# ==============================================================
+
+import json
+import os
+import queue
+import sqlite3
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+
+import queries
+import slowlog
+import usertime
+
+
+class UsernameTaken(Exception):
+    """Username allaqachon mavjud"""
+
+
+class SessionClosed(Exception):
+    """Fokus sessiyasi allaqachon yopilgan (muddati o'tgan, boshqa so'rov yoki worker)"""
+
+
+def _next_day(day: str) -> str:
+    """'YYYY-MM-DD' -> ertasi; started_at shu kun ichida <=> day <= started_at < ertasi"""
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+# -------------------------------------------------------
+# SQLite (standart)
+# -------------------------------------------------------
+def dict_row(cursor, row):
+    """Qatorni darhol dict sifatida qurish — JSON uchun qo'shimcha nusxa kerak emas"""
+    return dict(zip([d[0] for d in cursor.description], row))
+
+
+class SQLiteStorage:
+    """Bitta SQLite fayl; ulanishlar kichik pulda qayta ishlatiladi,
+    shuning uchun har bir ulanishning statement keshi saqlanib qoladi"""
+
+    name = "sqlite"
+    PARAM = "?"
+    POOL_SIZE = 8
+    SEARCH = True  # FTS5 qidiruvi
+    _unique_violation = sqlite3.IntegrityError
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sql = {**queries.SQL, **queries.SEARCH_SQL}
+        self.pool = queue.LifoQueue(maxsize=self.POOL_SIZE)
+        # init_schema yangi yaratgan FTS indekslari: tur -> to'ldirilishi kerak bo'lgan max id
+        self.search_pending = {}
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False,
+                               cached_statements=queries.STATEMENT_CACHE_SIZE)
+        conn.row_factory = dict_row
+        return conn
+
+    @contextmanager
+    def cursor(self):
+        try:
+            conn = self.pool.get_nowait()
+        except queue.Empty:
+            conn = self.connect()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            try:
+                self.pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    # === Nomlangan so'rovlarni bajarish (vaqt va qatorlar hisobi bilan) ===
+    def _record(self, c, name, params, elapsed: float, rows: int, rerun: bool = True):
+        queries.stats.record(name, elapsed, rows)
+        if elapsed >= slowlog.slow_log.threshold:
+            explain = None if params is None else lambda: self._explain(c, name, params, rerun)
+            slowlog.slow_log.observe(name, self.sql[name], params, elapsed, rows, explain)
+
+    def _one(self, c, name, params):
+        t0 = time.perf_counter()
+        c.execute(self.sql[name], params)
+        row = c.fetchone()
+        self._record(c, name, params, time.perf_counter() - t0, row is not None)
+        return row
+
+    def _all(self, c, name, params) -> list:
+        t0 = time.perf_counter()
+        c.execute(self.sql[name], params)
+        rows = c.fetchall()
+        self._record(c, name, params, time.perf_counter() - t0, len(rows))
+        return rows
+
+    def _exec(self, c, name, params) -> int:
+        t0 = time.perf_counter()
+        c.execute(self.sql[name], params)
+        rowcount = c.rowcount
+        self._record(c, name, params, time.perf_counter() - t0, rowcount)
+        return rowcount
+
+    def _insert(self, c, name, params) -> int:
+        self._exec(c, name, params)
+        return c.lastrowid
+
+    def _many(self, c, name, seq) -> int:
+        t0 = time.perf_counter()
+        c.executemany(self.sql[name], seq)
+        # seq — generator bo'lishi mumkin: EXPLAIN uchun parametrlar yo'q
+        self._record(c, name, None, time.perf_counter() - t0, c.rowcount)
+        return c.rowcount
+
+    def _plain_rows(self, c):
+        c.row_factory = None
+
+    def _chunks(self, c, name, params, size: int):
+        """Katta natija tuple bo'laklari sifatida — har bir qator uchun dict qurilmaydi"""
+        self._plain_rows(c)
+        elapsed, n = 0.0, 0
+        t0 = time.perf_counter()
+        c.execute(self.sql[name], params)
+        while True:
+            rows = c.fetchmany(size)
+            elapsed += time.perf_counter() - t0
+            if not rows:
+                break
+            n += len(rows)
+            yield rows
+            t0 = time.perf_counter()
+        # to'liq natija allaqachon o'qildi (n qator) — qayta bajarilmaydi
+        self._record(c, name, params, elapsed, n, rerun=False)
+
+    def _explain(self, c, name, params, rerun: bool = True):
+        """Sekin so'rov namunasi: (reja qatorlari, VM qadamlari).
+        Alohida kursor — c ning lastrowid/rowcount iga tegmaydi; SELECT lar
+        qayta bajarilib, progress handler bilan VM qadamlari sanaladi"""
+        conn = c.connection
+        sql = self.sql[name]
+        ec = conn.cursor()
+        ec.row_factory = None
+        ec.execute("EXPLAIN QUERY PLAN " + sql, params)
+        depth, plan = {0: 0}, []
+        for node, parent, _unused, detail in ec.fetchall():
+            depth[node] = depth.get(parent, 0) + 1
+            plan.append("  " * (depth[node] - 1) + detail)
+        if not rerun or not sql.lstrip().upper().startswith("SELECT"):
+            return plan, None
+        steps = [0]
+
+        def tick():
+            steps[0] += 1
+            return 0
+        conn.set_progress_handler(tick, 10)
+        try:
+            ec.execute(sql, params).fetchall()
+        finally:
+            conn.set_progress_handler(None, 0)
+        return plan, {"vm_steps": steps[0] * 10}
+
+    def init_schema(self) -> bool:
+        """DDL faqat saqlangan sxema versiyasi mos kelmasa bajariladi"""
+        with self.cursor() as c:
+            c.execute("PRAGMA user_version")
+            if c.fetchone()["user_version"] == queries.SCHEMA_VERSION:
+                return False
+            c.execute("BEGIN IMMEDIATE")  # butun migratsiya — bitta tranzaksiya
+            c.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            existing = {r["name"] for r in c.fetchall()}
+            for ddl in queries.SCHEMA:
+                c.execute(ddl)
+            for table, column, coltype in queries.COLUMNS:
+                c.execute(f"PRAGMA table_info({table})")
+                if column not in {r["name"] for r in c.fetchall()}:
+                    c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {coltype}")
+            for ddl in queries.INDEXES:
+                c.execute(ddl)
+            if "change_log" not in existing:
+                for ddl in queries.SYNC_BACKFILL:
+                    c.execute(ddl)
+            for ddl in queries.SEARCH_SCHEMA:
+                c.execute(ddl)
+            # triggerlar shu tranzaksiyada yoqiladi: bundan keyingi qatorlar
+            # indekslangan, oldingilari (id <= max) search.backfill ga qoladi
+            for kind, (fts, _table, _col) in queries.SEARCH_SOURCES.items():
+                if fts not in existing:
+                    self.search_pending[kind] = self._one(c, f"search_{kind}_max", ())["id"]
+            c.execute(f"PRAGMA user_version = {queries.SCHEMA_VERSION}")
+            return True
+
+    def warm(self):
+        """Pulni to'ldirish va har bir ulanishda SELECT'larni oldindan kompilyatsiya qilish"""
+        with ExitStack() as stack:
+            for _ in range(self.POOL_SIZE):
+                c = stack.enter_context(self.cursor())
+                for name, sql in self.sql.items():
+                    if name in queries.SEARCH_SQL:
+                        continue  # MATCH ga -1 berib bo'lmaydi
+                    # parametrsizlari (butun jadval) faqat ishga tushishda/batchda kerak
+                    if sql.lstrip().upper().startswith("SELECT") and self.PARAM in sql:
+                        # -1 hech qaysi foydalanuvchiga mos kelmaydi — faqat prepare
+                        c.execute(sql, (-1,) * sql.count(self.PARAM)).fetchall()
+
+    # === Foydalanuvchilar ===
+    def create_user(self, username: str, password_hash: str, tz: str = None) -> int:
+        try:
+            with self.cursor() as c:
+                return self._insert(c, "user_insert", (username, password_hash, tz))
+        except sqlite3.IntegrityError:
+            raise UsernameTaken(username)
+
+    def get_user_by_username(self, username: str):
+        with self.cursor() as c:
+            return self._one(c, "user_by_name", (username,))
+
+    def get_user_by_id(self, user_id: int):
+        with self.cursor() as c:
+            return self._one(c, "user_by_id", (user_id,))
+
+    def set_timezone(self, user_id: int, tz: str):
+        with self.cursor() as c:
+            self._exec(c, "user_set_tz", (tz, user_id))
+
+    # === Rejalar ===
+    def plans_for_day(self, user_id: int, day: str) -> list:
+        with self.cursor() as c:
+            return self._all(c, "plans_for_day", (user_id, day))
+
+    def add_plan(self, user_id: int, text: str, day: str) -> int:
+        with self.cursor() as c:
+            pid = self._insert(c, "plan_insert", (user_id, text, day))
+            self._log_changes(c, user_id, "plans", (pid,))
+            return pid
+
+    def complete_plan(self, user_id: int, plan_id: int):
+        with self.cursor() as c:
+            if self._exec(c, "plan_complete", (plan_id, user_id)):
+                self._log_changes(c, user_id, "plans", (plan_id,))
+
+    # === Fokus sessiyalari ===
+    def start_session(self, user_id: int, planned_minutes: int, started_at: str) -> int:
+        """Yangi sessiya; ochiq sessiya bo'lsa — shu tranzaksiyada 'abandoned'.
+        Parallel start (boshqa worker) noyob indeksga uriladi — bir marta qayta urinish"""
+        for attempt in range(2):
+            try:
+                with self.cursor() as c:
+                    closed = [r["id"] for r in self._all(c, "focus_abandon_open", (started_at, user_id))]
+                    sid = self._insert(c, "focus_insert", (user_id, planned_minutes, started_at))
+                    self._log_changes(c, user_id, "sessions", (*closed, sid))
+                    return sid
+            except self._unique_violation:
+                if attempt:
+                    raise
+
+    def end_session(self, user_id: int, session_id: int, reason, exit_type: str, category=None):
+        """Sessiyani yopadi; haqiqiy daqiqalarni qaytaradi (topilmasa None,
+        allaqachon yopilgan bo'lsa SessionClosed)"""
+        with self.cursor() as c:
+            session = self._one(c, "focus_get", (session_id, user_id))
+            if not session:
+                return None
+            started = usertime.parse_ts(session['started_at'])
+            now = datetime.now(started.tzinfo)
+            actual = int((now - started).total_seconds() / 60)
+            if not self._exec(c, "focus_end",
+                              (usertime.stamp(now), actual, reason, exit_type, category, session_id)):
+                raise SessionClosed(session_id)
+            self._log_changes(c, user_id, "sessions", (session_id,))
+            return actual
+
+    def close_session(self, user_id: int, session_id: int, ended_at: str,
+                      actual: int, reason, exit_type: str, category=None) -> bool:
+        """Faol sessiyani bitta UPDATE bilan yopish (allaqachon yopilgan bo'lsa False)"""
+        with self.cursor() as c:
+            if not self._exec(c, "focus_close", (ended_at, actual, reason, exit_type, category,
+                                                 session_id, user_id)):
+                return False
+            self._log_changes(c, user_id, "sessions", (session_id,))
+            return True
+
+    def open_sessions(self) -> list:
+        with self.cursor() as c:
+            return self._all(c, "focus_open", ())
+
+    def day_stats(self, user_id: int, day: str) -> dict:
+        with self.cursor() as c:
+            return self._one(c, "focus_day_stats", (user_id, day, _next_day(day)))
+
+    def exit_reasons(self, after_id: int, limit: int, unclassified_only: bool = True) -> list:
+        """[(id, exit_reason), ...] id bo'yicha keyset sahifalash bilan"""
+        name = "focus_unclassified" if unclassified_only else "focus_reasons"
+        with self.cursor() as c:
+            self._plain_rows(c)
+            return self._all(c, name, (after_id, limit))
+
+    def set_exit_categories(self, pairs: list) -> int:
+        """[(category, id), ...] — bitta executemany, bitta tranzaksiya"""
+        with self.cursor() as c:
+            return self._many(c, "focus_set_category", pairs)
+
+    def focus_columns(self, user_id: int = None, chunk: int = 50_000):
+        """Yopilgan sessiyalar tuple bo'laklarida (queries: focus_columns);
+        user_id=None — barcha foydalanuvchilar"""
+        with self.cursor() as c:
+            if user_id is None:
+                yield from self._chunks(c, "focus_columns_all", (), chunk)
+            else:
+                yield from self._chunks(c, "focus_columns", (user_id,), chunk)
+
+    # === Analitika keshi ===
+    def get_analytics(self, user_id: int):
+        with self.cursor() as c:
+            return self._one(c, "analytics_get", (user_id,))
+
+    def put_analytics_many(self, rows: list) -> int:
+        """[(user_id, payload, computed_at), ...] — bitta tranzaksiyada"""
+        with self.cursor() as c:
+            return self._many(c, "analytics_put", rows)
+
+    # === Chat ===
+    def add_chat_turn(self, user_id: int, message: str, reply: str):
+        with self.cursor() as c:
+            ids = (self._insert(c, "chat_insert", (user_id, 'user', message)),
+                   self._insert(c, "chat_insert", (user_id, 'assistant', reply)))
+            self._log_changes(c, user_id, "chat", ids)
+
+    def add_chat_message(self, user_id: int, role: str, content: str) -> int:
+        """Bitta xabar (stream: savol darhol, javob oqim tugagach)"""
+        with self.cursor() as c:
+            mid = self._insert(c, "chat_insert", (user_id, role, content))
+            self._log_changes(c, user_id, "chat", (mid,))
+            return mid
+
+    def chat_history(self, user_id: int, limit: int) -> list:
+        with self.cursor() as c:
+            return list(reversed(self._all(c, "chat_recent", (user_id, limit))))
+
+    # === Delta sync (change_log) ===
+    def _log_changes(self, c, user_id: int, entity: str, ids):
+        """Yozuv bilan bitta tranzaksiyada: seq ajratish va jurnalga upsert"""
+        row = self._one(c, "sync_bump", (len(ids), user_id))
+        if row is None:
+            return
+        first = row["change_seq"] - len(ids) + 1
+        for i, entity_id in enumerate(ids):
+            self._exec(c, "sync_log", (user_id, entity, entity_id, first + i))
+
+    def changes_since(self, user_id: int, since: int, limit: int) -> dict:
+        """since dan keyin o'zgargan yozuvlar, ko'pi bilan `limit` ta seq.
+        Bosh (head) oynadan OLDIN o'qiladi: shu orada commit bo'lgan yozuv
+        keyingi so'rovga qoladi, yo'qolmaydi. since > head (baza almashgan) — reset"""
+        with self.cursor() as c:
+            row = self._one(c, "sync_head", (user_id,))
+            head = row["change_seq"] if row else 0
+            reset = since > head
+            if reset:
+                since = 0
+            out = {"seq": since, "more": False, "reset": reset}
+            out.update((entity, []) for entity in queries.SYNC_ENTITIES)
+            if since == head:
+                return out
+            window = self._all(c, "sync_window", (user_id, since, limit + 1))
+            more = len(window) > limit
+            upto = window[limit - 1]["seq"] if more else head
+            for entity in queries.SYNC_ENTITIES:
+                out[entity] = self._all(c, f"sync_{entity}", (user_id, since, upto))
+            out["seq"], out["more"] = upto, more
+            return out
+
+    # === Fon vazifalari (jobs) ===
+    def enqueue_job(self, kind: str, user_id: int, job_key: str, run_at: str):
+        """Yangi vazifa ID si; (kind, user_id, job_key) allaqachon bo'lsa None"""
+        with self.cursor() as c:
+            if self._exec(c, "job_insert", (kind, user_id, job_key, run_at)):
+                return c.lastrowid
+            return None
+
+    def pending_jobs(self) -> list:
+        with self.cursor() as c:
+            return self._all(c, "jobs_pending", ())
+
+    def claim_job(self, job_id: int, claimed_at: str) -> bool:
+        """pending -> running; boshqa worker allaqachon olgan bo'lsa False"""
+        with self.cursor() as c:
+            return self._exec(c, "job_claim", (claimed_at, job_id)) > 0
+
+    def running_jobs(self) -> list:
+        with self.cursor() as c:
+            return self._all(c, "jobs_running", ())
+
+    def requeue_job(self, job_id: int, claimed_before: str) -> bool:
+        """Ijarasi o'tgan running -> pending; vazifa tugagan yoki yangidan olingan bo'lsa False"""
+        with self.cursor() as c:
+            return self._exec(c, "job_requeue", (job_id, claimed_before)) > 0
+
+    def get_job(self, job_id: int):
+        with self.cursor() as c:
+            return self._one(c, "job_get", (job_id,))
+
+    def finish_job(self, job_id: int, status: str, run_at: str, error: str = None):
+        with self.cursor() as c:
+            self._exec(c, "job_finish", (status, run_at, error, job_id))
+
+    def purge_jobs(self, before: str) -> int:
+        """`before` dan oldin tugagan (done/failed) vazifalarni o'chirish"""
+        with self.cursor() as c:
+            return self._exec(c, "jobs_purge", (before,))
+
+    # === Kun yakuni tahlillari ===
+    def get_review(self, user_id: int, day: str):
+        with self.cursor() as c:
+            row = self._one(c, "review_get", (user_id, day))
+            return row["analysis"] if row else None
+
+    def put_review(self, user_id: int, day: str, analysis: str, computed_at: str):
+        with self.cursor() as c:
+            self._exec(c, "review_put", (user_id, day, analysis, computed_at))
+
+    def delete_review(self, user_id: int, day: str):
+        with self.cursor() as c:
+            self._exec(c, "review_delete", (user_id, day))
+
+    # === Idempotency kalitlari ===
+    def idem_reserve(self, user_id: int, key: str, fingerprint: str, now: float) -> bool:
+        """Kalitni band qilish; boshqa so'rov allaqachon band qilgan bo'lsa False"""
+        with self.cursor() as c:
+            return self._exec(c, "idem_insert", (user_id, key, fingerprint, now)) > 0
+
+    def idem_get(self, user_id: int, key: str):
+        with self.cursor() as c:
+            return self._one(c, "idem_get", (user_id, key))
+
+    def idem_complete(self, user_id: int, key: str, status_code: int, body: str):
+        with self.cursor() as c:
+            self._exec(c, "idem_complete", (status_code, body, user_id, key))
+
+    def idem_takeover(self, user_id: int, key: str, now: float, stale_before: float) -> bool:
+        """Ijarasi o'tgan javobsiz kalitni qayta band qilish; boshqasi olgan bo'lsa False"""
+        with self.cursor() as c:
+            return self._exec(c, "idem_takeover", (now, user_id, key, stale_before)) > 0
+
+    def idem_release(self, user_id: int, key: str):
+        with self.cursor() as c:
+            self._exec(c, "idem_delete", (user_id, key))
+
+    def idem_purge(self, before: float) -> int:
+        with self.cursor() as c:
+            return self._exec(c, "idem_purge", (before,))
+
+    # === To'liq matnli qidiruv (FTS5) ===
+    def search_window(self, kind: str, match: str, upto: int, limit: int) -> list:
+        """id <= upto bo'lgan eng yangi `limit` ta moslik (id kamayish tartibida)"""
+        with self.cursor() as c:
+            return self._all(c, f"search_{kind}", (match, upto, limit))
+
+    def search_index_range(self, kind: str, lo: int, hi: int) -> int:
+        """lo < id <= hi qatorlarini indeksga qo'shish"""
+        with self.cursor() as c:
+            return self._exec(c, f"search_{kind}_index", (lo, hi))
+
+    def search_reset(self, kind: str) -> int:
+        """Indeksni tozalash; qayta to'ldirish kerak bo'lgan max id ni qaytaradi.
+        Ikkalasi bitta tranzaksiyada — keyingi qatorlarni trigger indekslaydi"""
+        with self.cursor() as c:
+            self._exec(c, f"search_{kind}_clear", ())
+            return self._one(c, f"search_{kind}_max", ())["id"]
+
+    def search_optimize(self, kind: str):
+        with self.cursor() as c:
+            self._exec(c, f"search_{kind}_optimize", ())
+
+
+# -------------------------------------------------------
+# PostgreSQL (ixtiyoriy: pip install "psycopg[pool]")
+# -------------------------------------------------------
+class PostgresStorage(SQLiteStorage):
+    """PostgreSQL: ulanishlar puli, har bir so'rov serverda prepare qilinadi"""
+
+    name = "postgres"
+    PARAM = "%s"
+    SEARCH = False  # FTS5 — faqat SQLite
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10):
+        import psycopg
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+
+        self._errors = psycopg.errors
+        self._unique_violation = psycopg.errors.UniqueViolation
+        self.POOL_SIZE = min_size
+        self.search_pending = {}
+        self.sql = {k: queries.to_pg(v)
+                    for k, v in {**queries.SQL, **queries.PG_OVERRIDES}.items()}
+        # prepare_threshold=0 — birinchi bajarilishdayoq server tomonida PREPARE
+        self.pool = ConnectionPool(
+            dsn, min_size=min_size, max_size=max_size, open=True,
+            kwargs={"row_factory": dict_row, "prepare_threshold": 0},
+        )
+
+    def connect(self):
+        raise NotImplementedError("PostgresStorage ulanishlarni puldan oladi")
+
+    @contextmanager
+    def cursor(self):
+        # pool.connection() muvaffaqiyatda commit, xatoda rollback qiladi
+        with self.pool.connection() as conn:
+            with conn.cursor() as c:
+                yield c
+
+    def _insert(self, c, name, params) -> int:
+        return self._one(c, name, params)["id"]
+
+    def _plain_rows(self, c):
+        from psycopg.rows import tuple_row
+        c.row_factory = tuple_row
+
+    def _explain(self, c, name, params, rerun: bool = True):
+        """SELECT: EXPLAIN (ANALYZE) — skan tugunlarida haqiqiy ko'rilgan qatorlar
+        (qaytarilgan + filtr tashlagan) x takrorlar; boshqalar: faqat reja"""
+        from psycopg.rows import tuple_row
+        sql = self.sql[name]
+        with c.connection.cursor(row_factory=tuple_row) as ec:
+            if not rerun or not sql.lstrip().upper().startswith("SELECT"):
+                ec.execute("EXPLAIN " + sql, params)
+                return [r[0] for r in ec.fetchall()], None
+            ec.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params)
+            doc = ec.fetchone()[0]
+        if isinstance(doc, str):
+            doc = json.loads(doc)
+        plan, scanned = [], 0
+
+        def walk(node, depth):
+            nonlocal scanned
+            loops = node.get("Actual Loops", 1)
+            label = node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+            if "Index Name" in node:
+                label += f" using {node['Index Name']}"
+            plan.append("  " * depth + f"{label} (rows={node.get('Actual Rows')} loops={loops})")
+            if node["Node Type"].endswith("Scan"):
+                scanned += (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+            for child in node.get("Plans", ()):
+                walk(child, depth + 1)
+        walk(doc[0]["Plan"], 0)
+        return plan, {"rows_scanned": scanned}
+
+    def init_schema(self) -> bool:
+        with self.cursor() as c:
+            c.execute("SELECT to_regclass('schema_meta') IS NOT NULL AS ok")
+            if c.fetchone()["ok"]:
+                c.execute("SELECT max(version) AS v FROM schema_meta")
+                if c.fetchone()["v"] == queries.SCHEMA_VERSION:
+                    return False
+            c.execute("SELECT to_regclass('change_log') IS NOT NULL AS ok")
+            had_log = c.fetchone()["ok"]
+            for ddl in queries.PG_SCHEMA:
+                c.execute(ddl)
+            for table, column, coltype in queries.COLUMNS:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {coltype}")
+            for ddl in queries.INDEXES:
+                c.execute(ddl)
+            if not had_log:
+                for ddl in queries.SYNC_BACKFILL:
+                    c.execute(ddl)
+            c.execute("CREATE TABLE IF NOT EXISTS schema_meta (version INTEGER NOT NULL)")
+            c.execute("INSERT INTO schema_meta VALUES (%s)", (queries.SCHEMA_VERSION,))
+            return True
+
+    def create_user(self, username: str, password_hash: str, tz: str = None) -> int:
+        try:
+            with self.cursor() as c:
+                return self._insert(c, "user_insert", (username, password_hash, tz))
+        except self._errors.UniqueViolation:
+            raise UsernameTaken(username)
+
+    def enqueue_job(self, kind: str, user_id: int, job_key: str, run_at: str):
+        with self.cursor() as c:
+            row = self._one(c, "job_insert", (kind, user_id, job_key, run_at))
+            return row["id"] if row else None
+
+    def close(self):
+        self.pool.close()
+
+
+# -------------------------------------------------------
+# Tanlash
+# -------------------------------------------------------
+def open_storage(url: str):
+    """postgres(ql):// — PostgreSQL, aks holda SQLite fayl yo'li"""
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresStorage(url)
+    return SQLiteStorage(url)
+
+
+def from_env(default_path: str):
+    return open_storage(os.environ.get("DATABASE_URL") or default_path)
+
+
+if __name__ == "__main__":
+    # Ombor bo'ylab to'liq aylanish: user -> reja -> sessiya -> chat
+    import sys
+    import uuid
+
+    store = open_storage(sys.argv[1] if len(sys.argv) > 1 else ":memory:")
+    if store.name == "sqlite" and store.path == ":memory:":
+        sys.exit("Fayl yo'li yoki postgresql:// DSN bering")
+    store.init_schema()
+    today = datetime.now().strftime('%Y-%m-%d')
+    uname = "t_" + uuid.uuid4().hex[:8]
+    uid = store.create_user(uname, "x")
+    try:
+        store.create_user(uname, "x")
+        raise AssertionError("takroriy username qabul qilindi")
+    except UsernameTaken:
+        pass
+    assert store.get_user_by_username(uname)["id"] == uid
+    pid = store.add_plan(uid, "test reja", today)
+    store.complete_plan(uid, pid)
+    assert store.plans_for_day(uid, today)[0]["completed"] == 1
+    sid = store.start_session(uid, 25, datetime.now().isoformat())
+    assert store.end_session(uid, sid, "youtube", "distracted") == 0
+    assert store.end_session(uid + 1, sid, None, "completed") is None
+    try:
+        store.end_session(uid, sid, None, "completed")
+        raise AssertionError("yopilgan sessiya qayta yopildi")
+    except SessionClosed:
+        pass
+    assert store.day_stats(uid, today) == {"sessions": 1, "total_minutes": 0, "distractions": 1}
+    store.add_chat_turn(uid, "salom", "Salom!")
+    assert [m["role"] for m in store.chat_history(uid, 10)] == ["user", "assistant"]
+    # delta sync: reja ikki marta o'zgardi — jurnalda bitta qator, oxirgi seq bilan
+    delta = store.changes_since(uid, 0, 100)
+    assert delta["seq"] == 6 and not delta["more"] and not delta["reset"], delta
+    assert [r["seq"] for r in delta["plans"]] == [2] and delta["plans"][0]["completed"] == 1
+    assert [r["seq"] for r in delta["sessions"]] == [4] and [r["seq"] for r in delta["chat"]] == [5, 6]
+    page = store.changes_since(uid, 0, 2)
+    assert page["seq"] == 4 and page["more"] and page["chat"] == []
+    assert store.changes_since(uid, 6, 100)["chat"] == []
+    assert store.changes_since(uid, 99, 100)["reset"]
+    # bitta ochiq sessiya: yangisi oldingisini yopadi
+    first = store.start_session(uid, 25, datetime.now().isoformat())
+    second = store.start_session(uid, 25, datetime.now().isoformat())
+    assert [r["id"] for r in store.open_sessions() if r["user_id"] == uid] == [second], first
+    store.end_session(uid, second, None, "completed")
+    print(f"✅ {store.name}: barcha tekshiruvlar o'tdi")
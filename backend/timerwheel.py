@@ -0,0 +1,82 @@
+# ==============================================================
+# Aliman AI - Timer wheel (xeshlangan taymer g'ildiragi)
+# ==============================================================
+# Ko'p sonli kechiktirilgan vazifalar uchun: schedule/cancel — O(1),
+# har bir tick faqat bitta slotni ko'rib chiqadi. Jadvalni davriy
+# skanerlash o'rniga ishlatiladi (masalan, tashlab ketilgan fokus
+# sessiyalarini avtomatik yopish).
+# ==============================================================
+
+import threading
+import time
+
+
+class TimerWheel:
+    """`tick` soniyali qadamlar, `slots` ta slot; uzoqroq kechikishlar
+    aylanishlar soni (rounds) bilan saqlanadi"""
+
+    def __init__(self, tick: float = 1.0, slots: int = 512, name: str = "timerwheel"):
+        self.tick = tick
+        self.slots = [dict() for _ in range(slots)]
+        self.cursor = 0
+        self.index = {}  # key -> slot raqami
+        self.lock = threading.Lock()
+        self.name = name
+        self._thread = None
+
+    def schedule(self, key, delay: float, callback):
+        """`delay` soniyadan keyin callback(key); shu key bo'lsa — almashtiriladi"""
+        ticks = max(1, int(-(-delay // self.tick)))  # yuqoriga yaxlitlash
+        with self.lock:
+            self._cancel(key)
+            slot = (self.cursor + ticks) % len(self.slots)
+            rounds = (ticks - 1) // len(self.slots)
+            self.slots[slot][key] = [rounds, callback]
+            self.index[key] = slot
+
+    def cancel(self, key) -> bool:
+        with self.lock:
+            return self._cancel(key)
+
+    def _cancel(self, key) -> bool:
+        slot = self.index.pop(key, None)
+        if slot is None:
+            return False
+        del self.slots[slot][key]
+        return True
+
+    def __len__(self):
+        return len(self.index)
+
+    def advance(self):
+        """Bitta qadam: joriy slotdagi muddati kelgan vazifalarni bajarish"""
+        due = []
+        with self.lock:
+            self.cursor = (self.cursor + 1) % len(self.slots)
+            bucket = self.slots[self.cursor]
+            for key, entry in list(bucket.items()):
+                if entry[0] > 0:
+                    entry[0] -= 1
+                    continue
+                del bucket[key]
+                del self.index[key]
+                due.append((key, entry[1]))
+        # callbacklar qulfsiz chaqiriladi — ular qayta schedule qilishi mumkin
+        for key, callback in due:
+            try:
+                callback(key)
+            except Exception as e:
+                print(f"❌ {self.name}: {key!r} vazifasi xatosi:", e)
+
+    def _run(self):
+        next_at = time.monotonic() + self.tick
+        while True:
+            time.sleep(max(0.0, next_at - time.monotonic()))
+            next_at += self.tick
+            self.advance()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
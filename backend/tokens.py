@@ -0,0 +1,89 @@
+# ==============================================================
+# Aliman AI - Ixcham (binary) sessiya tokenlari
+# ==============================================================
+# JWT o'rniga qat'iy tuzilmali 26 baytlik token (base64url — 35 belgi):
+#
+#   ver:u8 | kid:u8 | user_id:u64 | exp:u32 (unix soniya) | hmac:12 bayt
+#
+# Imzo — HMAC-SHA256 ning birinchi 96 biti; tekshiruv: bitta struct.unpack,
+# bitta HMAC va bitta hmac.compare_digest. JSON parse yo'q.
+#
+# Kalitlar rotatsiyasi: TOKEN_KEYS="2:yangi-sir,1:eski-sir" — birinchisi
+# faol (yangi tokenlar shu bilan imzolanadi), qolganlari faqat tekshirish
+# uchun saqlanadi, shunda eski tokenlar muddati tugaguncha ishlaydi.
+# ==============================================================
+
+import base64
+import hashlib
+import hmac
+import struct
+import time
+
+VERSION = 1
+_LAYOUT = struct.Struct(">BBQI")
+MAC_BYTES = 12
+TOKEN_BYTES = _LAYOUT.size + MAC_BYTES
+
+
+def parse_keys(spec: str) -> dict:
+    """TOKEN_KEYS satri -> {kid: kalit}; tartib saqlanadi (birinchisi faol)"""
+    keys = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kid, _, secret = part.partition(":")
+        keys[int(kid)] = secret.encode()
+    return keys
+
+
+class CompactTokens:
+    def __init__(self, keys: dict):
+        if not keys:
+            raise ValueError("kamida bitta kalit kerak")
+        if any(not 0 <= kid <= 255 for kid in keys):
+            raise ValueError("kid 0..255 oralig'ida bo'lishi kerak")
+        self.keys = dict(keys)
+        self.active_kid = next(iter(keys))
+
+    def _mac(self, key: bytes, body: bytes) -> bytes:
+        return hmac.new(key, body, hashlib.sha256).digest()[:MAC_BYTES]
+
+    def encode(self, user_id: int, ttl_seconds: int) -> str:
+        body = _LAYOUT.pack(VERSION, self.active_kid, user_id, int(time.time()) + ttl_seconds)
+        raw = body + self._mac(self.keys[self.active_kid], body)
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    def decode(self, token: str):
+        """(user_id, exp) yoki None (buzilgan, noma'lum kalit, muddati o'tgan)"""
+        if len(token) != 35:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + "=")
+        except (ValueError, TypeError):
+            return None
+        if len(raw) != TOKEN_BYTES:
+            return None
+        body, mac = raw[:_LAYOUT.size], raw[_LAYOUT.size:]
+        ver, kid, user_id, exp = _LAYOUT.unpack(body)
+        key = self.keys.get(kid)
+        if ver != VERSION or key is None:
+            return None
+        if not hmac.compare_digest(mac, self._mac(key, body)):
+            return None
+        if exp < time.time():
+            return None
+        return user_id, exp
+
+
+if __name__ == "__main__":
+    # JWT bilan solishtirish: python3 tokens.py
+    import timeit
+    import jwt
+
+    ct = CompactTokens({1: b"k" * 32})
+    t = ct.encode(123456, 3600)
+    j = jwt.encode({"sub": "123456", "username": "aliman_user", "exp": int(time.time()) + 3600},
+                   "k" * 32, algorithm="HS256")
+    n = 20000
+    tc = timeit.timeit(lambda: ct.decode(t), number=n) / n
+    tj = timeit.timeit(lambda: jwt.decode(j, "k" * 32, algorithms=["HS256"]), number=n) / n
+    print(f"compact: {len(t):3} belgi  {tc * 1e6:6.2f} µs/tekshiruv")
+    print(f"jwt:     {len(j):3} belgi  {tj * 1e6:6.2f} µs/tekshiruv  (x{tj / tc:.1f})")
@@ -0,0 +1,67 @@
+# ==============================================================
+# Aliman AI - Foydalanuvchi vaqt zonasi
+# ==============================================================
+# "Bugun" har bir foydalanuvchi uchun o'z mahalliy sanasi. Zona IANA
+# nomi bilan users.timezone da saqlanadi va tokenga (`tz`) yoziladi.
+# Zona berilmagan bo'lsa — DEFAULT_TZ yoki serverning mahalliy vaqti.
+#
+# Vaqt belgilari ofset bilan yoziladi (2024-05-01T21:30:00+05:00), shuning
+# uchun birinchi 10 belgi — foydalanuvchining mahalliy sanasi.
+# ==============================================================
+
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+DEFAULT_TZ = os.environ.get("DEFAULT_TZ", "")
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str):
+    """IANA nomi -> tzinfo; noto'g'ri yoki bo'sh bo'lsa None"""
+    if not name or ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def valid_zone(name) -> bool:
+    return isinstance(name, str) and get_zone(name) is not None
+
+
+def zone_for(name: str = None):
+    return get_zone(name) or get_zone(DEFAULT_TZ)
+
+
+def now_for(name: str = None) -> datetime:
+    """Foydalanuvchining hozirgi vaqti (tz-aware)"""
+    zone = zone_for(name)
+    if zone is None:
+        return datetime.now().astimezone()  # serverning mahalliy zonasi
+    return datetime.now(zone)
+
+
+def today_for(name: str = None) -> str:
+    return now_for(name).strftime('%Y-%m-%d')
+
+
+def stamp(dt: datetime) -> str:
+    return dt.isoformat(timespec='seconds')
+
+
+def parse_ts(value) -> datetime:
+    """DB dagi vaqt belgisini tz-aware datetime ga; ofsetsizlari — server vaqti"""
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    return dt if dt.tzinfo is not None else dt.astimezone()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
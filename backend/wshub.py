@@ -0,0 +1,282 @@
+# ==============================================================
+# Aliman AI - WebSocket hub (/ws)
+# ==============================================================
+# Bitta ulanishda ko'p so'rov: token ulanish boshida bir marta tekshiriladi,
+# keyingi kadrlar oddiy core.dispatch orqali o'tadi (rate limit, idempotency,
+# ETag — HTTP bilan bir xil javoblar), server esa o'zgarishlarni o'zi yuboradi.
+#
+# Protokol (JSON matn kadrlari):
+#   -> {"type": "auth", "token": "..."}                          birinchi kadr
+#   <- {"type": "ready", "username": "..."}
+#   -> {"id": 1, "method": "POST", "path": "/api/chat", "body": {...},
+#       "headers": {"Idempotency-Key": "..."}}
+#   <- {"id": 1, "status": 200, "headers": {...}, "body": {...}}
+#   <- {"type": "changed", "topics": ["chat", "dashboard"]}      server push
+#
+# Oqimli javob (/api/chat/stream): avval bo'laklar, so'ng body siz yakuniy kadr
+#   <- {"id": 2, "chunk": "event: delta\ndata: {...}\n\n"}       SSE matni, HTTP dagi kabi
+#   <- {"id": 2, "status": 200, "headers": {}, "body": null}
+#
+# Backpressure: ulanishda ko'pi bilan MAX_INFLIGHT ta bajarilayotgan so'rov —
+# to'lsa keyingi kadr o'qilmaydi (TCP oynasi mijozni to'xtatadi). Push lar
+# navbatga emas, mavzular to'plamiga yig'iladi: sekin mijozda ham xotira
+# o'smaydi. Bitta yuborish SEND_TIMEOUT dan oshsa — ulanish yopiladi.
+# Bo'sh ulanish — bitta korutina (oqim emas): jarayonda o'n minglab; handlerlar
+# sinxron, faqat kadr kelganda threadpool da bajariladi.
+#
+# Adapter (main.py) ws obyektini beradi: accept(), receive() -> str | None
+# (None — ulanish yopildi), send(str), close(code).
+# ==============================================================
+
+import asyncio
+import os
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import core
+import fastjson
+
+AUTH_TIMEOUT = 10          # soniya: auth kadri kelmasa yopiladi
+SEND_TIMEOUT = 10          # soniya: sekin mijoz
+REAUTH_SECONDS = 300       # token muddati / bloklangan foydalanuvchi uchun qayta tekshirish
+MAX_INFLIGHT = int(os.environ.get("WS_MAX_INFLIGHT", "8"))
+MAX_FRAME = 64 * 1024
+
+# WebSocket orqali ochiq endpointlar (path parametrlarsiz)
+ENDPOINTS = ("dashboard", "create_plan", "focus_start", "focus_end", "chat", "chat_stream", "chat_history")
+FORWARD_HEADERS = ("Idempotency-Key", "If-None-Match")
+RESPONSE_HEADERS = ("ETag", "Retry-After", "Idempotent-Replayed")
+
+# yopish kodlari
+CLOSE_AUTH = 4401
+CLOSE_TIMEOUT = 4408
+CLOSE_TOO_BIG = 1009
+
+
+class Connection:
+    __slots__ = ("ws", "user", "token", "authed_at", "headers", "remote_addr",
+                 "slots", "send_lock", "topics", "pushing", "closed")
+
+    def __init__(self, ws, user: dict, token: str, remote_addr: str, headers: dict):
+        self.ws = ws
+        self.user = user
+        self.token = token
+        self.authed_at = time.monotonic()
+        self.headers = headers  # handshake dan: X-Forwarded-For (core.client_ip)
+        self.remote_addr = remote_addr
+        self.slots = asyncio.Semaphore(MAX_INFLIGHT)
+        self.send_lock = asyncio.Lock()
+        self.topics = set()     # yuborilmagan push mavzulari
+        self.pushing = False
+        self.closed = False
+
+
+def _user_for(token: str):
+    """Token -> core foydalanuvchisi yoki None (threadpool da chaqiriladi)"""
+    req = core.Request("GET", "/ws", {}, {"Authorization": f"Bearer {token}"})
+    try:
+        return core.authenticate(req)
+    except core.ApiError:
+        return None
+
+
+def _loads(text: str):
+    try:
+        frame = fastjson.loads(text)
+    except ValueError:
+        return None
+    return frame if isinstance(frame, dict) else None
+
+
+def _reply(rid, status: int, headers: dict, body: bytes) -> str:
+    """Javob kadri: handler JSON baytlari qayta parse qilinmasdan joylanadi"""
+    return (b'{"id":%s,"status":%d,"headers":%s,"body":%s}' % (
+        fastjson.dumps(rid), status, fastjson.dumps(headers), body or b"null")).decode("utf-8")
+
+
+def _chunk(rid, chunk: bytes) -> str:
+    return (b'{"id":%s,"chunk":%s}' % (fastjson.dumps(rid), fastjson.dumps(chunk.decode("utf-8")))).decode("utf-8")
+
+
+def _error(rid, status: int, detail: str) -> str:
+    return _reply(rid, status, {}, fastjson.dumps({"detail": detail}))
+
+
+class Hub:
+    def __init__(self):
+        self.loop = None
+        self.by_user = {}  # user_id -> set[Connection]; faqat event loop oqimida o'zgaradi
+        self.tasks = set()
+        self.routes = {(r.method, r.path): r for r in core.ROUTES if r.endpoint in ENDPOINTS}
+        self.stats = {"connections": 0, "frames": 0, "pushes": 0, "slow_closed": 0}
+        core.CHANGE_LISTENERS.append(self.publish)
+
+    # === Ulanish ===
+    async def serve(self, ws, remote_addr: str = None, forwarded_for: str = None):
+        """Bitta ulanishning butun umri: auth, so'rovlar, yopilish"""
+        self.loop = asyncio.get_running_loop()
+        await ws.accept()
+        conn = await self._open(ws, remote_addr, {"X-Forwarded-For": forwarded_for} if forwarded_for else {})
+        if conn is None:
+            return
+        self.by_user.setdefault(conn.user['id'], set()).add(conn)
+        self.stats["connections"] += 1
+        try:
+            await self._send(conn, fastjson.dumps({"type": "ready", "username": conn.user['username']}).decode())
+            while not conn.closed:
+                await conn.slots.acquire()  # backpressure: bo'sh joy bo'lgandagina o'qiladi
+                text = await ws.receive()
+                if text is None:
+                    break
+                if len(text) > MAX_FRAME:
+                    await self._close(conn, CLOSE_TOO_BIG)
+                    break
+                self.stats["frames"] += 1
+                self._spawn(self._handle(conn, text))
+        finally:
+            conn.closed = True
+            self.stats["connections"] -= 1
+            peers = self.by_user.get(conn.user['id'])
+            peers.discard(conn)
+            if not peers:
+                del self.by_user[conn.user['id']]
+
+    async def _open(self, ws, remote_addr: str, headers: dict):
+        try:
+            text = await asyncio.wait_for(ws.receive(), AUTH_TIMEOUT)
+        except asyncio.TimeoutError:
+            await ws.close(CLOSE_TIMEOUT)
+            return None
+        if text is None:
+            return None
+        frame = _loads(text)
+        token = frame.get('token') if frame and frame.get('type') == 'auth' else None
+        user = await asyncio.to_thread(_user_for, token) if isinstance(token, str) else None
+        if user is None:
+            await ws.send(fastjson.dumps({"type": "error", "status": 401,
+                                          "detail": "Token yaroqsiz yoki muddati o'tgan"}).decode())
+            await ws.close(CLOSE_AUTH)
+            return None
+        return Connection(ws, user, token, remote_addr, headers)
+
+    # === So'rov kadrlari ===
+    async def _handle(self, conn: Connection, text: str):
+        frame = _loads(text)
+        try:
+            try:
+                reply = await self._request(conn, frame)
+            except Exception as e:
+                # kutilmagan xato (masalan, baza): kadr javobsiz qolsa mijoz osilib qoladi
+                print("❌ WebSocket so'rov xatosi:", repr(e))
+                reply = _error(frame.get('id') if frame else None, 500, "Serverda xato yuz berdi")
+            if reply is not None:
+                await self._send(conn, reply)
+        finally:
+            conn.slots.release()
+
+    async def _request(self, conn: Connection, frame: dict):
+        """Kadr -> javob kadri (None — ulanish yopildi)"""
+        if frame is None:
+            return _error(None, 400, "Kadr JSON obyekt bo'lishi kerak")
+        rid = frame.get('id')
+        path = frame.get('path')
+        if not isinstance(path, str):
+            return _error(rid, 400, "path talab qilinadi")
+        parts = urlsplit(path)
+        r = self.routes.get((frame.get('method', 'GET'), parts.path))
+        if r is None:
+            return _error(rid, 404, "Bu endpoint WebSocket orqali mavjud emas")
+
+        if time.monotonic() - conn.authed_at > REAUTH_SECONDS:
+            user = await asyncio.to_thread(_user_for, conn.token)
+            if user is None:
+                await self._send(conn, _error(rid, 401, "Token yaroqsiz yoki muddati o'tgan"))
+                await self._close(conn, CLOSE_AUTH)
+                return None
+            conn.user, conn.authed_at = user, time.monotonic()
+
+        given = frame.get('headers')
+        headers = dict(conn.headers)
+        if isinstance(given, dict):
+            lower = {str(k).lower(): v for k, v in given.items() if isinstance(v, str)}
+            headers.update((name, lower[name.lower()]) for name in FORWARD_HEADERS if name.lower() in lower)
+        body = frame.get('body')
+        req = core.Request(r.method, parts.path, dict(parse_qsl(parts.query)), headers,
+                           fastjson.dumps(body) if body is not None else b"", conn.remote_addr)
+        resp = await asyncio.to_thread(core.dispatch, r, req, {}, conn.user)
+        out = {k: resp.headers[k] for k in RESPONSE_HEADERS if k in resp.headers}
+        if not isinstance(resp.body, bytes):
+            await self._stream(conn, rid, resp.body)
+            return _reply(rid, resp.status, out, None)
+        return _reply(rid, resp.status, out, resp.body if resp.status != 304 else None)
+
+    async def _stream(self, conn: Connection, rid, body):
+        """Bo'laklar iteratori: har biri threadpool da olinib, alohida kadrda yuboriladi"""
+        it = iter(body)
+        try:
+            while not conn.closed:
+                chunk = await asyncio.to_thread(next, it, None)
+                if chunk is None:
+                    break
+                await self._send(conn, _chunk(rid, chunk))
+        finally:
+            # mijoz uzilgan bo'lsa generator yopiladi (core.chat_stream: ko'rilgan qism saqlanadi)
+            close = getattr(it, "close", None)
+            if close is not None:
+                await asyncio.to_thread(close)
+
+    # === Server push ===
+    def publish(self, user_id: int, topic: str):
+        """core.CHANGE_LISTENERS: istalgan oqimdan; faqat loop ga belgi qo'yadi"""
+        loop = self.loop
+        if loop is None or user_id not in self.by_user:
+            return
+        try:
+            loop.call_soon_threadsafe(self._mark, user_id, topic)
+        except RuntimeError:  # loop to'xtagan (server o'chmoqda)
+            pass
+
+    def _mark(self, user_id: int, topic: str):
+        for conn in self.by_user.get(user_id, ()):
+            conn.topics.add(topic)
+            if not conn.pushing:
+                conn.pushing = True
+                self._spawn(self._push(conn))
+
+    async def _push(self, conn: Connection):
+        """Yig'ilgan mavzular bitta kadrda; yuborish davomida kelganlari — keyingisida"""
+        try:
+            while conn.topics and not conn.closed:
+                topics, conn.topics = sorted(conn.topics), set()
+                await self._send(conn, fastjson.dumps({"type": "changed", "topics": topics}).decode())
+                self.stats["pushes"] += 1
+        finally:
+            conn.pushing = False
+
+    # === Yordamchilar ===
+    async def _send(self, conn: Connection, text: str):
+        if conn.closed:
+            return
+        async with conn.send_lock:
+            try:
+                await asyncio.wait_for(conn.ws.send(text), SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.stats["slow_closed"] += 1
+                await self._close(conn, CLOSE_TIMEOUT)
+            except Exception:  # mijoz uzilgan — reader ham None oladi
+                conn.closed = True
+
+    async def _close(self, conn: Connection, code: int):
+        conn.closed = True
+        try:
+            await asyncio.wait_for(conn.ws.close(code), 1)
+        except Exception:
+            pass
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self.tasks.add(task)  # loop faqat zaif havola saqlaydi
+        task.add_done_callback(self.tasks.discard)
+
+
+hub = Hub()
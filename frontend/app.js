@@ -12,12 +12,15 @@ const API_URL = 'http://localhost:8000';
 // -------------------------------------------------------
 let token = localStorage.getItem('aliman_token') || null;
 let username = localStorage.getItem('aliman_username') || null;
+let socketSupported = localStorage.getItem('aliman_ws') === '1';  // server /ws ni e'lon qilganmi
 let focusSessionId = null;          // Joriy fokus sessiyasi ID
 let focusTimerInterval = null;      // Taymer intervali
 let focusMinutesLeft = 25;          // Qolgan daqiqalar
 let focusSecondsLeft = 0;           // Qolgan soniyalar
 let selectedFocusMinutes = 25;      // Tanlangan fokus vaqti
 let isPageLeaving = false;          // Sahifadan chiqilayotganmi
+let outbox = JSON.parse(localStorage.getItem('aliman_outbox') || '[]');  // Yuborilmagan yozuvlar
+let syncSeq = Number(localStorage.getItem('aliman_sync_seq') || 0);     // /api/sync kursori
 
 // -------------------------------------------------------
 // Ilova Ishga Tushishi
@@ -37,6 +40,16 @@ document.addEventListener('DOMContentLoaded', () => {
     // Sahifadan chiqishni nazorat qilish (fokus rejimida)
     window.addEventListener('beforeunload', handlePageLeave);
     document.addEventListener('visibilitychange', handleVisibilityChange);
+    
+    // App shell keshi va oflayn navbat
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('sw.js', { updateViaCache: 'none' })
+            .catch(e => console.warn('Service worker ro\'yxatdan o\'tmadi:', e));
+        navigator.serviceWorker.addEventListener('message', handleWorkerMessage);
+    }
+    window.addEventListener('online', flushOutbox);
+    if (token && outbox.length) flushOutbox();
+    if (token) openSocket();
 });
 
 // -------------------------------------------------------
@@ -54,6 +67,17 @@ function switchTab(tab) {
     document.getElementById('register-form').classList.toggle('hidden', tab !== 'register');
 }
 
+/**
+ * Brauzerning IANA vaqt zonasi (masalan, "Asia/Tashkent") — server "bugun"ni shunga qarab hisoblaydi
+ */
+function userTimezone() {
+    try {
+        return Intl.DateTimeFormat().resolvedOptions().timeZone || null;
+    } catch (e) {
+        return null;
+    }
+}
+
 /**
  * Ro'yxatdan o'tish
  */
@@ -68,8 +92,8 @@ async function register() {
     }
     
     try {
-        const res = await apiCall('/api/register', 'POST', { username: username_val, password: password_val });
-        saveAuth(res.token, res.username);
+        const res = await apiCall('/api/register', 'POST', { username: username_val, password: password_val, timezone: userTimezone() });
+        saveAuth(res.token, res.username, res.ws);
         showApp();
         loadDashboard();
     } catch (e) {
@@ -91,8 +115,8 @@ async function login() {
     }
     
     try {
-        const res = await apiCall('/api/login', 'POST', { username: username_val, password: password_val });
-        saveAuth(res.token, res.username);
+        const res = await apiCall('/api/login', 'POST', { username: username_val, password: password_val, timezone: userTimezone() });
+        saveAuth(res.token, res.username, res.ws);
         showApp();
         loadDashboard();
     } catch (e) {
@@ -106,8 +130,11 @@ async function login() {
 function logout() {
     localStorage.removeItem('aliman_token');
     localStorage.removeItem('aliman_username');
+    localStorage.removeItem('aliman_ws');
     token = null;
     username = null;
+    resetSyncState();
+    closeSocket();
     
     document.getElementById('app').classList.add('hidden');
     document.getElementById('auth-page').classList.remove('hidden');
@@ -116,11 +143,27 @@ function logout() {
 /**
  * Auth ma'lumotlarini saqlash
  */
-function saveAuth(t, u) {
+function saveAuth(t, u, ws = false) {
+    if (u !== username) resetSyncState();
     token = t;
     username = u;
+    socketSupported = !!ws;
     localStorage.setItem('aliman_token', t);
     localStorage.setItem('aliman_username', u);
+    localStorage.setItem('aliman_ws', socketSupported ? '1' : '0');
+    closeSocket();
+    openSocket();
+}
+
+/**
+ * Boshqa foydalanuvchi: navbat, kursor va service worker dagi API keshi tozalanadi
+ */
+function resetSyncState() {
+    outbox = [];
+    syncSeq = 0;
+    localStorage.removeItem('aliman_outbox');
+    localStorage.removeItem('aliman_sync_seq');
+    navigator.serviceWorker?.controller?.postMessage({ type: 'clear-api' });
 }
 
 // -------------------------------------------------------
@@ -163,24 +206,28 @@ function showSection(section) {
  */
 async function loadDashboard() {
     try {
-        const data = await apiCall('/api/dashboard', 'GET');
-        
-        // AI savolini ko'rsatish
-        document.getElementById('ai-question').textContent = data.ai_question;
-        
-        // Statistikani yangilash
-        document.getElementById('stat-minutes').textContent = data.stats.total_minutes || 0;
-        document.getElementById('stat-sessions').textContent = data.stats.sessions || 0;
-        document.getElementById('stat-distractions').textContent = data.stats.distractions || 0;
-        
-        // Rejalarni ko'rsatish
-        renderPlansList(data.plans, 'plans-list', false);
-        
+        renderDashboard(await apiCall('/api/dashboard', 'GET'));
     } catch (e) {
         console.error('Dashboard yuklanmadi:', e);
     }
 }
 
+/**
+ * Dashboard javobini chizish (service worker yangi versiya yuborganda ham)
+ */
+function renderDashboard(data) {
+    // AI savolini ko'rsatish
+    document.getElementById('ai-question').textContent = data.ai_question;
+    
+    // Statistikani yangilash
+    document.getElementById('stat-minutes').textContent = data.stats.total_minutes || 0;
+    document.getElementById('stat-sessions').textContent = data.stats.sessions || 0;
+    document.getElementById('stat-distractions').textContent = data.stats.distractions || 0;
+    
+    // Rejalarni ko'rsatish
+    renderPlansList(data.plans, 'plans-list', false);
+}
+
 /**
  * Tezkor reja qo'shish (Dashboard'dan)
  */
@@ -205,16 +252,21 @@ function renderPlansList(plans, containerId, fullView = false) {
     const container = document.getElementById(containerId);
     if (!container) return;
     
-    if (!plans || plans.length === 0) {
+    // Oflayn navbatdagilar: yangi rejalar xira, bajarilganlar belgilangan
+    const queuedDone = new Set(outbox.filter(m => m.op === 'plan.complete').map(m => m.plan_id));
+    const queuedNew = outbox.filter(m => m.op === 'plan.create')
+        .map(m => ({ id: m.id, plan_text: m.plan_text, completed: 0, pending: true }));
+    plans = (plans || []).map(p => queuedDone.has(p.id) ? { ...p, completed: 1 } : p).concat(queuedNew);
+    
+    if (plans.length === 0) {
         container.innerHTML = '<p style="color: var(--gray-400); font-size: 14px; text-align: center; padding: 20px;">Hali reja yo\'q. Yuqoridan qo\'shing! ☝️</p>';
         return;
     }
     
     container.innerHTML = plans.map(plan => `
-        <div class="plan-item ${plan.completed ? 'completed' : ''}" id="plan-${plan.id}">
+        <div class="plan-item ${plan.completed ? 'completed' : ''} ${plan.pending ? 'pending' : ''}" id="plan-${plan.id}">
             <div class="plan-check ${plan.completed ? 'checked' : ''}" 
-                 onclick="completePlan(${plan.id})" 
-                 title="Bajarildi deb belgilash">
+                 ${plan.pending ? 'title="Tarmoq qaytganda yuboriladi"' : `onclick="completePlan(${plan.id})" title="Bajarildi deb belgilash"`}>
                 ${plan.completed ? '✓' : ''}
             </div>
             <span class="plan-text">${escapeHtml(plan.plan_text)}</span>
@@ -583,13 +635,17 @@ async function sendChatMessage() {
     // "Yozmoqda..." ko'rsatish
     const thinkingId = appendChatMessage('assistant', '🤔 Yozmoqda...');
     
+    ownChats++;
     try {
-        const res = await apiCall('/api/chat', 'POST', { message, context: 'dashboard' });
-        
-        // "Yozmoqda..."ni AI javobi bilan almashtirish
+        // "Yozmoqda..."ni AI javobi bilan almashtirish — bo'laklar kelishi bilan
         const thinkingEl = document.getElementById(thinkingId);
-        if (thinkingEl) {
-            thinkingEl.querySelector('.msg-content').textContent = res.reply;
+        const show = (text) => {
+            if (thinkingEl) thinkingEl.querySelector('.msg-content').textContent = text;
+        };
+        if (socketReady || (window.ReadableStream && window.TextDecoderStream)) {
+            await streamChat({ message, context: 'dashboard' }, show);
+        } else {
+            show((await apiCall('/api/chat', 'POST', { message, context: 'dashboard' })).reply);
         }
         
     } catch (e) {
@@ -597,7 +653,64 @@ async function sendChatMessage() {
         if (thinkingEl) {
             thinkingEl.querySelector('.msg-content').textContent = 'Xabar yuborishda xato. Qayta urinib ko\'ring.';
         }
+    } finally {
+        // javob fonda saqlanadi — uning 'chat' push i biroz keyin keladi
+        ownChats--;
+        ownChatUntil = Date.now() + OWN_CHAT_GRACE;
+    }
+}
+
+/**
+ * /api/chat/stream: soket ulangan bo'lsa — kadrlar orqali, aks holda SSE fetch.
+ * onText — shu paytgacha kelgan to'liq matn
+ */
+async function streamChat(body, onText) {
+    let text = '';
+    const feed = sseParser((event, data) => {
+        if (event === 'delta') {
+            text += data.text;
+            onText(text);
+        }
+    });
+    
+    if (socketReady) {
+        await socketCall('/api/chat/stream', 'POST', body, feed);
+        return text;
     }
+    
+    const headers = { 'Content-Type': 'application/json' };
+    if (token) headers['Authorization'] = `Bearer ${token}`;
+    
+    const res = await fetch(API_URL + '/api/chat/stream', { method: 'POST', headers, body: JSON.stringify(body) });
+    if (!res.ok) {
+        const data = await res.json().catch(() => ({}));
+        throw new Error(data.detail || 'Xato yuz berdi');
+    }
+    
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        feed(value);
+    }
+    return text;
+}
+
+/**
+ * SSE matnini bo'laklab qabul qiladi; har bir to'liq hodisa uchun onEvent(event, data)
+ */
+function sseParser(onEvent) {
+    let buffer = '';
+    return (chunk) => {
+        buffer += chunk;
+        let end;
+        while ((end = buffer.indexOf('\n\n')) >= 0) {
+            const block = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            const event = /^event: (.*)$/m.exec(block)?.[1];
+            onEvent(event, JSON.parse(/^data: (.*)$/m.exec(block)?.[1] || '{}'));
+        }
+    };
 }
 
 /**
@@ -643,11 +756,51 @@ async function loadReview() {
 // -------------------------------------------------------
 // API YORDAMCHI FUNKSIYA
 // -------------------------------------------------------
+// Reja yozuvlari /api/sync mutatsiyalariga aylanadi: BATCH_DELAY_MS ichidagi
+// chaqiruvlar bitta so'rovda ketadi, tarmoq bo'lmasa navbatda (localStorage)
+// qoladi va 'online' da yuboriladi. Mutatsiya id si serverda Idempotency-Key —
+// qayta yuborish takror yozmaydi. Bir vaqtdagi bir xil GET lar — bitta so'rov.
+
+const BATCH_DELAY_MS = 50;
+const MAX_BATCH = 100;        // server: core.MAX_MUTATIONS
+const SYNC_PAGE = 50;         // javobdagi delta hajmi (faqat yangilash signali)
+const SYNC_RETRY_MS = 5000;   // 429 / server xatosidan keyin
+const SYNC_ROUTES = [
+    // [metod, yo'l, mutatsiya]
+    ['POST', /^\/api\/plans$/, (match, body) => ({ op: 'plan.create', ...body })],
+    ['PUT', /^\/api\/plans\/(\d+)\/complete$/, (match) => ({ op: 'plan.complete', plan_id: Number(match[1]) })],
+];
+
+const inflightGets = new Map();    // endpoint -> Promise
+const outboxWaiters = new Map();   // mutation id -> { resolve, reject }
+let flushTimer = null;
+let flushing = false;
+let mutationCounter = 0;
 
 /**
  * Barcha API chaqiruvlari uchun yagona funksiya
  */
 async function apiCall(endpoint, method = 'GET', body = null) {
+    for (const [m, pattern, toMutation] of SYNC_ROUTES) {
+        const match = token && method === m && endpoint.match(pattern);
+        if (match) return enqueueMutation(toMutation(match, body || {}));
+    }
+    if (method !== 'GET') return request(endpoint, method, body);
+    
+    if (!inflightGets.has(endpoint)) {
+        inflightGets.set(endpoint, request(endpoint).finally(() => inflightGets.delete(endpoint)));
+    }
+    return inflightGets.get(endpoint);
+}
+
+/**
+ * Bitta HTTP so'rov; xato javobda Error (detail matni, status)
+ */
+async function request(endpoint, method = 'GET', body = null) {
+    if (socketReady && WS_PATHS.includes(endpoint.split('?')[0])) {
+        return socketCall(endpoint, method, body);
+    }
+    
     const headers = { 'Content-Type': 'application/json' };
     
     if (token) {
@@ -661,12 +814,236 @@ async function apiCall(endpoint, method = 'GET', body = null) {
     const data = await res.json();
     
     if (!res.ok) {
-        throw new Error(data.detail || 'Xato yuz berdi');
+        const err = new Error(data.detail || 'Xato yuz berdi');
+        err.status = res.status;
+        throw err;
     }
     
     return data;
 }
 
+/**
+ * Yozuvni navbatga qo'yish. Natija — handler javobi; oflayn bo'lsa {queued: true}
+ */
+function enqueueMutation(mutation) {
+    mutation.id = 'm' + Date.now().toString(36) + (mutationCounter++).toString(36) + Math.random().toString(36).slice(2, 6);
+    outbox.push(mutation);
+    saveOutbox();
+    return new Promise((resolve, reject) => {
+        outboxWaiters.set(mutation.id, { resolve, reject });
+        if (!flushTimer) flushTimer = setTimeout(flushOutbox, BATCH_DELAY_MS);
+    });
+}
+
+function saveOutbox() {
+    localStorage.setItem('aliman_outbox', JSON.stringify(outbox));
+}
+
+/**
+ * Kutayotgan chaqiruvni yakunlash; kutuvchi yo'q bo'lsa (oldingi tashrifdan) — false
+ */
+function settleMutation(id, ok, value) {
+    const waiter = outboxWaiters.get(id);
+    if (!waiter) return false;
+    outboxWaiters.delete(id);
+    ok ? waiter.resolve(value) : waiter.reject(value);
+    return true;
+}
+
+/**
+ * Navbatda qolganlar: chaqiruvchilar kutib turmaydi, UI ularni xira ko'rsatadi
+ */
+function settleQueued() {
+    outbox.forEach(m => settleMutation(m.id, true, { queued: true }));
+}
+
+/**
+ * Navbatni /api/sync ga tartib bilan yuborish
+ */
+async function flushOutbox() {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+    if (flushing || !token || !outbox.length) return;
+    if (!navigator.onLine) return settleQueued();
+    
+    flushing = true;
+    const batch = outbox.slice(0, MAX_BATCH);
+    let data;
+    try {
+        data = await request(`/api/sync?limit=${SYNC_PAGE}`, 'POST', { since: syncSeq, mutations: batch });
+    } catch (e) {
+        flushing = false;
+        settleQueued();
+        // 401 — qayta kirilgandan keyin; oflayn bo'lsa keyingi urinish 'online' ni kutadi
+        if (e.status !== 401) {
+            flushTimer = setTimeout(flushOutbox, SYNC_RETRY_MS);
+        }
+        return;
+    }
+    
+    const sent = new Set();
+    let retry = false;
+    data.results.forEach((r, i) => {
+        if (r.status === 429) {
+            retry = true;
+            return;
+        }
+        sent.add(batch[i].id);
+        if (r.status < 300) settleMutation(batch[i].id, true, r.body);
+        else settleMutation(batch[i].id, false, new Error(r.body.detail || 'Xato yuz berdi'));
+    });
+    outbox = outbox.filter(m => !sent.has(m.id));
+    saveOutbox();
+    syncSeq = data.seq;
+    localStorage.setItem('aliman_sync_seq', syncSeq);
+    flushing = false;
+    
+    // boshqa qurilma yoki oldingi tashrifdagi yozuvlar ham ko'rinsin
+    if (data.reset || data.plans.length) {
+        loadDashboard();
+        loadPlansPage();
+    }
+    if (retry) {
+        settleQueued();
+        flushTimer = setTimeout(flushOutbox, SYNC_RETRY_MS);
+    } else if (outbox.length) {
+        flushOutbox();
+    }
+}
+
+/**
+ * Service worker: keshdan ko'rsatilgan dashboard yangilandi
+ */
+function handleWorkerMessage(event) {
+    const msg = event.data || {};
+    if (msg.type === 'api-updated' && msg.path === '/api/dashboard' && token) {
+        renderDashboard(msg.data);
+        renderPlansList(msg.data.plans, 'plans-full-list', true);
+    }
+}
+
+// -------------------------------------------------------
+// WEBSOCKET (/ws)
+// -------------------------------------------------------
+// Chat, fokus va dashboard so'rovlari bitta ulanishda (token bir marta
+// tekshiriladi); server o'zgarishlarni o'zi yuboradi ({type: 'changed'}).
+// /ws faqat FastAPI adapterida: login/register javobidagi `ws` bayrog'i
+// bo'lmasa soket ochilmaydi va hammasi oddiy HTTP da qoladi.
+
+const WS_PATHS = ['/api/dashboard', '/api/focus/start', '/api/focus/end', '/api/chat', '/api/chat/stream', '/api/chat/history'];
+const WS_MAX_FAILURES = 3;
+const WS_AUTH_FAILED = 4401;
+const WS_CALL_TIMEOUT = 20000;     // ms: javob (yoki oqim bo'lagi) kelmagan kadr xato bilan tugaydi
+const OWN_CHAT_GRACE = 3000;       // ms: o'z chat xabarimizdan keyingi 'chat' push e'tiborsiz
+
+let socket = null;
+let socketReady = false;
+let socketFailures = 0;
+let frameId = 0;
+let pushTimer = null;
+const socketWaiters = new Map();   // kadr id -> { resolve, reject, onChunk, arm, timer }
+const pushedTopics = new Set();
+let ownChats = 0;                  // yuborilayotgan chat xabarlari (soket yoki HTTP)
+let ownChatUntil = 0;
+
+function openSocket() {
+    if (!token || !socketSupported || socket || !('WebSocket' in window) || socketFailures >= WS_MAX_FAILURES) return;
+    const ws = new WebSocket(API_URL.replace(/^http/, 'ws') + '/ws');
+    socket = ws;
+    ws.onopen = () => ws.send(JSON.stringify({ type: 'auth', token }));
+    ws.onmessage = (e) => handleSocketFrame(JSON.parse(e.data));
+    ws.onclose = (e) => {
+        if (socket !== ws) return;  // closeSocket() allaqachon tozalagan
+        if (!socketReady) socketFailures++;
+        if (e.code === WS_AUTH_FAILED) socketFailures = WS_MAX_FAILURES;
+        dropSocket(new Error('Aloqa uzildi. Qayta urinib ko\'ring.'));
+        if (token) setTimeout(openSocket, 2000 * (socketFailures + 1));
+    };
+}
+
+function closeSocket() {
+    const ws = socket;
+    dropSocket(new Error('Aloqa yopildi'));
+    socketFailures = 0;
+    if (ws) ws.close();
+}
+
+function dropSocket(err) {
+    socket = null;
+    socketReady = false;
+    socketWaiters.forEach(w => {
+        clearTimeout(w.timer);
+        w.reject(err);
+    });
+    socketWaiters.clear();
+}
+
+/**
+ * So'rov kadri; javob HTTP dagi kabi: muvaffaqiyat — body, aks holda Error.
+ * onChunk — oqimli endpoint bo'laklari (SSE matni)
+ */
+function socketCall(endpoint, method, body, onChunk = null) {
+    const id = ++frameId;
+    socket.send(JSON.stringify({ id, method, path: endpoint, body }));
+    return new Promise((resolve, reject) => {
+        const waiter = { resolve, reject, onChunk, timer: null };
+        waiter.arm = () => {
+            clearTimeout(waiter.timer);
+            waiter.timer = setTimeout(() => {
+                socketWaiters.delete(id);
+                reject(new Error('Server javob bermadi. Qayta urinib ko\'ring.'));
+            }, WS_CALL_TIMEOUT);
+        };
+        waiter.arm();
+        socketWaiters.set(id, waiter);
+    });
+}
+
+function handleSocketFrame(msg) {
+    if (msg.type === 'ready') {
+        socketReady = true;
+        socketFailures = 0;
+        return;
+    }
+    if (msg.type === 'changed') {
+        // o'zimiz yuborayotgan chat xabarining javobi baribir keladi
+        const ownChat = ownChats > 0 || Date.now() < ownChatUntil;
+        msg.topics.filter(t => !(t === 'chat' && ownChat)).forEach(t => pushedTopics.add(t));
+        clearTimeout(pushTimer);
+        pushTimer = setTimeout(applyPushedTopics, 300);
+        return;
+    }
+    const waiter = socketWaiters.get(msg.id);
+    if (!waiter) return;
+    if (msg.chunk !== undefined) {
+        waiter.arm();
+        if (waiter.onChunk) waiter.onChunk(msg.chunk);
+        return;
+    }
+    socketWaiters.delete(msg.id);
+    clearTimeout(waiter.timer);
+    if (msg.status < 300) {
+        waiter.resolve(msg.body);
+    } else {
+        const err = new Error((msg.body && msg.body.detail) || 'Xato yuz berdi');
+        err.status = msg.status;
+        waiter.reject(err);
+    }
+}
+
+/**
+ * Boshqa tab/qurilmadagi o'zgarishlar: faqat ko'rinib turgan qism yangilanadi
+ */
+function applyPushedTopics() {
+    const visible = id => document.getElementById(id)?.classList.contains('active');
+    if (pushedTopics.has('dashboard')) {
+        if (visible('section-dashboard')) loadDashboard();
+        if (visible('section-plan')) loadPlansPage();
+    }
+    if (pushedTopics.has('chat') && visible('section-chat')) loadChatHistory();
+    pushedTopics.clear();
+}
+
 // -------------------------------------------------------
 // YORDAMCHI FUNKSIYALAR
 // -------------------------------------------------------
@@ -0,0 +1,112 @@
+// ============================================================
+// Aliman AI - Service Worker
+// ============================================================
+// App shell (index.html, style.css, app.js) versiyalangan keshda — qayta
+// tashrifda tarmoqqa chiqilmaydi, oflayn ham ochiladi. Yangi relizda
+// SHELL_VERSION ni oshiring: eski kesh activate da o'chiriladi.
+//
+// Dashboard o'qishlari stale-while-revalidate: keshdagi javob darhol
+// qaytadi, fonda yangisi olinadi; ETag o'zgargan bo'lsa sahifaga
+// {type: 'api-updated'} xabari yuboriladi va u qayta chiziladi.
+// Oflayn yozuvlar navbati app.js da (token faqat sahifada bor) —
+// tarmoq qaytganda /api/sync orqali yuboriladi.
+// ============================================================
+
+const SHELL_VERSION = 'v6';
+const SHELL_CACHE = `aliman-shell-${SHELL_VERSION}`;
+const API_CACHE = 'aliman-api';
+const SHELL = ['./', 'index.html', 'style.css', 'app.js'];
+const SWR_PATHS = ['/api/dashboard'];
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE).then(cache => cache.addAll(SHELL)).then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(k => k.startsWith('aliman-shell-') && k !== SHELL_CACHE)
+                .map(k => caches.delete(k))))
+            .then(() => self.clients.claim())
+    );
+});
+
+// Sahifadan: chiqish / boshqa foydalanuvchi — shaxsiy API keshi tozalanadi
+self.addEventListener('message', (event) => {
+    if (event.data && event.data.type === 'clear-api') {
+        event.waitUntil(caches.delete(API_CACHE));
+    }
+});
+
+self.addEventListener('fetch', (event) => {
+    const req = event.request;
+    const url = new URL(req.url);
+
+    if (url.pathname.startsWith('/api/')) {
+        if (req.method === 'GET' && SWR_PATHS.includes(url.pathname)) {
+            event.respondWith(staleWhileRevalidate(event));
+        } else if (req.method !== 'GET') {
+            event.respondWith(writeThrough(req));
+        }
+        return;  // qolgan GET lar — to'g'ridan-to'g'ri tarmoq
+    }
+
+    if (req.method === 'GET' && url.origin === self.location.origin) {
+        event.respondWith(shellFirst(req));
+    }
+});
+
+/**
+ * Shell: avval kesh, bo'lmasa tarmoq (navigatsiya — doim index.html)
+ */
+async function shellFirst(req) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(req.mode === 'navigate' ? './' : req, { ignoreSearch: true });
+    return cached || fetch(req);
+}
+
+/**
+ * Keshdagi javob darhol; yangisi fonda olinadi va keshga yoziladi
+ */
+async function staleWhileRevalidate(event) {
+    const req = event.request;
+    const cache = await caches.open(API_CACHE);
+    const cached = await cache.match(req);
+
+    const network = fetch(req).then(async (res) => {
+        if (res.ok) {
+            await cache.put(req, res.clone());
+            if (cached && cached.headers.get('ETag') !== res.headers.get('ETag')) {
+                await notify(event.clientId, new URL(req.url).pathname, await res.clone().json());
+            }
+        }
+        return res;
+    });
+
+    if (cached) {
+        event.waitUntil(network.catch(() => {}));  // oflayn — kesh yetarli
+        return cached;
+    }
+    return network;
+}
+
+/**
+ * Yozuv muvaffaqiyatli bo'lsa API keshi eskirgan: keyingi o'qish tarmoqdan
+ * (aks holda yozgan foydalanuvchi bir lahza eski ro'yxatni ko'radi)
+ */
+async function writeThrough(req) {
+    const res = await fetch(req);
+    if (res.ok) {
+        await caches.delete(API_CACHE);
+    }
+    return res;
+}
+
+async function notify(clientId, path, data) {
+    const client = clientId && await self.clients.get(clientId);
+    const targets = client ? [client] : await self.clients.matchAll({ type: 'window' });
+    targets.forEach(c => c.postMessage({ type: 'api-updated', path, data }));
+}